@@ -0,0 +1,832 @@
+# Requires: pandas, pulp
+# Usage:
+#   python benchmark_optimizers.py
+# Optional:
+#   --root weekly_team_predictions --gws gw9 gw10 --horizon 1gw --max_transfers 5
+#   --suite formation_mode persistent objective build solver presolve jobs frontier horizon chips dp prune quick scenarios sims warm exact combos pool --outfile bench_output.txt
+#   --jobs 4
+#
+# What it does:
+# - Rebuilds each entry's squad from the k=0 block of the stored
+#   enhanced_transfer_suggestions_<entry>.txt report (names, teams, prices, bank).
+# - Uses the matching *_adjusted.csv in the same folder as the predictions pool.
+# - Times the optimizer variants against each other on the same inputs and checks
+#   that they agree on the chosen squad.
+#
+# Nothing here hits the FPL API, so runs are repeatable offline. The solution
+# cache is bypassed so every timing is a real solve.
+
+import argparse
+import glob
+import os
+import pickle
+import re
+import time
+import tracemalloc
+from collections import Counter
+from itertools import combinations
+from typing import List
+
+import pandas as pd
+
+from bounds import total_stats
+from chip_planner import ChipPlanner
+from gw_simulator import simulate_payload
+from fpl_transfers_optimizer import DEFAULT_FORMATIONS, _key, _row_str, load_predictions_csv, optimize_k, result_lines
+from multi_gw_model import MultiGWPlanner, horizon_points
+from prepared_pool import PreparedPool
+from scenarios import scenario_draws
+from solvers import DP_BACKEND, SOLVER_BACKENDS, make_solver
+from transfer_combos import TransferCombos
+from transfer_model import TransferModel, _detach, transfer_frontier
+from utils_2025 import wildcard_quick, wildcard_team_11
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SUITES = ["formation_mode", "persistent", "objective", "build", "solver", "presolve", "jobs", "frontier", "horizon", "chips", "dp", "prune", "quick", "scenarios", "sims", "warm", "exact", "combos", "pool"]
+
+# ------------------------ Weekly data ------------------------ #
+
+def parse_report_squad(report_path: str):
+    """
+    Pull (bank, owned rows) from the 'Transfers: 0' block of a stored report.
+    Rows are dicts with Name/Team/Position/Price exactly as printed.
+    """
+    with open(report_path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+
+    bank_m = None
+    m = re.search(r"Bank: ([\d.]+)", "\n".join(lines[:3]))
+    if m:
+        bank_m = float(m.group(1))
+
+    rows = []
+    in_block = False
+    for ln in lines:
+        if ln.startswith("STARTING XI") or ln.startswith("BENCH"):
+            in_block = True
+            continue
+        if ln.startswith("Suggested") or ln.startswith("-" * 10):
+            if rows:
+                break
+            in_block = False
+            continue
+        if in_block and ln.startswith("  "):
+            r = re.match(r"  (.{22}) (.{15}) (\S+)\s+([\d.]+)", ln)
+            if r:
+                rows.append(dict(Name=r.group(1).strip(), Team=r.group(2).strip(),
+                                 Position=r.group(3), Price=float(r.group(4))))
+    return bank_m, rows
+
+
+def load_weekly_entries(root: str, gws: List[str] | None = None, horizon: str = "1gw") -> List[dict]:
+    """
+    One dict per (gameweek folder, model folder) that has both a predictions CSV
+    and an enhanced report: {"label", "dir", "pool_df", "owned_df", "bank_m"}.
+    Owned players missing from the CSV are added the same way the optimizers do
+    (report price, near-zero Points) so every pool stays feasible.
+    """
+    entries = []
+    gw_dirs = sorted(glob.glob(os.path.join(root, "gw*")), key=lambda p: int(re.sub(r"\D", "", os.path.basename(p)) or 0))
+    for gw_dir in gw_dirs:
+        if gws and os.path.basename(gw_dir) not in gws:
+            continue
+        for model_dir in sorted(glob.glob(os.path.join(gw_dir, "*"))):
+            reports = sorted(glob.glob(os.path.join(model_dir, "enhanced_transfer_suggestions_*.txt")))
+            csvs = sorted(glob.glob(os.path.join(model_dir, f"*_{horizon}_adjusted.csv")))
+            if not reports or not csvs:
+                continue
+            bank_m, rows = parse_report_squad(reports[0])
+            if bank_m is None or len(rows) != 15:
+                continue
+
+            pool_df = load_predictions_csv(csvs[0])
+            owned_keys = [_key(r["Name"], r["Team"]) for r in rows]
+            have = set(pool_df["key"])
+            fallback = [dict(r, Points=0.000001, key=k) for r, k in zip(rows, owned_keys) if k not in have]
+            if fallback:
+                pool_df = pd.concat([pool_df, pd.DataFrame(fallback)], ignore_index=True)
+            owned_df = pool_df[pool_df["key"].isin(owned_keys)].drop_duplicates("key").reset_index(drop=True)
+
+            label = f"{os.path.basename(gw_dir)}/{os.path.basename(model_dir)}"
+            entries.append({"label": label, "dir": model_dir, "pool_df": pool_df, "owned_df": owned_df, "bank_m": bank_m})
+    return entries
+
+# ------------------------ Helpers ------------------------ #
+
+def _timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t0
+
+
+def _squad_sig(res) -> tuple:
+    if not res:
+        return ()
+    return tuple(sorted(res["selected"]))
+
+def _rank_key(res) -> tuple:
+    """A payload's (XI points, -cost, bench points), rounded so float noise can't split ties."""
+    if not res:
+        return ()
+    return (round(res["starting_points"], 6), -round(res["total_cost"], 6), round(res["bench_points"], 6))
+
+def _loop_transfers(team: pd.DataFrame, pool: pd.DataFrame, transfers: int, bank: float, top_n: int) -> List[tuple]:
+    """The old transfers.py search (every out- and in-combination), ranked: (points diff, budget left)."""
+    pool = pool[~pool["Name"].isin(team["Name"])]
+    counts = Counter(team["Team"])
+    found = []
+    for out in combinations(team.itertuples(), transfers):
+        positions = sorted(p.Position for p in out)
+        money = sum(p.Price for p in out) + bank
+        cand = pool[pool["Position"].isin(positions)]
+        for ins in combinations(cand.itertuples(), transfers):
+            price = sum(p.Price for p in ins)
+            if price > money + 1e-9 or sorted(p.Position for p in ins) != positions:
+                continue
+            after = counts - Counter(p.Team for p in out) + Counter(p.Team for p in ins)
+            if max(after.values()) > 3:
+                continue
+            found.append((sum(p.Points for p in ins) - sum(p.Points for p in out), money - price))
+    return sorted(found, reverse=True)[:top_n]
+
+def _frame_lookups(pool_df: pd.DataFrame) -> dict:
+    """The per-model indexing TransferModel did before prepared_pool.py: PID dicts, key -> PID, Name -> PIDs."""
+    df = pool_df.copy().reset_index(drop=True)
+    df["PID"] = df.index
+    by_pid = df.set_index("PID")
+    out = {nm: by_pid[col].to_dict() for nm, col in
+           (("name", "Name"), ("team", "Team"), ("pos", "Position"), ("key", "key"))}
+    out["price"] = by_pid["Price"].astype(float).to_dict()
+    out["pts"] = by_pid["Points"].astype(float).to_dict()
+    out["pid_by_key"] = df.set_index("key")["PID"].to_dict()
+    out["by_name"] = df.groupby("Name")["PID"].apply(set).to_dict()
+    return out
+
+def _pool_lookups(pool_df: pd.DataFrame) -> dict:
+    """The same lookups from a PreparedPool."""
+    pool = PreparedPool(pool_df)
+    return {"name": pool.name_by_pid, "team": pool.team_by_pid, "pos": pool.pos_by_pid, "key": pool.key_by_pid,
+            "price": pool.price_by_pid, "pts": pool.pts_by_pid, "pid_by_key": pool.pid_by_key,
+            "by_name": {nm: set(ids.tolist()) for nm, ids in pool.ids_by_name.items()}}
+
+def _traced(fn, *args):
+    """(result, seconds, peak traced bytes) of one call."""
+    tracemalloc.start()
+    out, t = _timed(fn, *args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return out, t, peak
+
+def _frame_rows(res) -> List[str]:
+    """A payload's OUT/IN/XI/bench rows the way the report printed them before: set_index + df.loc per row."""
+    df = res["_df"].set_index("PID")
+    return [_row_str(df.loc[pid]) for pid in res["out"] + res["in"] + res["starting"] + res["bench"]]
+
+# ------------------------ Suites ------------------------ #
+
+def bench_formation_mode(entries: List[dict], max_k: int, formations) -> List[str]:
+    """optimize_k: one model per formation ("loop") vs formation as a variable ("free")."""
+    lines = ["Formation loop vs formation-as-variable (optimize_k)",
+             f"{'Entry':<28}{'k':>3}{'loop s':>10}{'free s':>10}{'speedup':>9}  {'XI loop':>9}{'XI free':>9}  same15"]
+    totals = {"loop": 0.0, "free": 0.0}
+    for e in entries:
+        for k in range(0, max_k + 1):
+            common = dict(k=k, pool_df=e["pool_df"], owned_df=e["owned_df"], bank_m=e["bank_m"],
+                          formations=formations, bench_budget=20.0, cache=False)
+            r_loop, t_loop = _timed(optimize_k, formation_mode="loop", **common)
+            r_free, t_free = _timed(optimize_k, formation_mode="free", **common)
+            totals["loop"] += t_loop
+            totals["free"] += t_free
+            xi_loop = r_loop["starting_points"] if r_loop else float("nan")
+            xi_free = r_free["starting_points"] if r_free else float("nan")
+            same = "yes" if _squad_sig(r_loop) == _squad_sig(r_free) else "NO"
+            lines.append(f"{e['label']:<28}{k:>3}{t_loop:>10.2f}{t_free:>10.2f}{t_loop / max(t_free, 1e-9):>8.1f}x"
+                         f"  {xi_loop:>9.4f}{xi_free:>9.4f}  {same}")
+    lines.append(f"TOTAL loop {totals['loop']:.2f}s | free {totals['free']:.2f}s | "
+                 f"speedup {totals['loop'] / max(totals['free'], 1e-9):.1f}x")
+    return lines
+
+def bench_persistent(entries: List[dict], max_k: int, formations) -> List[str]:
+    """optimize_k per k (rebuild every time) vs one TransferModel re-solved for k = 0..max_k."""
+    lines = ["Rebuild per k (optimize_k) vs persistent TransferModel (RHS change + MIP start)",
+             f"{'Entry':<28}{'rebuild s':>11}{'build s':>9}{'solve s':>9}{'reuse s':>9}{'speedup':>9}  same15"]
+    totals = {"rebuild": 0.0, "reuse": 0.0}
+    for e in entries:
+        common = dict(pool_df=e["pool_df"], owned_df=e["owned_df"], bank_m=e["bank_m"],
+                      formations=formations, bench_budget=20.0, cache=False)
+        rebuilt, t_rebuild = _timed(lambda: [optimize_k(k=k, **common) for k in range(max_k + 1)])
+        model, t_build = _timed(TransferModel, **common)
+        reused, t_solve = _timed(lambda: [model.solve(k) for k in range(max_k + 1)])
+        t_reuse = t_build + t_solve
+        totals["rebuild"] += t_rebuild
+        totals["reuse"] += t_reuse
+        same = all(_squad_sig(a) == _squad_sig(b) for a, b in zip(rebuilt, reused))
+        lines.append(f"{e['label']:<28}{t_rebuild:>11.2f}{t_build:>9.2f}{t_solve:>9.2f}{t_reuse:>9.2f}"
+                     f"{t_rebuild / max(t_reuse, 1e-9):>8.1f}x  {'yes' if same else 'NO'}")
+    lines.append(f"TOTAL rebuild {totals['rebuild']:.2f}s | reuse {totals['reuse']:.2f}s | "
+                 f"speedup {totals['rebuild'] / max(totals['reuse'], 1e-9):.1f}x")
+    return lines
+
+def bench_objective(entries: List[dict], max_k: int, formations) -> List[str]:
+    """
+    Verification for objective_mode="weighted": the single-solve objective must give
+    the same squads as the three-stage chain, for the transfer model (every k) and
+    for wildcard_team_11 (every formation, with and without bench).
+    """
+    lines = ["Three-stage lexicographic vs single weighted solve (verification)",
+             f"{'Entry':<28}{'model':<16}{'lexi s':>9}{'weighted s':>12}{'speedup':>9}  same/total"]
+    same_all = total_all = 0
+    for e in entries:
+        # Transfer model, k = 0..max_k
+        common = dict(pool_df=e["pool_df"], owned_df=e["owned_df"], bank_m=e["bank_m"],
+                      formations=formations, bench_budget=20.0, cache=False, exact_small_k=False)
+        m_lex = TransferModel(objective_mode="lexicographic", **common)
+        m_w = TransferModel(objective_mode="weighted", **common)
+        r_lex, t_lex = _timed(lambda: [m_lex.solve(k) for k in range(max_k + 1)])
+        r_w, t_w = _timed(lambda: [m_w.solve(k) for k in range(max_k + 1)])
+        same = sum(_squad_sig(a) == _squad_sig(b) for a, b in zip(r_lex, r_w))
+        same_all += same
+        total_all += len(r_lex)
+        lines.append(f"{e['label']:<28}{'transfers':<16}{t_lex:>9.2f}{t_w:>12.2f}{t_lex / max(t_w, 1e-9):>8.1f}x  {same}/{len(r_lex)}")
+
+        # Wildcard (all formations) from the same pool, 100.0 budget
+        wc_df = e["pool_df"][["Name", "Team", "Position", "Price", "Points"]]
+        for use_bench in (True, False):
+            wc = dict(BUDGET=100.0, df_merged=wc_df, formations=formations, outfile=os.devnull, use_bench=use_bench, cache=False)
+            w_lex, t_lex = _timed(wildcard_team_11, objective_mode="lexicographic", **wc)
+            w_w, t_w = _timed(wildcard_team_11, objective_mode="weighted", **wc)
+            pairs = list(zip(w_lex["all_results"], w_w["all_results"]))
+            same = sum(sorted(a["starting_uids"] + a["bench_uids"]) == sorted(b["starting_uids"] + b["bench_uids"])
+                       for a, b in pairs)
+            same_all += same
+            total_all += len(pairs)
+            label = "wildcard" if use_bench else "wildcard XI"
+            lines.append(f"{'':<28}{label:<16}{t_lex:>9.2f}{t_w:>12.2f}{t_lex / max(t_w, 1e-9):>8.1f}x  {same}/{len(pairs)}")
+    verdict = "OK" if same_all == total_all else "MISMATCH"
+    lines.append(f"VERIFY {verdict}: {same_all}/{total_all} squads identical")
+    return lines
+
+def bench_build(entries: List[dict], max_k: int, formations) -> List[str]:
+    """Model build vs solve wall time (transfer model over every k; wildcard over every formation)."""
+    lines = ["Model build vs solve time",
+             f"{'Entry':<28}{'model':<16}{'build s':>9}{'solve s':>10}{'build %':>9}"]
+    for e in entries:
+        m = TransferModel(pool_df=e["pool_df"], owned_df=e["owned_df"], bank_m=e["bank_m"],
+                          formations=formations, bench_budget=20.0, cache=False, exact_small_k=False)
+        for k in range(max_k + 1):
+            m.solve(k)
+        solve_s = sum(m.solve_s.values())
+        lines.append(f"{e['label']:<28}{'transfers':<16}{m.build_s:>9.2f}{solve_s:>10.2f}"
+                     f"{100 * m.build_s / max(m.build_s + solve_s, 1e-9):>8.1f}%")
+
+        wc_df = e["pool_df"][["Name", "Team", "Position", "Price", "Points"]]
+        wc = wildcard_team_11(100.0, wc_df, formations=formations, outfile=os.devnull, cache=False)
+        t = wc["timing"]
+        lines.append(f"{'':<28}{'wildcard':<16}{t['build_s']:>9.2f}{t['solve_s']:>10.2f}"
+                     f"{100 * t['build_s'] / max(t['build_s'] + t['solve_s'], 1e-9):>8.1f}%")
+    return lines
+
+def bench_solver(entries: List[dict], max_k: int, formations) -> List[str]:
+    """
+    Wall time per solve for each available backend (transfer model: one solve(k);
+    wildcard: one formation), with squads checked against cbc.
+    """
+    backends = []
+    lines = ["Solver backends: mean wall time per solve (squads vs cbc)"]
+    for backend in SOLVER_BACKENDS:
+        try:
+            make_solver(backend)
+            backends.append(backend)
+        except RuntimeError as e:
+            lines.append(f"skipped: {e}")
+    lines.append(f"{'Entry':<28}{'model':<12}" + "".join(f"{b + ' s':>16}" for b in backends) + "  same/total")
+    same_all = total_all = 0
+    for e in entries:
+        common = dict(pool_df=e["pool_df"], owned_df=e["owned_df"], bank_m=e["bank_m"],
+                      formations=formations, bench_budget=20.0, cache=False, exact_small_k=False)
+        wc_df = e["pool_df"][["Name", "Team", "Position", "Price", "Points"]]
+        tr, wc = {}, {}
+        for backend in backends:
+            m = TransferModel(solver=backend, **common)
+            res, t = _timed(lambda: [m.solve(k) for k in range(max_k + 1)])
+            tr[backend] = ([_squad_sig(r) for r in res], t / len(res))
+            out, t = _timed(wildcard_team_11, 100.0, wc_df, formations=formations, outfile=os.devnull, solver=backend,
+                            cache=False)
+            sigs = [tuple(sorted(p["starting_uids"] + p["bench_uids"])) for p in out["all_results"]]
+            wc[backend] = (sigs, t / len(sigs))
+        for label, by_backend in (("transfers", tr), ("wildcard", wc)):
+            ref = by_backend["cbc"][0]
+            same = sum(sum(a == b for a, b in zip(ref, sigs)) for sigs, _ in by_backend.values())
+            total = len(ref) * len(by_backend)
+            same_all += same
+            total_all += total
+            lines.append(f"{e['label'] if label == 'transfers' else '':<28}{label:<12}"
+                         + "".join(f"{by_backend[b][1]:>16.3f}" for b in backends) + f"  {same}/{total}")
+    verdict = "OK" if same_all == total_all else "MISMATCH"
+    lines.append(f"VERIFY {verdict}: {same_all}/{total_all} squads identical to cbc")
+    return lines
+
+def bench_presolve(entries: List[dict], max_k: int, formations) -> List[str]:
+    """Dominance presolve on vs off: players kept, wall time, and the squads must not change."""
+    lines = ["Presolve (excluded + dominated players dropped before the build)",
+             f"{'Entry':<28}{'model':<12}{'players':>12}{'off s':>9}{'on s':>9}{'speedup':>9}  same/total"]
+    same_all = total_all = 0
+    for e in entries:
+        common = dict(pool_df=e["pool_df"], owned_df=e["owned_df"], bank_m=e["bank_m"],
+                      formations=formations, bench_budget=20.0, cache=False, exact_small_k=False)
+        runs = {}
+        for on in (False, True):
+            m = TransferModel(presolve=on, **common)
+            res, t = _timed(lambda: [m.solve(k) for k in range(max_k + 1)])
+            runs[on] = ([_squad_sig(r) for r in res], t + m.build_s, m)
+        same = sum(a == b for a, b in zip(runs[False][0], runs[True][0]))
+        st = runs[True][2].presolve
+        lines.append(f"{e['label']:<28}{'transfers':<12}{st['players']:>6} ->{st['kept']:>4}"
+                     f"{runs[False][1]:>9.2f}{runs[True][1]:>9.2f}{runs[False][1] / max(runs[True][1], 1e-9):>8.1f}x  {same}/{len(runs[True][0])}")
+        same_all += same
+        total_all += len(runs[True][0])
+
+        wc_df = e["pool_df"][["Name", "Team", "Position", "Price", "Points"]]
+        for use_bench in (True, False):
+            wc = {}
+            for on in (False, True):
+                out, t = _timed(wildcard_team_11, 100.0, wc_df, formations=formations, outfile=os.devnull,
+                                use_bench=use_bench, presolve=on, cache=False)
+                wc[on] = ([sorted(p["starting_uids"] + p["bench_uids"]) for p in out["all_results"]], t, out)
+            same = sum(a == b for a, b in zip(wc[False][0], wc[True][0]))
+            kept = [st["kept"] for st in wc[True][2]["presolve"].values()]
+            label = "wildcard" if use_bench else "wildcard XI"
+            lines.append(f"{'':<28}{label:<12}{len(wc_df):>6} ->{max(kept):>4}"
+                         f"{wc[False][1]:>9.2f}{wc[True][1]:>9.2f}{wc[False][1] / max(wc[True][1], 1e-9):>8.1f}x  {same}/{len(wc[True][0])}")
+            same_all += same
+            total_all += len(wc[True][0])
+    verdict = "OK" if same_all == total_all else "MISMATCH"
+    lines.append(f"VERIFY {verdict}: {same_all}/{total_all} squads identical with presolve")
+    return lines
+
+def bench_prune(entries: List[dict], max_k: int, formations) -> List[str]:
+    """LP-bound pruning off vs on: passes solved, wall time, and the best squads must not change."""
+    lines = ["Bound-and-prune (formation passes skipped on their LP bound)",
+             f"{'Entry':<28}{'model':<12}{'solved':>10}{'off s':>9}{'on s':>9}{'speedup':>9}  same/total"]
+    same_all = total_all = 0
+    for e in entries:
+        common = dict(pool_df=e["pool_df"], owned_df=e["owned_df"], bank_m=e["bank_m"],
+                      formations=formations, bench_budget=20.0, cache=False, exact_small_k=False)
+        runs = {}
+        for on in (False, True):
+            m = TransferModel(prune=on, **common)
+            res, t = _timed(lambda: [m.solve(k) for k in range(max_k + 1)])
+            runs[on] = ([_squad_sig(r) for r in res], t, m)
+        same = sum(a == b for a, b in zip(runs[False][0], runs[True][0]))
+        st = total_stats(runs[True][2].prune_stats.values())
+        lines.append(f"{e['label']:<28}{'transfers':<12}{st['solved']:>5}/{st['passes']:<4}"
+                     f"{runs[False][1]:>9.2f}{runs[True][1]:>9.2f}{runs[False][1] / max(runs[True][1], 1e-9):>8.1f}x  {same}/{len(res)}")
+        same_all += same
+        total_all += len(res)
+
+        wc_df = e["pool_df"][["Name", "Team", "Position", "Price", "Points"]]
+        for use_bench in (True, False):
+            wc = {}
+            for on in (False, True):
+                wc[on] = _timed(wildcard_team_11, 100.0, wc_df, formations=formations, outfile=os.devnull,
+                                use_bench=use_bench, prune=on, cache=False)
+            st = wc[True][0]["prune"]
+            same = int(wc[False][0]["best"] == wc[True][0]["best"])
+            label = "wildcard" if use_bench else "wildcard XI"
+            lines.append(f"{'':<28}{label:<12}{st['solved']:>5}/{st['passes']:<4}"
+                         f"{wc[False][1]:>9.2f}{wc[True][1]:>9.2f}{wc[False][1] / max(wc[True][1], 1e-9):>8.1f}x  {same}/1")
+            same_all += same
+            total_all += 1
+    verdict = "OK" if same_all == total_all else "MISMATCH"
+    lines.append(f"VERIFY {verdict}: {same_all}/{total_all} best squads identical with pruning")
+    return lines
+
+def bench_jobs(entries: List[dict], max_k: int, formations, jobs: int) -> List[str]:
+    """Serial vs process-pool solving; the merged best must be identical."""
+    lines = [f"Serial vs --jobs {jobs} (os.cpu_count() = {os.cpu_count()})",
+             f"{'Entry':<28}{'model':<12}{'serial s':>10}{'jobs s':>9}{'speedup':>9}  same/total"]
+    same_all = total_all = 0
+    for e in entries:
+        common = dict(pool_df=e["pool_df"], owned_df=e["owned_df"], bank_m=e["bank_m"],
+                      formations=formations, bench_budget=20.0, cache=False, exact_small_k=False)
+        ks = range(max_k + 1)
+        r1, t1 = _timed(TransferModel(**common).solve_many, ks, jobs=1)
+        rn, tn = _timed(TransferModel(**common).solve_many, ks, jobs=jobs)
+        same = sum(_squad_sig(r1[k]) == _squad_sig(rn[k]) for k in ks)
+        same_all += same
+        total_all += len(ks)
+        lines.append(f"{e['label']:<28}{'transfers':<12}{t1:>10.2f}{tn:>9.2f}{t1 / max(tn, 1e-9):>8.1f}x  {same}/{len(ks)}")
+
+        wc_df = e["pool_df"][["Name", "Team", "Position", "Price", "Points"]]
+        w1, t1 = _timed(wildcard_team_11, 100.0, wc_df, formations=formations, outfile=os.devnull, cache=False)
+        wn, tn = _timed(wildcard_team_11, 100.0, wc_df, formations=formations, outfile=os.devnull, cache=False, jobs=jobs)
+        pairs = list(zip(w1["all_results"], wn["all_results"]))
+        same = sum(a == b for a, b in pairs) + (w1["best"] == wn["best"])
+        same_all += same
+        total_all += len(pairs) + 1
+        lines.append(f"{'':<28}{'wildcard':<12}{t1:>10.2f}{tn:>9.2f}{t1 / max(tn, 1e-9):>8.1f}x  {same}/{len(pairs) + 1}")
+    verdict = "OK" if same_all == total_all else "MISMATCH"
+    lines.append(f"VERIFY {verdict}: {same_all}/{total_all} results identical to serial")
+    return lines
+
+def bench_frontier(entries: List[dict], max_k: int, formations) -> List[str]:
+    """
+    solve_many (every k, ascending MIP starts) vs solve_frontier (walk down, skip
+    unused counts), and the hit-aware single solve vs the frontier's best net.
+    The hit cost is each entry's median marginal XI gain, so the trade-off is live.
+    """
+    lines = ["Per-k solves vs frontier walk vs hit-aware solve",
+             f"{'Entry':<28}{'many s':>8}{'front s':>9}{'solves':>7}{'hits s':>8}{'hit':>8}  {'t hits':>6}{'t front':>8}  same"]
+    ok_all = total_all = 0
+    for e in entries:
+        common = dict(pool_df=e["pool_df"], owned_df=e["owned_df"], bank_m=e["bank_m"],
+                      formations=formations, bench_budget=20.0, cache=False)
+        ks = range(max_k + 1)
+        many, t_many = _timed(TransferModel(**common).solve_many, ks)
+        fm = TransferModel(**common)
+        front, t_front = _timed(fm.solve_frontier, max_k)
+        same = all(
+            (many[k] is None) == (front[k] is None)
+            and (many[k] is None or abs(many[k]["starting_points"] - front[k]["starting_points"]) <= 1e-6)
+            for k in ks
+        )
+
+        gains = sorted(many[k]["starting_points"] - many[k - 1]["starting_points"]
+                       for k in range(1, max_k + 1) if many[k] and many[k - 1])
+        hit_cost = gains[len(gains) // 2] if gains else 4.0
+        rows = transfer_frontier(many, 1, hit_cost)
+        best = next((r for r in rows if r["best"]), None)
+        hit, t_hit = _timed(TransferModel(**common).solve_hits, 1, hit_cost, max_k)
+        if best and hit:
+            same = same and abs(hit["net_points"] - best["net_points"]) <= 1e-6
+        ok_all += same
+        total_all += 1
+        lines.append(f"{e['label']:<28}{t_many:>8.2f}{t_front:>9.2f}{len(fm.solve_s):>7}{t_hit:>8.2f}{hit_cost:>8.3f}"
+                     f"  {len(hit['in']) if hit else '-':>6}{best['transfers'] if best else '-':>8}  {'yes' if same else 'NO'}")
+    verdict = "OK" if ok_all == total_all else "MISMATCH"
+    lines.append(f"VERIFY {verdict}: {ok_all}/{total_all} entries agree (per-k values and best net points)")
+    return lines
+
+
+def bench_horizon(entries: List[dict], horizons=range(2, 7), window: int = 2) -> List[str]:
+    """
+    MultiGWPlanner solve time against horizon: one full-horizon model vs a rolling
+    `window`-GW plan, with the net points each reaches. GW2+ points come from the
+    folder's *_3gw_adjusted.csv when there is one.
+    """
+    lines = [f"Multi-GW planner: full horizon vs rolling window={window}",
+             f"{'Entry':<28}{'H':>3}{'kept':>6}{'full s':>8}{'full net':>10}{'roll s':>8}{'roll net':>10}{'gap %':>7}"]
+    for e in entries:
+        csvs = sorted(glob.glob(os.path.join(e["dir"], "*_3gw_adjusted.csv")))
+        df_3gw = load_predictions_csv(csvs[0]) if csvs else None
+        for H in horizons:
+            pool = horizon_points(e["pool_df"], df_3gw, H)
+            planner = MultiGWPlanner(pool, e["owned_df"], e["bank_m"], H, bench_budget=20.0)
+            full = planner.plan()
+            roll = planner.plan(window=window) if window < H else full
+            if not full or not roll:
+                lines.append(f"{e['label']:<28}{H:>3}  NO FEASIBLE PLAN")
+                continue
+            gap = 100.0 * (full["net_points"] - roll["net_points"]) / max(abs(full["net_points"]), 1e-9)
+            lines.append(f"{e['label']:<28}{H:>3}{len(planner.id_list):>6}{full['solve_s']:>8.2f}{full['net_points']:>10.2f}"
+                         f"{roll['solve_s']:>8.2f}{roll['net_points']:>10.2f}{gap:>7.2f}")
+    return lines
+
+def bench_chips(entries: List[dict], jobs: int, horizon: int = 3) -> List[str]:
+    """
+    ChipPlanner over `horizon` GWs, serial vs `jobs` processes, with how many of the
+    scenarios' pieces were solved rather than found in the shared memo. Both runs
+    must pick the same score.
+    """
+    lines = [f"Chip planner over {horizon} GWs: serial vs jobs={jobs}",
+             f"{'Entry':<28}{'scen':>5}{'pieces':>7}{'solved':>7}{'1 job s':>9}{f'{jobs} jobs s':>10}{'best':>9}  same"]
+    ok_all = 0
+    for e in entries:
+        csvs = sorted(glob.glob(os.path.join(e["dir"], "*_3gw_adjusted.csv")))
+        pool = horizon_points(e["pool_df"], load_predictions_csv(csvs[0]) if csvs else None, horizon)
+        planner = ChipPlanner(pool, e["owned_df"], e["bank_m"], horizon, bench_budget=20.0)
+        serial = planner.plan(jobs=1)
+        parallel = planner.plan(jobs=jobs)
+        solved = sum(s["solves"] for s in serial["scenarios"])
+        pieces = sum(s["pieces"] for s in serial["scenarios"])
+        same = (serial["best"] is None) == (parallel["best"] is None) and (
+            serial["best"] is None or abs(serial["best"]["score"] - parallel["best"]["score"]) <= 1e-6)
+        ok_all += same
+        best = f"{serial['best']['score']:.2f}" if serial["best"] else "-"
+        lines.append(f"{e['label']:<28}{len(serial['scenarios']):>5}{pieces:>7}{solved:>7}{serial['wall_s']:>9.2f}"
+                     f"{parallel['wall_s']:>10.2f}{best:>9}  {'yes' if same else 'NO'}")
+    verdict = "OK" if ok_all == len(entries) else "MISMATCH"
+    lines.append(f"VERIFY {verdict}: {ok_all}/{len(entries)} entries pick the same best score")
+    return lines
+
+def bench_dp(entries: List[dict], formations, budgets=(100.0, 85.0)) -> List[str]:
+    """
+    XI-only wildcard per formation: cbc vs the integer-price DP (dp_solver). Each
+    formation must get the same XI points and budget used (ties may swap players).
+    """
+    lines = ["XI-only wildcard: cbc vs dp (exact DP on prices in tenths)",
+             f"{'Entry':<28}{'budget':>8}{'cbc s':>9}{'dp s':>9}{'speedup':>9}  same/total"]
+    same_all = total_all = 0
+    for e in entries:
+        wc_df = e["pool_df"][["Name", "Team", "Position", "Price", "Points"]]
+        for budget in budgets:
+            runs = {}
+            for backend in ("cbc", DP_BACKEND):
+                out, t = _timed(wildcard_team_11, budget, wc_df, formations=formations, outfile=os.devnull,
+                                use_bench=False, solver=backend, cache=False)
+                runs[backend] = ({r["formation"]: (round(r["starting_points"], 6), round(r["total_budget_used"], 1))
+                                  for r in out["all_results"]}, t)
+            (a, t_cbc), (b, t_dp) = runs["cbc"], runs[DP_BACKEND]
+            same = sum(a.get(f) == b.get(f) for f in a) + (a.keys() == b.keys())
+            same_all += same
+            total_all += len(a) + 1
+            lines.append(f"{e['label']:<28}{budget:>8.1f}{t_cbc:>9.2f}{t_dp:>9.2f}{t_cbc / max(t_dp, 1e-9):>8.1f}x  {same}/{len(a) + 1}")
+    verdict = "OK" if same_all == total_all else "MISMATCH"
+    lines.append(f"VERIFY {verdict}: {same_all}/{total_all} formations match cbc")
+    return lines
+
+def bench_quick(entries: List[dict], max_k: int, formations, time_limit: float = 0.2) -> List[str]:
+    """
+    Swap search (local_search) for time_limit seconds vs the MILP: answers at least
+    as good, worst shortfall and the reported gap to the LP bound, which neither may
+    exceed. (For transfers the search ranks the re-arranged XI, as the payload does,
+    so it can even edge out the MILP, which maximizes the XI it fits the bench cap to.)
+    """
+    lines = [f"Quick swap search ({time_limit:.2f}s) vs MILP: XI points",
+             f"{'Entry':<28}{'model':<12}{'quick s':>9}{'milp s':>9}{'>= milp':>9}{'worst %':>9}{'max gap %':>10}"]
+    ok_all = total_all = 0
+
+    def _row(label, model, pairs, t_quick, t_milp):
+        # pairs: (quick payload's XI points, its "quick" stats, MILP XI points)
+        nonlocal ok_all, total_all
+        optimal = sum(q >= opt - 1e-6 for q, _, opt in pairs)
+        worst = max(max(0.0, 100 * (opt - q) / max(abs(opt), 1e-9)) for q, _, opt in pairs)
+        gaps = [st["gap"] for _, st, _ in pairs if st["gap"] is not None]
+        ok_all += sum(st["lp_bound"] is None or max(q, opt) <= st["lp_bound"] + 1e-4 for q, st, opt in pairs)
+        total_all += len(pairs)
+        lines.append(f"{label:<28}{model:<12}{t_quick:>9.2f}{t_milp:>9.2f}{optimal:>5}/{len(pairs):<3}"
+                     f"{worst:>9.1f}{100 * max(gaps, default=0.0):>10.1f}")
+
+    for e in entries:
+        common = dict(pool_df=e["pool_df"], owned_df=e["owned_df"], bank_m=e["bank_m"],
+                      formations=formations, bench_budget=20.0, cache=False)
+        m = TransferModel(**common)
+        quick, t_quick = _timed(lambda: [m.quick(k, time_limit) for k in range(max_k + 1)])
+        milp, t_milp = _timed(lambda: [m.solve(k) for k in range(max_k + 1)])
+        pairs = [(q["starting_points"], q["quick"], r["starting_points"]) for q, r in zip(quick, milp) if q and r]
+        _row(e["label"], "transfers", pairs, t_quick, t_milp)
+
+        wc_df = e["pool_df"][["Name", "Team", "Position", "Price", "Points"]]
+        for use_bench in (True, False):
+            q, t_quick = _timed(wildcard_quick, 100.0, wc_df, formations=formations, use_bench=use_bench,
+                                time_limit=time_limit)
+            r, t_milp = _timed(wildcard_team_11, 100.0, wc_df, formations=formations, outfile=os.devnull,
+                               use_bench=use_bench, cache=False)
+            pairs = [(q["best"]["starting_points"], q["quick"], r["best"]["starting_points"])]
+            _row("", "wildcard" if use_bench else "wildcard XI", pairs, t_quick, t_milp)
+    verdict = "OK" if ok_all == total_all else "MISMATCH"
+    lines.append(f"VERIFY {verdict}: {ok_all}/{total_all} quick and MILP answers within the LP bound")
+    return lines
+
+def bench_scenarios(entries: List[dict], formations, n: int = 200, risk_weight: float = 0.5) -> List[str]:
+    """
+    XI-only wildcard on n point scenarios: sample average vs CVaR-weighted. Both
+    runs see the same draws (same seed), so the CVaR squad's objective may not fall
+    below the sample-average squad's scored the same way. Also times drawing 1000
+    scenarios for the pool.
+    """
+    lines = [f"Scenario wildcard (XI only, {n} draws, risk weight {risk_weight}): sample average vs CVaR",
+             f"{'Entry':<28}{'draw1k s':>9}{'avg s':>8}{'cvar s':>8}{'avg mean':>10}{'avg cvar':>10}"
+             f"{'cvar mean':>10}{'cvar cvar':>10}"]
+    ok_all = 0
+    for e in entries:
+        wc_df = e["pool_df"][["Name", "Team", "Position", "Price", "Points"]]
+        _, t_draw = _timed(scenario_draws, wc_df, {"n": 1000})
+        runs = {}
+        for lam in (0.0, risk_weight):
+            out, t = _timed(wildcard_team_11, 100.0, wc_df, formations=formations, outfile=os.devnull,
+                            use_bench=False, cache=False,
+                            scenarios={"n": n, "alpha": 0.2, "risk_weight": lam})
+            runs[lam] = (out["best"]["scenario"], t)
+        (avg, t_avg), (risk, t_risk) = runs[0.0], runs[risk_weight]
+        ok_all += risk["objective"] >= (1 - risk_weight) * avg["mean"] + risk_weight * avg["cvar"] - 1e-6
+        lines.append(f"{e['label']:<28}{t_draw:>9.3f}{t_avg:>8.2f}{t_risk:>8.2f}{avg['mean']:>10.2f}{avg['cvar']:>10.2f}"
+                     f"{risk['mean']:>10.2f}{risk['cvar']:>10.2f}")
+    verdict = "OK" if ok_all == len(entries) else "MISMATCH"
+    lines.append(f"VERIFY {verdict}: {ok_all}/{len(entries)} CVaR squads at least as good on their objective")
+    return lines
+
+def bench_sims(entries: List[dict], max_k: int, formations, n: int = 10000) -> List[str]:
+    """
+    Monte-Carlo gameweeks (gw_simulator) for every k's squad, everyone fit: time per
+    squad against the solve, and the captain/vice/bench-order pick. With nobody
+    missing, auto-subs never fire, so the expected points must equal XI points
+    plus the captain's (within sampling noise).
+    """
+    lines = [f"GW simulation ({n} draws per squad): auto-subs + captaincy",
+             f"{'Entry':<28}{'k':>3}{'solve s':>9}{'sim s':>8}{'XI+C':>9}{'sim mean':>10}{'sd':>8}  captain / vice"]
+    ok_all = total_all = 0
+    for e in entries:
+        m = TransferModel(pool_df=e["pool_df"], owned_df=e["owned_df"], bank_m=e["bank_m"],
+                          formations=formations, bench_budget=20.0, cache=False)
+        for k in range(max_k + 1):
+            res, t_solve = _timed(m.solve, k)
+            if not res:
+                continue
+            sim, t_sim = _timed(simulate_payload, res, {}, None, n)
+            df = res["_df"].set_index("PID")
+            exact = sum(float(df.loc[i, "Points"]) for i in res["starting"]) + float(df.loc[sim["captain"], "Points"])
+            ok_all += abs(sim["mean"] - exact) <= 4 * sim["sd"] / n ** 0.5 + 1e-9
+            total_all += 1
+            lines.append(f"{e['label'] if k == 0 else '':<28}{k:>3}{t_solve:>9.2f}{t_sim:>8.3f}{exact:>9.2f}"
+                         f"{sim['mean']:>10.2f}{sim['sd']:>8.2f}  {df.loc[sim['captain'], 'Name']} / {df.loc[sim['vice'], 'Name']}")
+    verdict = "OK" if ok_all == total_all else "MISMATCH"
+    lines.append(f"VERIFY {verdict}: {ok_all}/{total_all} simulated means match XI + captain points")
+    return lines
+
+def bench_warm(entries: List[dict], max_k: int, formations) -> List[str]:
+    """
+    Transfer solves k = 0..max_k (every pass, no pruning) with and without MIP
+    starts (cbc): the previous k's optimum or the current 15. Nodes are cbc's
+    branch-and-bound nodes over every stage; the squads must match.
+    """
+    lines = ["Transfer MILP MIP starts (cbc, all passes): none vs previous optimum / current 15",
+             f"{'Entry':<28}{'cold s':>9}{'warm s':>9}{'cold nodes':>12}{'warm nodes':>12}  same/total"]
+    same_all = total_all = 0
+    for e in entries:
+        runs = {}
+        for warm in (False, True):
+            m = TransferModel(pool_df=e["pool_df"], owned_df=e["owned_df"], bank_m=e["bank_m"], formations=formations,
+                              bench_budget=20.0, cache=False, prune=False, warm_start=warm, count_nodes=True,
+                              exact_small_k=False)
+            res, t = _timed(lambda: [m.solve(k) for k in range(max_k + 1)])
+            runs[warm] = ([_squad_sig(r) for r in res], t, sum(m.nodes.values()))
+        (cold, t_cold, n_cold), (hot, t_hot, n_hot) = runs[False], runs[True]
+        same = sum(a == b for a, b in zip(cold, hot))
+        same_all += same
+        total_all += len(cold)
+        lines.append(f"{e['label']:<28}{t_cold:>9.2f}{t_hot:>9.2f}{n_cold:>12}{n_hot:>12}  {same}/{len(cold)}")
+    verdict = "OK" if same_all == total_all else "MISMATCH"
+    lines.append(f"VERIFY {verdict}: {same_all}/{total_all} squads match")
+    return lines
+
+def bench_exact(entries: List[dict], formations, bench_budgets=(20.0, None)) -> List[str]:
+    """
+    k = 0..2 by exact swap enumeration vs the MILP (same model otherwise), with and
+    without the bench cap. Rank keys must match; squads may differ only on exact ties.
+    """
+    lines = ["Exact swap enumeration vs MILP, k = 0..2 (XI points, cost, bench points)",
+             f"{'Entry':<28}{'bench cap':>10}{'moves':>9}{'exact s':>9}{'milp s':>9}{'speedup':>9}  same/total"]
+    same_all = total_all = 0
+    for e in entries:
+        for cap in bench_budgets:
+            common = dict(pool_df=e["pool_df"], owned_df=e["owned_df"], bank_m=e["bank_m"],
+                          formations=formations, bench_budget=cap, cache=False)
+            fast, milp = TransferModel(**common), TransferModel(exact_small_k=False, **common)
+            got, t_fast = _timed(lambda: [fast.solve(k) for k in range(3)])
+            want, t_milp = _timed(lambda: [milp.solve(k) for k in range(3)])
+            same = sum(_rank_key(a) == _rank_key(b) for a, b in zip(got, want))
+            same_all += same
+            total_all += len(got)
+            lines.append(f"{e['label'] if cap == bench_budgets[0] else '':<28}{'-' if cap is None else f'{cap:g}':>10}"
+                         f"{sum(fast.exact_moves.values()):>9}{t_fast:>9.3f}{t_milp:>9.2f}"
+                         f"{t_milp / max(t_fast, 1e-9):>8.0f}x  {same}/{len(got)}")
+    verdict = "OK" if same_all == total_all else "MISMATCH"
+    lines.append(f"VERIFY {verdict}: {same_all}/{total_all} exact answers rank equal to the MILP's")
+    return lines
+
+def bench_combos(entries: List[dict], max_t: int = 4, loop_t: int = 2, top_n: int = 10) -> List[str]:
+    """
+    Top-N t-for-t transfer sets (transfer_combos.py) for t = 1..max_t, and the old
+    nested-loop search for t <= loop_t; the ranked (points, money left) lists must match.
+    """
+    lines = [f"Top-{top_n} transfer sets: transfer_combos vs nested loops (t <= {loop_t})",
+             f"{'Entry':<28}{'t':>3}{'buys':>7}{'out sets':>10}{'branches':>10}{'combos s':>10}{'loops s':>10}  same"]
+    same_all = total_all = 0
+    for e in entries:
+        team, pool = e["owned_df"], e["pool_df"]
+        for t in range(1, max_t + 1):
+            combos = TransferCombos(team, pool, e["bank_m"])
+            got, t_fast = _timed(combos.top, t, top_n)
+            loops = "-"
+            if t <= loop_t:
+                want, t_loop = _timed(_loop_transfers, team, pool, t, e["bank_m"], top_n)
+                same = [(round(r["points_diff"], 6), round(r["budget_left"], 6)) for r in got] == \
+                       [(round(d, 6), round(m, 6)) for d, m in want]
+                same_all += same
+                total_all += 1
+                loops = f"{t_loop:.2f}"
+            st = combos.stats
+            lines.append(f"{e['label'] if t == 1 else '':<28}{t:>3}{st['buys']:>7}{st['out_sets']:>10}{st['branches']:>10}"
+                         f"{t_fast:>10.3f}{loops:>10}  {('yes' if same else 'NO') if t <= loop_t else '-'}")
+    verdict = "OK" if same_all == total_all else "MISMATCH"
+    lines.append(f"VERIFY {verdict}: {same_all}/{total_all} ranked lists identical to the nested loops")
+    return lines
+
+def bench_pool(entries: List[dict], max_k: int, formations) -> List[str]:
+    """
+    Pool indexing (prepared_pool.py) vs the per-model frame derivation it replaced:
+    build time and traced peak memory, report-row rendering for k = 0..max_k, and
+    the pickled size of a payload as cached / sent back by a worker (with its frame
+    vs detached). The lookups and rendered rows must be identical.
+    """
+    lines = ["PreparedPool vs per-model frame indexing (build, report rows, payload pickle)",
+             f"{'Entry':<28}{'rows':>6}{'frame s':>9}{'pool s':>9}{'frame KB':>10}{'pool KB':>9}"
+             f"{'rows old s':>11}{'rows new s':>11}{'pkl KB':>8}{'now KB':>8}  same"]
+    same_all = total_all = 0
+    for e in entries:
+        old, t_old, m_old = _traced(_frame_lookups, e["pool_df"])
+        new, t_new, m_new = _traced(_pool_lookups, e["pool_df"])
+        same = old == new
+
+        model = TransferModel(pool_df=PreparedPool(e["pool_df"]), owned_df=e["owned_df"], bank_m=e["bank_m"],
+                              formations=formations, cache=False)
+        res = [r for r in (model.solve(k) for k in range(max_k + 1)) if r]
+        want, t_rows_old = _timed(lambda: [_frame_rows(r) for r in res])
+        _, t_rows_new = _timed(lambda: [result_lines(r, f"Transfers: {len(r['in'])}") for r in res])
+        got = [[_row_str(model.pool.row(pid)) for pid in r["out"] + r["in"] + r["starting"] + r["bench"]] for r in res]
+        same = same and got == want
+        kb_old = sum(len(pickle.dumps({nm: v for nm, v in r.items() if nm != "_pool"})) for r in res) / 1024
+        kb_new = sum(len(pickle.dumps(_detach(r))) for r in res) / 1024
+
+        same_all += same
+        total_all += 1
+        lines.append(f"{e['label']:<28}{len(e['pool_df']):>6}{t_old:>9.3f}{t_new:>9.3f}{m_old / 1024:>10.0f}"
+                     f"{m_new / 1024:>9.0f}{t_rows_old:>11.3f}{t_rows_new:>11.3f}{kb_old:>8.0f}{kb_new:>8.1f}  "
+                     f"{'yes' if same else 'NO'}")
+    verdict = "OK" if same_all == total_all else "MISMATCH"
+    lines.append(f"VERIFY {verdict}: {same_all}/{total_all} entries with identical lookups and report rows")
+    return lines
+
+# ------------------------ CLI ------------------------ #
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Benchmark optimizer variants on the stored weekly prediction CSVs.")
+    p.add_argument("--root", type=str, default=os.path.join(HERE, "weekly_team_predictions"))
+    p.add_argument("--gws", nargs="*", default=[], help="Gameweek folders to use, e.g. gw9 gw10 (default: all usable)")
+    p.add_argument("--horizon", choices=["1gw", "3gw"], default="1gw")
+    p.add_argument("--max_transfers", type=int, default=5)
+    p.add_argument("--suite", choices=SUITES, nargs="*", default=None, help="Suites to run (default: all)")
+    p.add_argument("--outfile", type=str, default="bench_output.txt")
+    p.add_argument("--jobs", type=int, default=4, help="Worker processes for the 'jobs' and 'chips' suites")
+    return p.parse_args()
+
+def main():
+    args = parse_args()
+    entries = load_weekly_entries(args.root, args.gws or None, args.horizon)
+    if not entries:
+        raise SystemExit(f"No usable weekly data under {args.root} (need *_{args.horizon}_adjusted.csv + enhanced report).")
+    print(f"Loaded {len(entries)} entries: {', '.join(e['label'] for e in entries)}")
+
+    max_k = max(0, min(5, int(args.max_transfers)))
+    suites = args.suite or SUITES
+    lines: List[str] = []
+    for name in suites:
+        if name == "formation_mode":
+            lines += bench_formation_mode(entries, max_k, DEFAULT_FORMATIONS)
+        elif name == "persistent":
+            lines += bench_persistent(entries, max_k, DEFAULT_FORMATIONS)
+        elif name == "objective":
+            lines += bench_objective(entries, max_k, DEFAULT_FORMATIONS)
+        elif name == "build":
+            lines += bench_build(entries, max_k, DEFAULT_FORMATIONS)
+        elif name == "solver":
+            lines += bench_solver(entries, max_k, DEFAULT_FORMATIONS)
+        elif name == "presolve":
+            lines += bench_presolve(entries, max_k, DEFAULT_FORMATIONS)
+        elif name == "jobs":
+            lines += bench_jobs(entries, max_k, DEFAULT_FORMATIONS, args.jobs)
+        elif name == "frontier":
+            lines += bench_frontier(entries, max_k, DEFAULT_FORMATIONS)
+        elif name == "horizon":
+            lines += bench_horizon(entries)
+        elif name == "chips":
+            lines += bench_chips(entries, args.jobs)
+        elif name == "dp":
+            lines += bench_dp(entries, DEFAULT_FORMATIONS)
+        elif name == "prune":
+            lines += bench_prune(entries, max_k, DEFAULT_FORMATIONS)
+        elif name == "quick":
+            lines += bench_quick(entries, max_k, DEFAULT_FORMATIONS)
+        elif name == "scenarios":
+            lines += bench_scenarios(entries, [(3, 4, 3), (4, 4, 2)])
+        elif name == "sims":
+            lines += bench_sims(entries, max_k, DEFAULT_FORMATIONS)
+        elif name == "warm":
+            lines += bench_warm(entries, max_k, DEFAULT_FORMATIONS)
+        elif name == "exact":
+            lines += bench_exact(entries, DEFAULT_FORMATIONS)
+        elif name == "combos":
+            lines += bench_combos(entries)
+        elif name == "pool":
+            lines += bench_pool(entries, max_k, DEFAULT_FORMATIONS)
+        lines.append("=" * 96)
+
+    text = "\n".join(lines)
+    print(text)
+    with open(args.outfile, "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+    print(f"\nSaved: {args.outfile}")
+
+if __name__ == "__main__":
+    main()
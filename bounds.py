@@ -0,0 +1,99 @@
+# bounds.py – LP-relaxation bounds to skip formation passes that cannot win
+# --------------------------------------------------------
+# Every formation pass used to be solved to optimality (two or three MILPs for the
+# lexicographic chain), although the best is picked on XI points first. The LP
+# relaxation of a pass's XI objective bounds what that pass can score, and one LP
+# is much cheaper than the chain. So all passes are bounded first, solved in
+# descending bound order, and a pass is skipped once its bound is below the best
+# XI points found so far (minus PRUNE_TOL for solver tolerances). A skipped pass
+# scores strictly less than the incumbent, so it could not have won or tied: the
+# pick, made in pass order afterwards, is the same as solving every pass.
+# An infeasible LP proves the pass infeasible, so it is skipped as well.
+#
+# The relaxation must bound the XI points the caller ranks by. Rows that the
+# ranking ignores (e.g. the transfer model re-arranges the XI without the bench
+# cap) are handed over as `relax`: (constraint name, loose rhs) pairs, loosened for
+# the LP only.
+
+from time import perf_counter
+from typing import Callable, List, Optional
+
+from pulp import LpStatus, value
+
+from solvers import make_solver
+
+PRUNE_TOL = 1e-4  # bound must fall this far below the incumbent's XI points
+
+
+def lp_bound(m, objective, solver: str = "cbc", relax=(), tmp_dir: str = None) -> Optional[float]:
+    """
+    LP-relaxation optimum of `objective` over model m; None if the LP is infeasible,
+    +inf if the solver gives no bound. The model's objective, right-hand sides and
+    variable values (the next MIP start) are put back afterwards.
+    """
+    saved_obj = m.objective
+    saved_vals = {v.name: v.varValue for v in m.variables()}
+    saved_rhs = [(nm, -m.constraints[nm].constant) for nm, _ in relax]
+    try:
+        for nm, rhs in relax:
+            m.constraints[nm].changeRHS(rhs)
+        m.objective = objective
+        status = m.solve(make_solver(solver, mip=False, tmp_dir=tmp_dir))
+        if LpStatus[status] == "Infeasible":
+            return None
+        if LpStatus[status] != "Optimal":
+            return float("inf")
+        return value(objective)
+    finally:
+        for nm, rhs in saved_rhs:
+            m.constraints[nm].changeRHS(rhs)
+        m.objective = saved_obj
+        for v in m.variables():
+            v.varValue = saved_vals.get(v.name)
+
+
+def bound_and_prune(n_passes: int, bound_pass: Callable, solve_pass: Callable, prune: bool = True):
+    """
+    bound_pass(j) -> upper bound on pass j's XI points (None: infeasible).
+    solve_pass(j) -> (XI points, result) or None.
+    Returns ([result or None per pass, in pass order], stats); stats counts the
+    passes solved, skipped on their bound and shown infeasible by the LP.
+    prune=False only orders the passes (a deadline run still wants the best first).
+    """
+    t0 = perf_counter()
+    bounds = [bound_pass(j) for j in range(n_passes)]
+    bound_s = perf_counter() - t0
+
+    results: List = [None] * n_passes
+    best = None
+    stats = {"passes": n_passes, "solved": 0, "pruned": 0, "lp_infeasible": 0, "bound_s": bound_s}
+    # Highest bound first (pass order on ties) gives a strong incumbent early
+    for j in sorted(range(n_passes), key=lambda j: (bounds[j] is None, -(bounds[j] or 0.0), j)):
+        if bounds[j] is None:
+            stats["lp_infeasible"] += 1
+            continue
+        if prune and best is not None and bounds[j] < best - PRUNE_TOL:
+            stats["pruned"] += 1
+            continue
+        out = solve_pass(j)
+        stats["solved"] += 1
+        if out is not None:
+            score, results[j] = out
+            best = score if best is None else max(best, score)
+    stats["total_s"] = perf_counter() - t0
+    return results, stats
+
+
+def total_stats(stats) -> dict:
+    """Several bound_and_prune() stats (e.g. one per k) added up."""
+    stats = list(stats)
+    return {key: sum(st[key] for st in stats)
+            for key in ("passes", "solved", "pruned", "lp_infeasible", "bound_s", "total_s")}
+
+
+def prune_summary(stats: dict, label: str = "formation passes") -> str:
+    """One-line report of a bound_and_prune() run."""
+    avoided = stats["pruned"] + stats["lp_infeasible"]
+    return (f"Bound-and-prune: solved {stats['solved']}/{stats['passes']} {label}, "
+            f"{avoided} avoided ({stats['pruned']} on bound, {stats['lp_infeasible']} LP-infeasible); "
+            f"bounds {stats['bound_s']:.2f}s of {stats['total_s']:.2f}s")
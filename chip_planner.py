@@ -0,0 +1,303 @@
+# chip_planner.py – chip calendar (wildcard, free hit, bench boost, triple captain)
+# --------------------------------------------------------
+# free_hit_1gw / wildcard_3gw_only / wildcard_compare_3gw_1gw answer "which squad if
+# I play the chip this week". ChipPlanner scores every placement of the chips over
+# the remaining horizon and returns the best calendar.
+#
+# A scenario fixes the wildcard and free-hit GWs (or leaves them unplayed) and is
+# played forward from the owned squad with the existing solvers:
+#   - GWs between chips: MultiGWPlanner over that stretch (transfers, bank, FT rollover);
+#   - free hit in GW g: the wildcard formation models on GW g's points, budget =
+#     squad value + bank; the old squad comes back the week after;
+#   - wildcard in GW g: the same models on the points summed over GWs
+#     g..g+wildcard_gws-1; the new squad carries on.
+# Free transfers carry over a chip week (+1, capped), as in FPL since 2024/25.
+# Bench boost and triple captain don't change which squads are picked here, so each
+# scenario places them afterwards, on the chip-free GWs with the most bench points
+# and captain points (the best XI player's points). A scenario's score is XI points
+# - hits + those chip gains; as in the other reports, the captain's normal double
+# isn't counted.
+#
+# Scenarios are independent and run through map_jobs(). Every piece (a stretch
+# from a given squad/bank/FT, a free-hit or wildcard squad for a budget) is memoized
+# in a shared_memo() dict keyed by its inputs, so scenarios that share a prefix or
+# a chip budget reuse it instead of solving it again.
+
+import itertools
+from time import perf_counter
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from multi_gw_model import MAX_FT, MultiGWPlanner, gw_columns
+from solvers import map_jobs, shared_memo, solver_tmp_dir
+from utils_2025 import VALID_FORMATIONS, _mk_uid, _solve_for_formation, arrange_xi_over_formations
+
+CHIPS = ("wildcard", "free_hit", "bench_boost", "triple_captain")
+
+
+class ChipPlanner:
+    """
+    Chip calendar over `horizon` GWs for one pool/owned squad.
+
+    plan(jobs) -> {"best": scenario, "scenarios": [scenario, ...], "wall_s"} with
+    scenarios best first (infeasible ones last, score None). A scenario is
+      {"chips": {chip: GW or None}, "score", "xi_points", "hits", "chip_points",
+       "gws": [per-GW dict], "elapsed_s", "pieces", "solves"}
+    where pieces counts the stretches/chip squads the scenario needed and solves
+    the ones it had to solve rather than find memoized.
+
+    pool_df needs 'key' and Points_gw1..Points_gwH (multi_gw_model.horizon_points()).
+    """
+
+    def __init__(
+        self,
+        pool_df: pd.DataFrame,
+        owned_df: pd.DataFrame,
+        bank_m: float,
+        horizon: int,
+        chips=CHIPS,
+        free_transfers: int = 1,
+        hit_cost: float = 4.0,
+        max_transfers_per_gw: int = 2,
+        max_ft: int = MAX_FT,
+        max_per_team: int = 3,
+        bench_budget: float = 20.0,
+        wildcard_gws: int = 3,
+        formations=None,
+        keep_names=None,
+        exclude_names=None,
+        solver: str = "cbc",
+        stretch_time_limit: float | None = None,
+    ):
+        unknown = set(chips) - set(CHIPS)
+        if unknown:
+            raise ValueError(f"chips must be among {CHIPS}, got {sorted(unknown)}")
+        missing = set(gw_columns(horizon)) - set(pool_df.columns)
+        if missing:
+            raise ValueError(f"pool_df is missing per-GW points {sorted(missing)} (see horizon_points)")
+
+        self.horizon = horizon
+        self.chips = tuple(c for c in CHIPS if c in chips)
+        self.free_transfers = min(max_ft, max(0, int(free_transfers)))
+        self.hit_cost = hit_cost
+        self.max_transfers_per_gw = max_transfers_per_gw
+        self.max_ft = max_ft
+        self.max_per_team = max_per_team
+        self.bench_budget = bench_budget
+        self.wildcard_gws = wildcard_gws
+        self.formations = formations or VALID_FORMATIONS
+        self.keep_names = set(keep_names or [])
+        self.exclude_names = set(exclude_names or [])
+        self.solver = solver
+        self.stretch_time_limit = stretch_time_limit
+        self.bank_m = float(bank_m)
+
+        # Squads are tuples of pool row positions (the planner's PIDs)
+        pool = pool_df.reset_index(drop=True)
+        self.pool = pool
+        self.pos = pool["Position"].to_dict()
+        self.price = pool["Price"].astype(float).to_dict()
+        self.pts = [pool[c].astype(float).to_dict() for c in gw_columns(horizon)]
+        pid_by_key = {k: i for i, k in enumerate(pool["key"])}
+        self.owned = tuple(sorted({pid_by_key[k] for k in owned_df["key"] if k in pid_by_key}))
+        self.pid_by_uid = {_mk_uid(r.Name, r.Team, r.Price): i for i, r in enumerate(pool.itertuples())}
+
+    def scenarios(self) -> List[Dict[str, Optional[int]]]:
+        """Every wildcard/free-hit placement (GW numbers, None = not played), one chip per GW."""
+        gws = [None] + list(range(1, self.horizon + 1))
+        wc_opts = gws if "wildcard" in self.chips else [None]
+        fh_opts = gws if "free_hit" in self.chips else [None]
+        return [{"wildcard": wc, "free_hit": fh} for wc, fh in itertools.product(wc_opts, fh_opts)
+                if wc is None or wc != fh]
+
+    # ------------------------ Pieces ------------------------ #
+
+    def _arrange(self, squad, g: int) -> dict:
+        """Best XI of a fixed squad for GW g (0-based) with its bench and captain points."""
+        pts = self.pts[g]
+        best = arrange_xi_over_formations(squad, self.pos, pts, self.formations)
+        return {
+            "starting": best["xi"],
+            "bench": sorted(best["bench"], key=lambda i: pts[i], reverse=True),
+            "xi_points": best["xi_points"],
+            "bench_points": sum(pts[i] for i in best["bench"]),
+            "captain_points": max(pts[i] for i in best["xi"]),
+        }
+
+    def _stretch(self, squad, bank: float, ft: int, a: int, b: int, tmp_dir=None):
+        """MultiGWPlanner over GWs a..b (0-based) from a squad/bank/FT -> (GW dicts, end state) or None."""
+        cols = gw_columns(self.horizon)
+        seg = self.pool.drop(columns=cols)
+        for col, src in zip(gw_columns(b - a + 1), cols[a:b + 1]):
+            seg[col] = self.pool[src]
+        planner = MultiGWPlanner(
+            seg, self.pool.iloc[list(squad)], bank, b - a + 1,
+            free_transfers=ft,
+            hit_cost=self.hit_cost,
+            max_transfers_per_gw=self.max_transfers_per_gw,
+            max_ft=self.max_ft,
+            max_per_team=self.max_per_team,
+            bench_budget=self.bench_budget,
+            keep_names=self.keep_names,
+            exclude_names=self.exclude_names,
+            solver=self.solver,
+            time_limit=self.stretch_time_limit,
+            tmp_dir=tmp_dir,
+        )
+        plan = planner.plan()
+        if plan is None:
+            return None
+        gws = []
+        for gw in plan["gws"]:
+            g = a + gw["gw"] - 1
+            gws.append({
+                "gw": g + 1, "chip": None,
+                "squad": gw["squad"], "starting": gw["starting"], "bench": gw["bench"],
+                "in": gw["in"], "out": gw["out"], "transfers": gw["transfers"],
+                "ft": gw["ft"], "hits": gw["hits"], "bank": gw["bank"],
+                "xi_points": gw["xi_points"], "bench_points": gw["bench_points"],
+                "captain_points": max(self.pts[g][i] for i in gw["starting"]),
+            })
+        last = plan["gws"][-1]
+        end_ft = min(self.max_ft, max(0, last["ft"] - last["transfers"]) + 1)
+        return gws, (tuple(sorted(last["squad"])), last["bank"], end_ft)
+
+    def _chip_squad(self, budget: float, g: int, n_gws: int, tmp_dir=None):
+        """
+        Fresh squad for GWs g..g+n_gws-1 (summed points), arranged for GW g, or None.
+        Kept players stay through a wildcard; a free hit is free to drop them.
+        """
+        df = self.pool[["Name", "Team", "Position", "Price"]].copy()
+        df["Points"] = self.pool[gw_columns(self.horizon)[g:g + n_gws]].sum(axis=1)
+        best_key, best = None, None
+        for f in self.formations:
+            ok, payload = _solve_for_formation(
+                df, budget, f, self.bench_budget, max_per_team=self.max_per_team,
+                included_players=self.keep_names if n_gws > 1 else None,
+                excluded_players=self.exclude_names, solver=self.solver, tmp_dir=tmp_dir,
+            )
+            if not ok:
+                continue
+            # Same pick as wildcard_team_11
+            key = (payload["starting_points"], -payload["total_budget_used"], payload["bench_points"])
+            if best_key is None or key > best_key:
+                best_key, best = key, payload
+        if best is None:
+            return None
+        squad = sorted(self.pid_by_uid[u] for u in best["starting_uids"] + best["bench_uids"])
+        return dict(self._arrange(squad, g), squad=squad, cost=best["total_budget_used"])
+
+    def _place_boosts(self, gws: List[dict]) -> float:
+        """Put bench boost / triple captain on distinct chip-free GWs for the largest gain."""
+        free = [r for r in gws if r["chip"] is None]
+        bb_opts = free + [None] if "bench_boost" in self.chips else [None]
+        tc_opts = free + [None] if "triple_captain" in self.chips else [None]
+        best_gain, best_bb, best_tc = 0.0, None, None
+        for bb, tc in itertools.product(bb_opts, tc_opts):
+            if bb is not None and bb is tc:
+                continue
+            gain = (bb["bench_points"] if bb else 0.0) + (tc["captain_points"] if tc else 0.0)
+            if gain > best_gain + 1e-9:
+                best_gain, best_bb, best_tc = gain, bb, tc
+        if best_bb is not None:
+            best_bb["chip"] = "bench_boost"
+        if best_tc is not None:
+            best_tc["chip"] = "triple_captain"
+        return best_gain
+
+    # ------------------------ Scenarios ------------------------ #
+
+    def evaluate(self, placement: Dict[str, Optional[int]], memo, tmp_dir=None) -> dict:
+        """Play one wildcard/free-hit placement forward; memo is shared between scenarios."""
+        t_start = perf_counter()
+        pieces = solves = 0
+
+        def _memoized(key, fn):
+            nonlocal pieces, solves
+            pieces += 1
+            if key in memo:
+                return memo[key]
+            out = fn()
+            memo[key] = out
+            solves += 1
+            return out
+
+        H = self.horizon
+        chip_at = {gw - 1: chip for chip, gw in placement.items() if gw}
+        squad, bank, ft = self.owned, self.bank_m, self.free_transfers
+        gws: List[dict] = []
+        feasible = True
+
+        t = 0
+        for c in sorted(chip_at) + [H]:
+            if c > t:
+                out = _memoized(("stretch", squad, round(bank, 2), ft, t, c - 1),
+                                lambda: self._stretch(squad, bank, ft, t, c - 1, tmp_dir))
+                if out is None:
+                    feasible = False
+                    break
+                stretch_gws, (squad, bank, ft) = out
+                gws.extend(dict(r) for r in stretch_gws)
+            if c == H:
+                break
+
+            chip = chip_at[c]
+            budget = round(sum(self.price[i] for i in squad) + bank, 2)
+            n_gws = self.wildcard_gws if chip == "wildcard" else 1
+            rec = _memoized((chip, budget, c), lambda: self._chip_squad(budget, c, n_gws, tmp_dir))
+            if rec is None:
+                feasible = False
+                break
+            new_bank = budget - rec["cost"] if chip == "wildcard" else bank
+            gws.append(dict(
+                rec, gw=c + 1, chip=chip,
+                **{"in": sorted(set(rec["squad"]) - set(squad)), "out": sorted(set(squad) - set(rec["squad"]))},
+                transfers=0, ft=ft, hits=0, bank=new_bank,
+            ))
+            if chip == "wildcard":
+                squad, bank = tuple(rec["squad"]), new_bank
+            ft = min(self.max_ft, ft + 1)
+            t = c + 1
+
+        chips = {c: placement.get(c) for c in self.chips}
+        if not feasible:
+            return {"chips": chips, "score": None, "gws": [], "elapsed_s": perf_counter() - t_start,
+                    "pieces": pieces, "solves": solves}
+
+        gain = self._place_boosts(gws)
+        for r in gws:
+            if r["chip"] in ("bench_boost", "triple_captain"):
+                chips[r["chip"]] = r["gw"]
+        xi = sum(r["xi_points"] for r in gws)
+        hits = sum(r["hits"] for r in gws)
+        return {
+            "chips": chips,
+            "score": xi - self.hit_cost * hits + gain,
+            "xi_points": xi,
+            "hits": hits,
+            "chip_points": gain,
+            "gws": gws,
+            "elapsed_s": perf_counter() - t_start,
+            "pieces": pieces,
+            "solves": solves,
+        }
+
+    def plan(self, jobs: int = 1) -> dict:
+        """Evaluate every placement (over `jobs` processes) and rank them."""
+        t_start = perf_counter()
+        placements = self.scenarios()
+        with shared_memo(jobs) as memo:
+            results = map_jobs(_evaluate_isolated, [(self, p, memo) for p in placements], jobs)
+        feasible = sorted((r for r in results if r["score"] is not None), key=lambda r: -r["score"])
+        return {
+            "best": feasible[0] if feasible else None,
+            "scenarios": feasible + [r for r in results if r["score"] is None],
+            "wall_s": perf_counter() - t_start,
+        }
+
+
+def _evaluate_isolated(planner: ChipPlanner, placement, memo):
+    """Process-pool task: one scenario with its own solver temp directory."""
+    with solver_tmp_dir() as tmp:
+        return planner.evaluate(placement, memo, tmp)
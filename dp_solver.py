@@ -0,0 +1,196 @@
+# dp_solver.py – exact squad selection by dynamic programming on integer prices
+# --------------------------------------------------------
+# FPL prices are multiples of £0.1m, so a budget is a small integer number of tenths
+# (1000 for £100m). Without a bench (the XI-only wildcard/free hit) the squad MILP
+# is a knapsack with exact position counts and a per-club cap, which this solves
+# exactly without a MILP solver:
+#   1. per position: best[k, c] = max points of k players costing exactly c tenths
+#      (0/1 knapsack over that position's players, numpy over c);
+#   2. each table is cut to its Pareto frontier (cheapest cost for more points) and
+#      the positions are merged frontier by frontier; the cheapest squad within EPS
+#      of the best points wins (the MILP's cost tie-break);
+#   3. the club cap is left out of 1-2 and restored by branch and bound. If a club
+#      has more than `cap` picks s1..sm, child j bans s_j and forces s1..s_{j-1}
+#      (j = 1..cap+1), which splits the squads exactly. A node's DP value bounds
+#      its subtree, so nodes are expanded best first and cut against the incumbent.
+#      A child only loses players from a club's positions, so the other positions'
+#      tables are reused from a per-call memo.
+# The squad with a bench has a second (bench) budget and stays on the MILP.
+
+import heapq
+import math
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+EPS = 1e-6  # points closer than this tie (as the MILP's PIN rows)
+
+
+def to_tenths(price: float) -> int:
+    return int(round(float(price) * 10))
+
+
+def _position_table(cands: List, tenths: Dict, pts: Dict, need: int, max_c: int):
+    """best[need, c] over `cands` costing exactly c tenths, and per-player take flags for the traceback."""
+    best = np.full((need + 1, max_c + 1), -np.inf)
+    best[0, 0] = 0.0
+    takes = []
+    for i in cands:
+        p, v = tenths[i], pts[i]
+        take = np.zeros((need + 1, max_c + 1), dtype=bool)
+        if p <= max_c:
+            for k in range(need, 0, -1):  # k descending: best[k - 1] is still without player i
+                cand = best[k - 1, :max_c + 1 - p] + v
+                cur = best[k, p:]
+                better = cand > cur
+                take[k, p:] = better
+                cur[better] = cand[better]
+        takes.append(take)
+    return best[need], takes
+
+
+def _trace(cands: List, tenths: Dict, takes: List, k: int, c: int) -> List:
+    out = []
+    for j in range(len(cands) - 1, -1, -1):
+        if k == 0:
+            break
+        if takes[j][k, c]:
+            out.append(cands[j])
+            k -= 1
+            c -= tenths[cands[j]]
+    return out
+
+
+def _frontier(cost: np.ndarray, points: np.ndarray, budget_t: int):
+    """Indices of the (cost <= budget) entries that no cheaper-or-equal entry beats on points."""
+    ok = np.flatnonzero(np.isfinite(points) & (cost <= budget_t))
+    ok = ok[np.lexsort((-points[ok], cost[ok]))]
+    run = np.maximum.accumulate(points[ok])
+    keep = np.ones(len(ok), dtype=bool)
+    keep[1:] = points[ok][1:] > run[:-1]
+    return ok[keep]
+
+
+def _relaxed(ids: List, pos: Dict, tenths: Dict, pts: Dict, counts: Dict[str, int], budget_t: int,
+             memo: Dict, max_c: int) -> Optional[List]:
+    """
+    Best squad for the position counts and budget, club cap ignored; None if infeasible.
+    Position tables span costs 0..max_c so the memo serves every node of one call.
+    """
+    fronts = []
+    for P, need in counts.items():
+        cands = [i for i in ids if pos[i] == P]
+        if len(cands) < need:
+            return None
+        key = (P, need, tuple(cands))
+        if key not in memo:
+            row, takes = _position_table(cands, tenths, pts, need, max_c)
+            f = _frontier(np.arange(len(row)), row, max_c)
+            memo[key] = (takes, f, row[f])
+        takes, c, p = memo[key]
+        n = np.searchsorted(c, budget_t, side="right")  # a frontier under a smaller budget is a prefix
+        fronts.append((need, cands, takes, c[:n], p[:n]))
+
+    # Merge the frontiers; back[t][j] = (index into the merged-so-far, index into frontier t).
+    # The last merge only needs its best entry, not a frontier.
+    cost, points = fronts[0][3], fronts[0][4]
+    back = []
+    for t, (_, _, _, c2, p2) in enumerate(fronts[1:], 1):
+        c = (cost[:, None] + c2[None, :]).ravel()
+        p = (points[:, None] + p2[None, :]).ravel()
+        f = _frontier(c, p, budget_t) if t < len(fronts) - 1 else np.flatnonzero(c <= budget_t)
+        back.append(np.divmod(f, len(c2)))
+        cost, points = c[f], p[f]
+    if not len(cost):
+        return None
+    tied = np.flatnonzero(points >= points.max() - EPS)
+    j = int(tied[np.argmin(cost[tied])])
+
+    # Unwind the merges into one frontier entry per position, then trace its players
+    picks = [0] * len(fronts)
+    for t in range(len(fronts) - 1, 0, -1):
+        prev, picks[t] = back[t - 1][0][j], back[t - 1][1][j]
+        j = prev
+    picks[0] = j
+    picked = []
+    for (need, cands, takes, c, _), j in zip(fronts, picks):
+        picked += _trace(cands, tenths, takes, need, int(c[j]))
+    return picked
+
+
+def dp_best_squad(
+    ids: Iterable,
+    pos: Dict,
+    team: Dict,
+    price: Dict,
+    pts: Dict,
+    counts: Dict[str, int],
+    budget: float,
+    max_per_team: int,
+    forced: Iterable = (),
+) -> Optional[dict]:
+    """
+    Best squad with exactly counts[P] players per position, total price <= budget,
+    at most max_per_team per club and every `forced` id in it: max points, then min
+    cost. Returns {"ids", "points", "cost", "nodes"} or None if there is none.
+    """
+    ids = list(ids)
+    tenths = {i: to_tenths(price[i]) for i in ids}
+    budget_t = int(math.floor(float(budget) * 10 + 1e-6))
+    counts = {P: n for P, n in counts.items() if n > 0}
+    tables: Dict = {}
+    nodes = 0
+
+    def _node(banned: frozenset, fixed: tuple):
+        nonlocal nodes
+        nodes += 1
+        need = dict(counts)
+        for i in fixed:
+            need[pos[i]] = need.get(pos[i], 0) - 1
+        left = budget_t - sum(tenths[i] for i in fixed)
+        if left < 0 or any(n < 0 for n in need.values()):
+            return None
+        if any(n > max_per_team for n in Counter(team[i] for i in fixed).values()):
+            return None
+        taken = banned | set(fixed)
+        picked = _relaxed([i for i in ids if i not in taken], pos, tenths, pts, need, left, tables, budget_t)
+        if picked is None:
+            return None
+        squad = list(fixed) + picked
+        return sum(pts[i] for i in squad), sum(tenths[i] for i in squad), banned, fixed, squad
+
+    def _beats(a, b) -> bool:
+        """(points, cost) a strictly better than b, points compared within EPS."""
+        if a[0] > b[0] + EPS:
+            return True
+        return abs(a[0] - b[0]) <= EPS and a[1] < b[1]
+
+    best = None
+    heap, seq = [], 0
+    root = _node(frozenset(), tuple(dict.fromkeys(forced)))
+    if root is not None:
+        heap.append((-root[0], root[1], seq, root))
+    while heap:
+        _, _, _, nd = heapq.heappop(heap)
+        bound, cost, banned, fixed, squad = nd
+        if best is not None and not _beats((bound, cost), best):
+            continue
+        clubs = Counter(team[i] for i in squad)
+        club, n = max(clubs.items(), key=lambda kv: kv[1])
+        if n <= max_per_team:
+            best = (bound, cost, squad)
+            continue
+        n_fixed = sum(1 for i in fixed if team[i] == club)
+        # Banning the club's best pick first gives the first child the biggest drop, so it is cut soonest
+        free = sorted((i for i in squad if team[i] == club and i not in fixed), key=lambda i: -pts[i])
+        branch = free[:max_per_team - n_fixed + 1]
+        for j, i in enumerate(branch):
+            child = _node(banned | {i}, fixed + tuple(branch[:j]))
+            if child is not None and (best is None or _beats(child[:2], best)):
+                seq += 1
+                heapq.heappush(heap, (-child[0], child[1], seq, child))
+
+    if best is None:
+        return None
+    return {"ids": best[2], "points": best[0], "cost": best[1] / 10.0, "nodes": nodes}
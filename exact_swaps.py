@@ -0,0 +1,324 @@
+# exact_swaps.py – exact transfer search for k <= 2 without a MILP
+# --------------------------------------------------------
+# With at most two transfers the squads in reach are few enough to score them
+# all: the current 15, every same-position 1-for-1 swap and every pair of them.
+# (The 2/5/5/3 squad shape means a sale can only be replaced in its position.)
+#   enumeration – per sale (or pair of sales) the buys are taken from per-position
+#                 arrays sorted by price, so the budget cuts each range with one
+#                 searchsorted and over-budget buys are never generated; buys that
+#                 k no dearer, no worse players from clubs with room dominate are
+#                 dropped first. The club cap is checked per block in numpy.
+#   scoring     – a move only changes the positions it touches: their 2/5/5/3
+#                 points are re-sorted for the whole block and the XI of every
+#                 formation is read off prefix sums; untouched positions keep the
+#                 current squad's prefix sums.
+# Each formation pass then picks what its MILP would: max XI points (with the
+# bench cap and the include-start players), then bench points, then the lowest
+# total cost. Where the best XI's bench (cheapest among equal points) breaks the
+# bench cap, the XI is found by trying every bench of that formation, but only
+# for the moves whose uncapped XI could still beat the best found, and after
+# every move that needs no such search has set that best.
+
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+POSITIONS = ("Goalkeeper", "Defender", "Midfielder", "Forward")
+CAPS = {"Goalkeeper": 2, "Defender": 5, "Midfielder": 5, "Forward": 3}
+MAX_K = 2
+ROUND = 6  # decimals points and costs are compared on, so float noise can't reorder ties
+TOL = 1e-9
+CHUNK = 1024  # capped moves whose benches are tried per round
+
+
+def _ranges(lo: np.ndarray, hi: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(row, value) for every value in lo[row] <= value < hi[row], rows in order."""
+    counts = np.maximum(hi - lo, 0)
+    rows = np.repeat(np.arange(len(lo)), counts)
+    starts = np.cumsum(counts) - counts
+    return rows, np.arange(counts.sum()) - np.repeat(starts, counts) + np.repeat(lo, counts)
+
+
+def _prefix(pts: np.ndarray, price: np.ndarray, forced: np.ndarray):
+    """
+    Prefix sums (with a leading 0 column) of points and price over each row sorted
+    forced first, then points, then price (all descending): column n is the best
+    n-player XI part with the dearest players among equal points in it.
+    """
+    order = np.lexsort((-price, -pts, -forced), axis=-1)
+    zero = np.zeros(pts.shape[:-1] + (1,))
+    take = lambda a: np.concatenate([zero, np.cumsum(np.take_along_axis(a, order, axis=-1), axis=-1)], axis=-1)
+    return take(pts), take(price)
+
+
+def _cheapest(price: np.ndarray, forced: np.ndarray) -> np.ndarray:
+    """Prefix sums (leading 0 column) of each row's prices, cheapest first, forced players never benched."""
+    cheap = np.sort(np.where(forced > 0, np.inf, price), axis=-1)
+    return np.concatenate([np.zeros(price.shape[:-1] + (1,)), np.cumsum(cheap, axis=-1)], axis=-1)
+
+
+def _key_at(n: int, xi: np.ndarray, total: np.ndarray, cost: np.ndarray) -> tuple:
+    """(XI points, bench points, -cost) of move n, rounded like every comparison here."""
+    return xi[n], round(total[n] - xi[n], ROUND), -round(cost[n], ROUND)
+
+
+def _lex_best(xi: np.ndarray, total: np.ndarray, cost: np.ndarray) -> Optional[int]:
+    """First move with the most XI points, then bench points, then the lowest cost (None if none is finite)."""
+    ok = np.isfinite(xi)
+    if not ok.any():
+        return None
+    bench, cost = np.round(total - xi, ROUND), np.round(cost, ROUND)
+    top = ok & (xi == xi[ok].max())
+    top &= bench == bench[top].max()
+    top &= cost == cost[top].min()
+    return int(np.argmax(top))
+
+
+class ExactSwaps:
+    """
+    Every squad within k <= MAX_K transfers of `owned` (exactly CAPS per position),
+    buying only from `buys`, total price <= budget, <= max_per_team per club, with
+    the `keep` ids never sold, the `sell` ids always sold (excluded owned players)
+    and the `start` ids always in the XI.
+    best(k) gives, per formation, the squad its MILP pass would pick.
+    """
+
+    def __init__(
+        self,
+        owned: Iterable,
+        buys: Iterable,
+        pos: Dict,
+        team: Dict,
+        price: Dict,
+        pts: Dict,
+        formations: List[Tuple[int, int, int]],
+        budget: float,
+        max_per_team: int = 3,
+        bench_budget: Optional[float] = None,
+        keep: Iterable = (),
+        sell: Iterable = (),
+        start: Iterable = (),
+    ):
+        self.owned = list(owned)
+        buys = list(buys)
+        self.formations = [(1,) + tuple(f) for f in formations]  # with the goalkeeper
+        self.budget = float(budget)
+        self.max_per_team = max_per_team
+        self.bench_budget = bench_budget
+        keep, sell, start = set(keep) | set(start), set(sell), set(start)
+
+        clubs = {c: n for n, c in enumerate(sorted({team[i] for i in self.owned} | {team[i] for i in buys}))}
+        self.cost = sum(price[i] for i in self.owned)
+        self.points = sum(pts[i] for i in self.owned)
+        self.count = np.bincount([clubs[team[i]] for i in self.owned], minlength=len(clubs))
+
+        # Owned players per position (in a fixed order) and their prefix sums
+        self.o_ids, self.o_pts, self.o_price, self.o_forced, self.o_club, self.o_top = {}, {}, {}, {}, {}, {}
+        self.o_cheap = {}
+        self.sell: List[Tuple[str, int]] = []  # (position, index in that position) of every sellable player
+        self.must = set()  # the same for the players that have to go
+        for P in POSITIONS:
+            ids = [i for i in self.owned if pos[i] == P]
+            self.o_ids[P] = ids
+            self.o_pts[P] = np.array([pts[i] for i in ids], dtype=float)
+            self.o_price[P] = np.array([price[i] for i in ids], dtype=float)
+            self.o_forced[P] = np.array([i in start for i in ids], dtype=float)
+            self.o_club[P] = np.array([clubs[team[i]] for i in ids], dtype=int)
+            self.o_top[P] = _prefix(self.o_pts[P], self.o_price[P], self.o_forced[P])
+            self.o_cheap[P] = _cheapest(self.o_price[P], self.o_forced[P])
+            self.sell += [(P, n) for n, i in enumerate(ids) if i not in keep]
+            self.must |= {(P, n) for n, i in enumerate(ids) if i in sell}
+
+        # Buys per position, cheapest first
+        owned_set = set(self.owned)
+        self.b_ids, self.b_pts, self.b_price, self.b_club = {}, {}, {}, {}
+        for P in POSITIONS:
+            ids = sorted((i for i in buys if pos[i] == P and i not in owned_set), key=lambda i: (price[i], i))
+            self.b_ids[P] = ids
+            self.b_pts[P] = np.array([pts[i] for i in ids], dtype=float)
+            self.b_price[P] = np.array([price[i] for i in ids], dtype=float)
+            self.b_club[P] = np.array([clubs[team[i]] for i in ids], dtype=int)
+
+        # Formations the include-start players can't fit in have no squad at all
+        n_start = {P: int(self.o_forced[P].sum()) for P in POSITIONS}
+        self.fits = [all(n_start[P] <= n for P, n in zip(POSITIONS, f)) for f in self.formations]
+        self.n_moves = 0
+
+    # ------------------------ Enumeration ------------------------ #
+
+    def _live(self, P: str, k: int) -> np.ndarray:
+        """
+        Indices of the position's buys worth trying with k transfers. A buy is
+        dropped when k others are no dearer and score no less (one of them is free
+        for any move it is in) from clubs with room for k more: swapping it for one
+        of those keeps the move legal and no worse on XI, bench or cost. Of two
+        equal players the earlier (cheaper, lower id) one is kept.
+        """
+        price, pts = self.b_price[P], self.b_pts[P]
+        n = np.arange(len(price))
+        safe = self.count[self.b_club[P]] <= self.max_per_team - k
+        tie = (price[:, None] == price[None, :]) & (pts[:, None] == pts[None, :])
+        better = (price[:, None] <= price[None, :]) & (pts[:, None] >= pts[None, :]) & (~tie | (n[:, None] < n[None, :]))
+        return np.flatnonzero((better & safe[:, None]).sum(axis=0) < k)
+
+    def _blocks(self, k: int):
+        """
+        (sales, buy positions, buys) blocks: `sales` is a tuple of (position, index),
+        buys a (moves, len(sales)) array of indices into the sales' positions' buy lists.
+        """
+        live = {P: self._live(P, k) for P in POSITIONS}
+        if self.cost <= self.budget + TOL and not self.must:
+            yield (), (), np.zeros((1, 0), dtype=int)
+        slack = self.budget - self.cost + TOL
+        if k >= 1:
+            for P, s in self.sell:
+                if not self.must <= {(P, s)}:
+                    continue
+                n = np.searchsorted(self.b_price[P][live[P]], slack + self.o_price[P][s], side="right")
+                yield ((P, s),), (P,), live[P][:n, None]
+        if k >= 2:
+            for (P, s), (Q, t) in combinations(self.sell, 2):
+                if not self.must <= {(P, s), (Q, t)}:
+                    continue
+                left = slack + self.o_price[P][s] + self.o_price[Q][t]
+                a, c = self.b_price[P][live[P]], self.b_price[Q][live[Q]]
+                hi = np.searchsorted(c, left - a, side="right")
+                # Same position: unordered pairs of distinct buys (second after first)
+                lo = np.arange(len(a)) + 1 if P == Q else np.zeros(len(a), dtype=int)
+                first, second = _ranges(lo, hi)
+                yield ((P, s), (Q, t)), (P, Q), np.column_stack([live[P][first], live[Q][second]])
+
+    def _legal(self, sales, buy_pos, B) -> np.ndarray:
+        """Club cap after each move in the block (the budget is already met)."""
+        clubs = [self.b_club[P][B[:, j]] for j, P in enumerate(buy_pos)]
+        sold = [self.o_club[P][s] for P, s in sales]
+        ok = np.ones(len(B), dtype=bool)
+        for c in clubs:
+            n = self.count[c] + sum((c == d) for d in clubs) - sum((c == d) for d in sold)
+            ok &= n <= self.max_per_team
+        return ok
+
+    # ------------------------ Scoring ------------------------ #
+
+    def _position_rows(self, sales, buy_pos, B):
+        """Per touched position: (points, price, forced) matrices of its players after each move."""
+        rows = {}
+        for P in {P for P, _ in sales}:
+            keep = [n for n in range(len(self.o_ids[P])) if (P, n) not in sales]
+            cols = [j for j, Q in enumerate(buy_pos) if Q == P]
+            shape = (len(B), len(keep))
+            rows[P] = tuple(
+                np.concatenate([np.broadcast_to(own[keep], shape)] + [bought[B[:, j]][:, None] for j in cols], axis=1)
+                for own, bought in ((self.o_pts[P], self.b_pts[P]), (self.o_price[P], self.b_price[P]),
+                                    (self.o_forced[P], np.zeros(len(self.b_pts[P]))))
+            )
+        return rows
+
+    def _capped_xi(self, rows, n_moves: int, f, total) -> np.ndarray:
+        """Best XI points of formation f per move when the bench must fit bench_budget (-inf if none does)."""
+        bench_pts, bench_price = np.zeros((n_moves, 1)), np.zeros((n_moves, 1))
+        for P, n in zip(POSITIONS, f):
+            if P in rows:
+                pts, price, forced = rows[P]
+            else:
+                pts, price, forced = (np.broadcast_to(a, (n_moves, len(a)))
+                                      for a in (self.o_pts[P], self.o_price[P], self.o_forced[P]))
+            subs = list(combinations(range(CAPS[P]), CAPS[P] - n))
+            subs = np.array(subs, dtype=int).reshape(len(subs), CAPS[P] - n)
+            sub_pts = pts[:, subs].sum(axis=-1)
+            # A forced starter on the bench makes that bench impossible
+            sub_price = np.where(forced[:, subs].any(axis=-1), np.inf, price[:, subs].sum(axis=-1))
+            bench_pts = (bench_pts[:, :, None] + sub_pts[:, None, :]).reshape(n_moves, -1)
+            bench_price = (bench_price[:, :, None] + sub_price[:, None, :]).reshape(n_moves, -1)
+        fits = bench_price <= self.bench_budget + TOL
+        return np.where(fits, total[:, None] - bench_pts, -np.inf).max(axis=1)
+
+    def _formation_sums(self, rows, n_moves: int):
+        """
+        (moves, formations) arrays after each move: best XI points, that XI's price
+        and the cheapest bench the formation allows (inf if none: all forced starters).
+        """
+        f = np.array(self.formations)
+        xi = xi_cost = bench_min = 0.0
+        for p, P in enumerate(POSITIONS):
+            pts, price = _prefix(*rows[P]) if P in rows else self.o_top[P]
+            cheap = _cheapest(*rows[P][1:]) if P in rows else self.o_cheap[P]
+            xi = xi + pts[..., f[:, p]]
+            xi_cost = xi_cost + price[..., f[:, p]]
+            bench_min = bench_min + cheap[..., CAPS[P] - f[:, p]]
+        shape = (n_moves, len(f))
+        return np.broadcast_to(xi, shape), np.broadcast_to(xi_cost, shape), np.broadcast_to(bench_min, shape)
+
+    def best(self, k: int) -> List[Optional[List]]:
+        """Per formation: the squad (ids) its MILP pass picks with <= k transfers, or None."""
+        if k > MAX_K:
+            raise ValueError(f"ExactSwaps covers k <= {MAX_K}, got {k}")
+        blocks, cols = [], []
+        for sales, buy_pos, B in self._blocks(k):
+            B = B[self._legal(sales, buy_pos, B)]
+            if len(B):
+                blocks.append((sales, buy_pos, B))
+                cols.append(self._totals(sales, buy_pos, B)
+                            + self._formation_sums(self._position_rows(sales, buy_pos, B), len(B)))
+        self.n_moves = sum(len(B) for _, _, B in blocks)
+        if not blocks:
+            return [None] * len(self.formations)
+        block = np.concatenate([np.full(len(B), b) for b, (_, _, B) in enumerate(blocks)])
+        row = np.concatenate([np.arange(len(B)) for _, _, B in blocks])
+        total, cost, xi_all, xi_cost, bench_min = (np.concatenate(c) for c in zip(*cols))
+        xi_all = np.round(xi_all, ROUND)
+
+        def move(n):
+            sales, buy_pos, B = blocks[block[n]]
+            return sales, buy_pos, B[row[n]]
+
+        out = []
+        for fi in range(len(self.formations)):
+            if not self.fits[fi]:
+                out.append(None)
+                continue
+            xi = xi_all[:, fi]
+            capped = np.zeros(len(xi), dtype=bool)
+            if self.bench_budget is not None:
+                capped = cost - xi_cost[:, fi] > self.bench_budget + TOL
+            n = _lex_best(np.where(capped, -np.inf, xi), total, cost)
+            best_key = None if n is None else _key_at(n, np.where(capped, -np.inf, xi), total, cost)
+            best_move = None if n is None else move(n)
+            # Moves whose cheapest best-XI bench breaks the cap: their capped XI is at most
+            # the uncapped one, so only those that could still win (and have a bench cheap
+            # enough at all) get their benches tried, best first and a chunk at a time
+            todo = np.flatnonzero(capped & (bench_min[:, fi] <= self.bench_budget + TOL)) if capped.any() else []
+            todo = todo[np.argsort(-xi[todo], kind="stable")] if len(todo) else todo
+            for start in range(0, len(todo), CHUNK):
+                floor = best_key[0] if best_key is not None else -np.inf
+                chunk = todo[start:start + CHUNK]
+                chunk = chunk[xi[chunk] >= floor]
+                if not len(chunk):
+                    break
+                for b in dict.fromkeys(block[chunk].tolist()):
+                    idx = chunk[block[chunk] == b]
+                    sales, buy_pos, B = blocks[b]
+                    rows = self._position_rows(sales, buy_pos, B[row[idx]])
+                    xi_c = np.round(self._capped_xi(rows, len(idx), self.formations[fi], total[idx]), ROUND)
+                    n = _lex_best(xi_c, total[idx], cost[idx])
+                    if n is not None:
+                        key = _key_at(n, xi_c, total[idx], cost[idx])
+                        if best_key is None or key > best_key:
+                            best_key, best_move = key, move(idx[n])
+            out.append(None if best_move is None else self._squad(*best_move))
+        return out
+
+    def _totals(self, sales, buy_pos, B) -> Tuple[np.ndarray, np.ndarray]:
+        """Squad points and cost after each move in the block."""
+        total = self.points - sum(self.o_pts[P][s] for P, s in sales)
+        cost = self.cost - sum(self.o_price[P][s] for P, s in sales)
+        for j, P in enumerate(buy_pos):
+            total = total + self.b_pts[P][B[:, j]]
+            cost = cost + self.b_price[P][B[:, j]]
+        return np.broadcast_to(total, len(B)), np.broadcast_to(cost, len(B))
+
+    def _squad(self, sales, buy_pos, row) -> List:
+        sold = {self.o_ids[P][s] for P, s in sales}
+        bought = [self.b_ids[P][b] for P, b in zip(buy_pos, row)]
+        return [i for i in self.owned if i not in sold] + bought
@@ -1,14 +1,20 @@
 import argparse
 import sys
 import unicodedata
+from time import perf_counter
 from typing import Dict, List, Set, Tuple
 
 import pandas as pd
 import requests
 import numpy as np
-from pulp import (
-    LpProblem, LpMaximize, LpVariable, lpSum, PULP_CBC_CMD, LpStatus, value
-)
+from bounds import prune_summary, total_stats
+from local_search import quick_summary
+from transfer_model import FORMATION_MODES, TransferModel, frontier_lines, transfer_frontier
+from prepared_pool import PreparedPool
+from presolve import presolve_summary
+from gw_simulator import DEFAULT_SIMS, chance_by_key, sim_lines, simulate_payload
+from solvers import SOLVER_BACKENDS, Deadline, solve_label
+from utils_2025 import OBJECTIVE_MODES
 
 from weights_modules.blended_3gw import PRICE_WEIGHTS, PRICE_EFFECTIVENESS, TEAM_WEIGHTS, TEAM_EFFECTIVENESS, POS_WEIGHTS, POS_EFFECTIVENESS
 
@@ -59,6 +65,10 @@ def enhance_predictions(df: pd.DataFrame) -> pd.DataFrame:
     df['Points'] = df.apply(adjust_points, axis=1)
     return df
 
+def enhanced_pool(pool_df: pd.DataFrame) -> PreparedPool:
+    """enhance_predictions(pool_df) indexed once (prepared_pool.py), keeping Points_Original for the report."""
+    return PreparedPool(enhance_predictions(pool_df), extra=("Points_Original",))
+
 def _get_json(url: str) -> dict:
     r = requests.get(url, timeout=30)
     r.raise_for_status()
@@ -91,7 +101,9 @@ def fetch_bootstrap():
     elements["PositionAPI"] = elements["element_type"].map(POS_MAP)
     elements["PriceAPI"] = elements["now_cost"].astype(float) / 10.0
     elements["PointsAPI"] = pd.to_numeric(elements["ep_next"], errors="coerce").fillna(0.0)
-    return elements[["id", "NameAPI", "Team", "PositionAPI", "PriceAPI", "PointsAPI"]].copy()
+    # Percent chance of playing next round; empty means no news (fit)
+    elements["ChanceAPI"] = pd.to_numeric(elements.get("chance_of_playing_next_round"), errors="coerce")
+    return elements[["id", "NameAPI", "Team", "PositionAPI", "PriceAPI", "PointsAPI", "ChanceAPI"]].copy()
 
 def fetch_entry(entry_id: int):
     return _get_json(f"https://fantasy.premierleague.com/api/entry/{entry_id}/")
@@ -112,39 +124,6 @@ def get_current_event_id(entry_meta: dict, bootstrap_events_fallback: dict = Non
                 return int(e["id"])
     raise RuntimeError("Could not determine current gameweek for this entry.")
 
-def _arrange_best_xi_for_fixed_squad(
-    selected_pids,  # list of PIDs in the final 15
-    pts_dict,       # pid -> Points
-    pos_dict,       # pid -> Position
-    formation       # (DEF, MID, FWD)
-):
-    """
-    Given a fixed 15-man squad, choose the best XI (y[i]) to maximize starting points
-    subject to formation (1 GK, DEF/MID/FWD counts) and y[i] in {0,1}.
-    Returns (y_selected, b_selected) as lists of PIDs.
-    """
-    DEF, MID, FWD = formation
-    m = LpProblem("Arrange_Best_XI", LpMaximize)
-    y = LpVariable.dicts("start", selected_pids, 0, 1, cat="Binary")
-
-    # XI size
-    m += lpSum(y[i] for i in selected_pids) == 11
-
-    # Formation constraints
-    m += lpSum(y[i] for i in selected_pids if pos_dict[i] == "Goalkeeper") == 1
-    m += lpSum(y[i] for i in selected_pids if pos_dict[i] == "Defender")   == DEF
-    m += lpSum(y[i] for i in selected_pids if pos_dict[i] == "Midfielder") == MID
-    m += lpSum(y[i] for i in selected_pids if pos_dict[i] == "Forward")    == FWD
-
-    # Objective: maximize starting points
-    m.objective = lpSum(pts_dict[i] * y[i] for i in selected_pids)
-    m.solve(PULP_CBC_CMD(msg=False))
-
-    y_sel = [i for i in selected_pids if value(y[i]) > 0.5]
-    b_sel = [i for i in selected_pids if i not in y_sel]
-    return y_sel, b_sel
-
-
 def load_predictions_csv(path: str) -> pd.DataFrame:
     df = pd.read_csv(path)
     expected_cols = {"Name","Price","Position","Team","Points"}
@@ -252,27 +231,9 @@ def map_current_ids_to_csv_rows(
 
     return pool_df.reset_index(drop=True), owned_df.reset_index(drop=True), warnings
 
-def _arrange_best_xi_over_formations_for_fixed_squad(
-    selected_pids: List[int],
-    pts_dict: Dict[int, float],
-    pos_dict: Dict[int, str],
-    formations: List[Tuple[int,int,int]],
-):
-    best = None
-    best_key = None
-    for f in formations:
-        xi, bench = _arrange_best_xi_for_fixed_squad(selected_pids, pts_dict, pos_dict, f)
-        pts_xi = sum(pts_dict[i] for i in xi)
-        key = (pts_xi,)
-        if best_key is None or key > best_key:
-            best_key = key
-            best = {"formation": f, "xi": xi, "bench": bench, "xi_points": pts_xi}
-    return best
-
-
 def optimize_k(
     k: int,
-    pool_df: pd.DataFrame,
+    pool_df: "pd.DataFrame | PreparedPool",
     owned_df: pd.DataFrame,
     bank_m: float,
     formations: List[Tuple[int,int,int]],
@@ -287,6 +248,10 @@ def optimize_k(
     solver_msg: bool = False,
     arrange_points_by_key: Dict[str, float] | None = None,
     arrange_over_formations: bool = True,
+    formation_mode: str = "loop",
+    solver: str = "cbc",
+    cache: bool = True,
+    jobs: int = 1,
 ):
     """
     Choose transfers (≤ k), select a 15-man squad, and then arrange XI+bench.
@@ -295,211 +260,47 @@ def optimize_k(
       2) Max bench points (tie-break)
       3) Min total cost (tie-break)
     Finally, re-arrange the XI for the chosen 15 to guarantee the true best XI.
+
+    formation_mode:
+      "loop" – build and solve one model per formation, keep the best (default).
+      "free" – one model where the XI formation is itself a decision variable,
+               restricted to `formations`; one build and one solve chain per k.
+
+    solver: "cbc" (default), "highs" or "cbc-inproc" – see solvers.py.
+    cache: reuse an identical earlier solve from the on-disk cache (solution_cache.py).
+    jobs: solve the formation passes in that many processes (see TransferModel.solve_many).
+    pool_df: the pool frame or a PreparedPool already built from it (prepared_pool.py).
+
+    One-off convenience; for several k build a TransferModel once and call
+    .solve(k) / .solve_many(ks) on it (that's what main() does).
     """
-    # Build synthetic PIDs
-    df = pool_df.copy().reset_index(drop=True)
-    df["PID"] = df.index
-    id_list = df["PID"].tolist()
-
-    # Dicts
-    name = df.set_index("PID")["Name"].to_dict()
-    team = df.set_index("PID")["Team"].to_dict()
-    pos  = df.set_index("PID")["Position"].to_dict()
-    price = df.set_index("PID")["Price"].astype(float).to_dict()
-    pts   = df.set_index("PID")["Points"].astype(float).to_dict()
-
-    # Owned PIDs via 'key'
+    # Owned PIDs are matched via 'key'
     if "key" not in owned_df.columns:
         owned_df = owned_df.copy()
         owned_df["key"] = owned_df.apply(lambda r: _key(r["Name"], r["Team"]), axis=1)
 
-    owned_keys = set(owned_df["key"])
-    pid_by_key = df.set_index("key")["PID"].to_dict()
-    current_pids = {pid_by_key[k] for k in owned_keys if k in pid_by_key}
-
-    # Name→PID helper
-    by_name: Dict[str, Set[int]] = df.groupby("Name")["PID"].apply(set).to_dict()
-    def ids_for_names(names: Set[str]) -> Set[int]:
-        out = set()
-        for nm in names or []:
-            out |= by_name.get(nm, set())
-        return out
-
-    inc_ids       = ids_for_names(include_names or set())
-    inc_start_ids = ids_for_names(include_start_names or set())
-    exc_ids       = ids_for_names(exclude_names or set())
-    block_add_ids = ids_for_names(block_add_names or set())
-    include_teams = set(include_teams or [])
-    exclude_teams = set(exclude_teams or [])
-
-    total_current_cost = float(owned_df["Price"].sum())
-
-    best = None
-    best_key = None
-
-    for DEF, MID, FWD in formations:
-        m = LpProblem("FPL_FromCSV", LpMaximize)
-        x = LpVariable.dicts("in_squad", id_list, 0, 1, cat="Binary")
-        y = LpVariable.dicts("start",    id_list, 0, 1, cat="Binary")
-        b = LpVariable.dicts("bench",    id_list, 0, 1, cat="Binary")
-
-        # Sizes
-        m += lpSum(x[i] for i in id_list) == 15
-        m += lpSum(y[i] for i in id_list) == 11
-        m += lpSum(b[i] for i in id_list) == 4
-
-        # Consistency
-        for i in id_list:
-            m += y[i] + b[i] <= x[i]
-
-        # Formation (XI)
-        m += lpSum(y[i] for i in id_list if pos[i] == "Goalkeeper") == 1
-        m += lpSum(y[i] for i in id_list if pos[i] == "Defender")   == DEF
-        m += lpSum(y[i] for i in id_list if pos[i] == "Midfielder") == MID
-        m += lpSum(y[i] for i in id_list if pos[i] == "Forward")    == FWD
-
-        # Full 15 caps
-        for P, cap in SQUAD_CAPS.items():
-            m += lpSum(x[i] for i in id_list if pos[i] == P) == cap
-
-        # ≤3 per club across 15
-        for club in df["Team"].unique():
-            m += lpSum(x[i] for i in id_list if team[i] == club) <= max_per_team
-
-        # Budget: new 15 within current_15_csv_cost + bank
-        total_cost_expr = lpSum(price[i] * x[i] for i in id_list)
-        m += total_cost_expr <= total_current_cost + bank_m
-
-        # Bench soft cap (ONLY if explicitly provided)
-        if bench_budget is not None:
-            bench_cost_expr = lpSum(price[i] * b[i] for i in id_list)
-            m += bench_cost_expr <= bench_budget
-
-        # Transfers ≤ k
-        removed = 15 - lpSum(x[i] for i in current_pids)
-        added   = lpSum(x[i] for i in set(id_list) - current_pids)
-        m += removed <= k
-        m += added   <= k
-
-        # Includes/excludes
-        for i in id_list:
-            if i in inc_ids:       m += x[i] == 1
-            if i in inc_start_ids: m += y[i] == 1
-            if i in exc_ids:       m += x[i] == 0
-            if include_teams and team[i] not in include_teams: m += x[i] == 0
-            if team[i] in exclude_teams:                       m += x[i] == 0
-            # Only block if it's a *new* buy
-            if i in block_add_ids and i not in current_pids:   m += x[i] == 0
-
-        # Objectives (multi-stage)
-        start_points = lpSum(pts[i] * y[i] for i in id_list)
-        bench_points = lpSum(pts[i] * b[i] for i in id_list)
-
-        # 1) Max XI points
-        m.objective = start_points
-        status = m.solve(PULP_CBC_CMD(msg=solver_msg))
-        if LpStatus[status] != "Optimal":
-            continue
-        start_best = sum(pts[i] * value(y[i]) for i in id_list)
-        EPS = 1e-6
-        m += start_points >= start_best - EPS
-        m += start_points <= start_best + EPS
-
-        # 2) Max bench points (tie-break)
-        m.objective = bench_points
-        status = m.solve(PULP_CBC_CMD(msg=solver_msg))
-        if LpStatus[status] != "Optimal":
-            continue
-        bench_best = sum(pts[i] * value(b[i]) for i in id_list)
-        m += bench_points >= bench_best - EPS
-        m += bench_points <= bench_best + EPS
-
-        # 3) Min total cost (final tie-break)
-        m.objective = -total_cost_expr
-        status = m.solve(PULP_CBC_CMD(msg=solver_msg))
-        if LpStatus[status] != "Optimal":
-            continue
+    model = TransferModel(
+        pool_df=pool_df,
+        owned_df=owned_df,
+        bank_m=bank_m,
+        formations=formations,
+        max_per_team=max_per_team,
+        bench_budget=bench_budget,
+        include_names=include_names,
+        include_start_names=include_start_names,
+        exclude_names=exclude_names,
+        include_teams=include_teams,
+        exclude_teams=exclude_teams,
+        block_add_names=block_add_names,
+        solver_msg=solver_msg,
+        arrange_points_by_key=arrange_points_by_key,
+        arrange_over_formations=arrange_over_formations,
+        formation_mode=formation_mode,
+        solver=solver,
+        cache=cache,
+    )
+    return model.solve_many([k], jobs=jobs)[k]
 
-        # --- Retrieve the chosen 15 ---
-        x_sel = [i for i in id_list if value(x[i]) > 0.5]
-        # NOTE: y/b from this stage might be skewed if a bench cap was applied; we’ll re-arrange next.
-
-        # Map PID -> 1GW arrangement points (fallback to preds pts if not provided)
-        key_by_pid = df.set_index("PID")["key"].to_dict()
-        if arrange_points_by_key is not None:
-            arrange_pts_by_pid = {pid: float(arrange_points_by_key.get(key_by_pid[pid], pts[pid])) for pid in id_list}
-        else:
-            arrange_pts_by_pid = pts
-
-        # --- Re-arrange best XI for the fixed squad (guarantees maximum XI points) ---
-        y_sel, b_sel = _arrange_best_xi_for_fixed_squad(x_sel, pts, pos, (DEF, MID, FWD))
-
-        # (A) Preds-based XI for THIS formation (used to rank solutions by preds)
-        y_sel_pred, b_sel_pred = _arrange_best_xi_for_fixed_squad(x_sel, pts, pos, (DEF, MID, FWD))
-
-        # (B) 1GW-based XI; allow ANY valid formation if requested (used for reporting/selection order)
-        if arrange_over_formations:
-            best_arr = _arrange_best_xi_over_formations_for_fixed_squad(x_sel, arrange_pts_by_pid, pos, formations)
-            y_sel_arr, b_sel_arr = best_arr["xi"], best_arr["bench"]
-            arr_formation = best_arr["formation"]
-        else:
-            y_sel_arr, b_sel_arr = _arrange_best_xi_for_fixed_squad(x_sel, arrange_pts_by_pid, pos, (DEF, MID, FWD))
-            arr_formation = (DEF, MID, FWD)
-
-        # Transfers
-        out_pids = sorted(list(current_pids - set(x_sel)))
-        in_pids  = sorted(list(set(x_sel) - current_pids))
-
-        # Metrics
-        start_pts  = sum(pts[i] for i in y_sel)
-        bench_pts  = sum(pts[i] for i in b_sel)
-        total_cost = sum(price[i] for i in x_sel)
-        start_cost = sum(price[i] for i in y_sel)
-        bench_cost = sum(price[i] for i in b_sel)
-
-        # Preds metrics (used for 'best' selection across formation loops)
-        start_pts_pred  = sum(pts[i] for i in y_sel_pred)
-        bench_pts_pred  = sum(pts[i] for i in b_sel_pred)
-
-        # 1GW arrangement metrics (for printing/sorting)
-        start_pts_arr   = sum(arrange_pts_by_pid[i] for i in y_sel_arr)
-        bench_pts_arr   = sum(arrange_pts_by_pid[i] for i in b_sel_arr)
-
-        points_out = sum(pts[i] for i in out_pids)
-        points_in  = sum(pts[i] for i in in_pids)
-        points_diff = points_in - points_out
-        points_diff_pct = points_diff / (points_out + 0.1)
-        budget_left = (total_current_cost + bank_m) - total_cost
-
-        key = (start_pts_pred, -total_cost, bench_pts_pred)
-
-        payload = {
-            "formation": (DEF, MID, FWD),
-            "arrangement_formation": arr_formation,
-            "selected": x_sel, 
-            "starting": y_sel_arr, 
-            "bench": b_sel_arr,
-            "out": out_pids, 
-            "in": in_pids,
-            "starting_points": start_pts_pred, 
-            "bench_points": bench_pts_pred,
-            "starting_points_arr": start_pts_arr,
-            "bench_points_arr": bench_pts_arr,
-            "total_cost": total_cost, 
-            "starting_cost": sum(price[i] for i in y_sel_arr),
-            "bench_cost": sum(price[i] for i in b_sel_arr),
-            "points_out": points_out, 
-            "points_in": points_in,
-            "points_diff": points_diff, 
-            "points_diff_pct": points_diff_pct,
-            "budget_left": budget_left,
-            "_df": df,
-        }
-        if best_key is None or key > best_key:
-            best_key = key
-            best = payload
-
-    return best
 
 # Modify the main optimization function to use enhanced predictions
 def optimize_k_enhanced(
@@ -517,12 +318,16 @@ def optimize_k_enhanced(
     exclude_teams: Set[str] = None,
     block_add_names: Set[str] = None,
     solver_msg: bool = False,
+    formation_mode: str = "loop",
+    solver: str = "cbc",
+    cache: bool = True,
+    jobs: int = 1,
 ):
     """
     Enhanced optimization function incorporating analysis insights
     """
     # Enhance predictions with our analysis-based adjustments
-    pool_df = enhance_predictions(pool_df)
+    pool_df = enhanced_pool(pool_df)
     
     # Continue with original optimization logic but with enhanced predictions
     return optimize_k(
@@ -539,90 +344,114 @@ def optimize_k_enhanced(
         include_teams=include_teams,
         exclude_teams=exclude_teams,
         block_add_names=block_add_names,
-        solver_msg=solver_msg
+        solver_msg=solver_msg,
+        formation_mode=formation_mode,
+        solver=solver,
+        cache=cache,
+        jobs=jobs,
     )
 
 
-def write_enhanced_report(entry_id: int, bank_m: float, owned_df: pd.DataFrame, k_results: Dict[int, dict], outfile: str):
+def _enhanced_row_str(r) -> str:
+    return f"{r['Name']:<22} {r['Team']:<15} {r['Position']:<12} {float(r['Price']):>5.1f}  {float(r['Points']):>6.2f} (orig: {float(r['Points_Original']):>6.2f})"
+
+
+def enhanced_result_lines(res: dict, header: str, pool: PreparedPool = None) -> List[str]:
+    """
+    Enhanced report block for one solved squad; `header` leads its first line.
+    pool: the enhanced_pool() the squad's PIDs index (default: the payload's own).
+    """
+    lines = []
+    pool = pool or res["_pool"]
+    DEF, MID, FWD = res["formation"]
+    lines.append(f"{header}  |  Formation: {DEF}-{MID}-{FWD}")
+
+    # Add team composition analysis
+    team_counts = pd.Series([pool.team_by_pid[pid] for pid in res["selected"]]).value_counts()
+    lines.append("\nTeam Distribution:")
+    for team, count in team_counts.items():
+        team_weight = TEAM_WEIGHTS.get(team, 0)
+        lines.append(f"  {team:<15}: {count} players (Team Weight: {team_weight:.2f})")
+
+    # Add price bracket analysis
+    price_brackets = pd.Series([round(float(pool.price[pid]) * 2) / 2 for pid in res["selected"]]).value_counts()
+    lines.append("\nPrice Bracket Distribution:")
+    for bracket, count in price_brackets.items():
+        effectiveness = PRICE_EFFECTIVENESS.get(bracket, 0)
+        lines.append(f"  £{bracket}m: {count} players (Effectiveness: {effectiveness:.2f})")
+
+    # Continue with standard reporting...
+    lines.append(f"\nProjected XI points: {res['starting_points']:.2f} | Bench points: {res['bench_points']:.2f}")
+    lines.append(f"Cost used: {res['total_cost']:.2f}  (XI {res['starting_cost']:.2f} / Bench {res['bench_cost']:.2f})")
+    lines.append(f"Points Out: {res['points_out']:.2f}")
+    lines.append(f"Points In: {res['points_in']:.2f}")
+    lines.append(f"Points Difference: {res['points_diff']:.2f}")
+    lines.append(f"Points Diff %: {res['points_diff_pct']*100:.2f}%")
+    lines.append(f"Budget Left: {res['budget_left']:.2f}")
+    if "status" in res:
+        lines.append(f"Solve: {solve_label(res['status'], res['gap'])}")
+
+    lines.append(f"\nOUT:")
+    for pid in res["out"]:
+        lines.append("  " + _enhanced_row_str(pool.row(pid)))
+
+    lines.append("IN:")
+    for pid in res["in"]:
+        lines.append("  " + _enhanced_row_str(pool.row(pid)))
+
+    lines.append(f"\nSTARTING XI:")
+    for P in ["Goalkeeper", "Defender", "Midfielder", "Forward"]:
+        for pid in res["starting"]:
+            if pool.pos_by_pid[pid] == P:
+                lines.append("  " + _enhanced_row_str(pool.row(pid)))
+
+    lines.append("BENCH:")
+    for pid in res["bench"]:
+        lines.append("  " + _enhanced_row_str(pool.row(pid)))
+
+    # Enhanced captain suggestion considering team and position weights
+    def captain_score(pid):
+        r = pool.row(pid)
+        base_score = float(r['Points'])
+        team_mult = TEAM_WEIGHTS.get(r['Team'], 0.5)
+        pos_mult = POS_WEIGHTS.get(r['Position'], {}).get(r['Price'], 1.0)
+        return base_score * team_mult * pos_mult
+
+    xi_sorted = sorted(res["starting"], key=captain_score, reverse=True)
+    if res.get("sim"):
+        lines.extend(sim_lines(res["sim"], lambda pid: pool.names[pid]))
+    elif xi_sorted:
+        cap = pool.names[xi_sorted[0]]
+        vc = pool.names[xi_sorted[1]] if len(xi_sorted) > 1 else None
+        lines.append(f"\nSuggested (C): {cap} | (VC): {vc}")
+
+    lines.append("-"*96 + "\n")
+    return lines
+
+
+def write_enhanced_report(entry_id: int, bank_m: float, owned_df: pd.DataFrame, k_results: Dict[int, dict], outfile: str,
+                          free_transfers: int = 1, hit_cost: float = 4.0, hit_result: dict | None = None,
+                          pool: PreparedPool = None):
     """
     Enhanced report writing with additional analysis insights
     """
-    def row_str(r) -> str:
-        return f"{r['Name']:<22} {r['Team']:<15} {r['Position']:<12} {float(r['Price']):>5.1f}  {float(r['Points']):>6.2f} (orig: {float(r['Points_Original']):>6.2f})"
-
     lines = []
     lines.append(f"Enhanced FPL Optimization for Entry {entry_id}")
     lines.append(f"Bank: {bank_m:.2f} | Current-15 CSV cost: {owned_df['Price'].sum():.2f}")
     lines.append("="*96 + "\n")
 
+    # Points-vs-transfers frontier (net of hits) ahead of the per-k detail
+    lines.extend(frontier_lines(transfer_frontier(k_results, free_transfers, hit_cost), free_transfers, hit_cost))
+    if hit_result:
+        header = f"Hit-aware pick: {hit_result['hits']} hit(s), net XI points {hit_result['net_points']:.2f}  |  Transfers: {len(hit_result['in'])}"
+        lines.extend(enhanced_result_lines(hit_result, header, pool))
+
     for k in sorted(k_results.keys()):
         res = k_results[k]
         if not res:
             lines.append(f"Transfers: {k}\nNO FEASIBLE SOLUTION\n" + "-"*96 + "\n")
             continue
-
-        df = res["_df"].set_index("PID")
-        DEF, MID, FWD = res["formation"]
-        lines.append(f"Transfers: {k}  |  Formation: {DEF}-{MID}-{FWD}")
-
-        # Add team composition analysis
-        team_counts = pd.Series([df.loc[pid, "Team"] for pid in res["selected"]]).value_counts()
-        lines.append("\nTeam Distribution:")
-        for team, count in team_counts.items():
-            team_weight = TEAM_WEIGHTS.get(team, 0)
-            lines.append(f"  {team:<15}: {count} players (Team Weight: {team_weight:.2f})")
-
-        # Add price bracket analysis
-        price_brackets = pd.Series([round(float(df.loc[pid, "Price"]) * 2) / 2 for pid in res["selected"]]).value_counts()
-        lines.append("\nPrice Bracket Distribution:")
-        for bracket, count in price_brackets.items():
-            effectiveness = PRICE_EFFECTIVENESS.get(bracket, 0)
-            lines.append(f"  £{bracket}m: {count} players (Effectiveness: {effectiveness:.2f})")
-
-        # Continue with standard reporting...
-        lines.append(f"\nProjected XI points: {res['starting_points']:.2f} | Bench points: {res['bench_points']:.2f}")
-        lines.append(f"Cost used: {res['total_cost']:.2f}  (XI {res['starting_cost']:.2f} / Bench {res['bench_cost']:.2f})")
-        lines.append(f"Points Out: {res['points_out']:.2f}")
-        lines.append(f"Points In: {res['points_in']:.2f}")
-        lines.append(f"Points Difference: {res['points_diff']:.2f}")
-        lines.append(f"Points Diff %: {res['points_diff_pct']*100:.2f}%")
-        lines.append(f"Budget Left: {res['budget_left']:.2f}")
-
-        lines.append(f"\nOUT:")
-        for pid in res["out"]:
-            r = df.loc[pid]
-            lines.append("  " + row_str(r))
-
-        lines.append("IN:")
-        for pid in res["in"]:
-            r = df.loc[pid]
-            lines.append("  " + row_str(r))
-
-        lines.append(f"\nSTARTING XI:")
-        for P in ["Goalkeeper", "Defender", "Midfielder", "Forward"]:
-            for pid in res["starting"]:
-                if df.loc[pid, "Position"] == P:
-                    lines.append("  " + row_str(df.loc[pid]))
-
-        lines.append("BENCH:")
-        for pid in res["bench"]:
-            lines.append("  " + row_str(df.loc[pid]))
-
-        # Enhanced captain suggestion considering team and position weights
-        def captain_score(pid):
-            r = df.loc[pid]
-            base_score = float(r['Points'])
-            team_mult = TEAM_WEIGHTS.get(r['Team'], 0.5)
-            pos_mult = POS_WEIGHTS.get(r['Position'], {}).get(r['Price'], 1.0)
-            return base_score * team_mult * pos_mult
-
-        xi_sorted = sorted(res["starting"], key=captain_score, reverse=True)
-        if xi_sorted:
-            cap = df.loc[xi_sorted[0], "Name"]
-            vc = df.loc[xi_sorted[1], "Name"] if len(xi_sorted) > 1 else None
-            lines.append(f"\nSuggested (C): {cap} | (VC): {vc}")
-
-        lines.append("-"*96 + "\n")
+        lines.extend(enhanced_result_lines(res, f"Transfers: {k}", pool))
 
     text = "\n".join(lines)
     print(text)
@@ -630,6 +459,27 @@ def write_enhanced_report(entry_id: int, bank_m: float, owned_df: pd.DataFrame,
         f.write(text)
     print(f"\nSaved: {outfile}")
 
+
+def write_top_squads(entry_id: int, squads, max_k: int, min_diff: int, outfile: str, pool: PreparedPool = None):
+    """
+    Streams TransferModel.iter_squads() output: each squad is printed and appended
+    to outfile (flushed) as soon as it is solved, best first.
+    """
+    head = (f"Top squads for Entry {entry_id} (<= {max_k} transfers, >= {min_diff} player(s) apart)\n"
+            + "="*96 + "\n")
+    print(head)
+    n = 0
+    with open(outfile, "w", encoding="utf-8") as f:
+        f.write(head + "\n")
+        for n, res in enumerate(squads, 1):
+            text = "\n".join(enhanced_result_lines(res, f"#{n}  |  Transfers: {len(res['in'])}", pool))
+            print(text)
+            f.write(text + "\n")
+            f.flush()
+    if not n:
+        print("NO FEASIBLE SOLUTION")
+    print(f"\nSaved: {outfile}")
+
 def parse_args():
     p = argparse.ArgumentParser(description="FPL optimizer using your predictions CSV as the scoring basis.")
     p.add_argument("--entry", type=int, required=True, help="FPL entry (manager) ID")
@@ -641,6 +491,42 @@ def parse_args():
     p.add_argument("--bench_budget", type=float, default=20.0)
     p.add_argument("--max_per_team", type=int, default=3)
     p.add_argument("--formations", type=str, default="3-4-3,3-5-2,4-4-2,4-5-1,5-3-2,5-4-1,4-3-3")
+    p.add_argument("--formation_mode", choices=list(FORMATION_MODES), default="loop",
+                   help="loop: one model per formation; free: formation is a decision variable in one model")
+    p.add_argument("--objective", choices=list(OBJECTIVE_MODES), default="lexicographic",
+                   help="lexicographic: XI, bench, cost as three solves; weighted: one solve, same priority")
+    p.add_argument("--solver", choices=list(SOLVER_BACKENDS), default="cbc",
+                   help="cbc: bundled CBC binary; highs: HiGHS in-process (highspy); cbc-inproc: CBC via CyLP")
+    p.add_argument("--no_prune", action="store_true",
+                   help="Solve every formation pass (default: skip passes whose LP bound can't beat the best so far)")
+    p.add_argument("--no_exact", action="store_true",
+                   help="Use the MILP for 0-2 transfers too (default: exact swap enumeration, same answer)")
+    p.add_argument("--quick", type=float, default=0.0, metavar="SECONDS",
+                   help="Swap-search each transfer count for SECONDS first and print its gap to the LP bound; "
+                        "the squad is the MILP's start (with --jobs 1)")
+    p.add_argument("--quick_only", action="store_true",
+                   help="With --quick: report the swap-search squads and skip the MILP")
+    p.add_argument("--no-cache", action="store_true",
+                   help="Always re-solve (ignore and don't update the on-disk solution cache)")
+    p.add_argument("--jobs", type=int, default=1,
+                   help="Solve formation/transfer-count subproblems in N worker processes")
+    p.add_argument("--free_transfers", type=int, default=1,
+                   help="Free transfers available; each one beyond costs --hit_cost points")
+    p.add_argument("--hit_cost", type=float, default=4.0, help="Points deducted per extra transfer")
+    p.add_argument("--hit_aware", action="store_true",
+                   help="Also solve once with the transfer count free and hits in the objective")
+    p.add_argument("--top", type=int, default=0,
+                   help="Also list the N best distinct squads for --max_transfers (streamed as found)")
+    p.add_argument("--min_diff", type=int, default=1,
+                   help="With --top: every listed squad differs from the others in at least this many players")
+    p.add_argument("--time-budget", type=float, default=None, metavar="SECONDS",
+                   help="Wall-clock budget for the whole run (not --top): solves get shares of what is left, "
+                        "most promising formation first; answers that ran out of time are reported as best found with their gap")
+    p.add_argument("--mip_gap", type=float, default=None,
+                   help="Relative gap at which each MIP solve may stop (e.g. 0.01)")
+    p.add_argument("--sims", type=int, default=0, metavar="N",
+                   help=f"Simulate N gameweeks per squad (auto-subs, minutes risk) to pick captain, vice and "
+                        f"bench order (e.g. {DEFAULT_SIMS})")
     p.add_argument("--include", nargs="*", default=[])
     p.add_argument("--include_start", nargs="*", default=[])
     p.add_argument("--exclude", nargs="*", default=[])
@@ -653,9 +539,25 @@ def parse_args():
     p.add_argument("--bank", type=float, default=None, help="Override bank in millions (e.g., 2.0)")
     return p.parse_args()
 
+def _quick(model: TransferModel, k: int, seconds: float, seed_milp: bool):
+    res = model.quick(k, seconds, seed_milp=seed_milp)
+    print(f"k={k} " + (quick_summary(res["quick"]) if res else "Quick: no feasible squad"), file=sys.stderr)
+    return res
+
+
+def _simulate(results: Dict[int, dict], hit_result, chances: Dict[str, float], points_by_key, n: int):
+    """Adds each squad's GWSimulator.best() as res["sim"] (captain, vice, bench order, expected points)."""
+    t0 = perf_counter()
+    for res in [*results.values(), hit_result]:
+        if res:
+            res["sim"] = simulate_payload(res, chances, points_by_key, n)
+    print(f"Simulation: {n} GWs per squad in {perf_counter() - t0:.2f}s", file=sys.stderr)
+
+
 # Update main() to use enhanced functions
 def main():
     args = parse_args()
+    deadline = Deadline(args.time_budget) if args.time_budget else None
     
     # Parse formations
     formations = []
@@ -705,30 +607,72 @@ def main():
     include_names = set(args.include or [])
     include_names |= (set(args.keep or []) & set(pool_df["Name"].unique()))
 
-    # Use enhanced optimization
-    results = {}
+    # Use enhanced optimization: adjust and index the pool once for the models and
+    # the report, build the model once, then re-solve it for each k (only the
+    # transfer bounds change between solves)
+    pool = enhanced_pool(pool_df)
+    model_kw = dict(
+        pool_df=pool,
+        owned_df=owned_df,
+        bank_m=bank_m,
+        formations=formations,
+        max_per_team=args.max_per_team,
+        bench_budget=args.bench_budget,
+        include_names=include_names,
+        include_start_names=set(args.include_start or []),
+        exclude_names=set(args.exclude or []),
+        include_teams=set(args.include_teams or []),
+        exclude_teams=set(args.exclude_teams or []),
+        block_add_names=set(args.block_add or []),
+        solver_msg=args.solver_msg,
+        formation_mode=args.formation_mode,
+        objective_mode=args.objective,
+        solver=args.solver,
+    )
+    model = TransferModel(**model_kw, cache=not args.no_cache, prune=not args.no_prune,
+                          deadline=deadline, mip_gap=args.mip_gap, exact_small_k=not args.no_exact)
+    if model.presolve:
+        print(presolve_summary(model.presolve, 3 * len(model.formation_passes)), file=sys.stderr)
     max_k = max(0, min(5, int(args.max_transfers)))
-    for k in range(0, max_k + 1):
-        res = optimize_k_enhanced(
-            k=k,
-            pool_df=pool_df,
-            owned_df=owned_df,
-            bank_m=bank_m,
-            formations=formations,
-            max_per_team=args.max_per_team,
-            bench_budget=args.bench_budget,
-            include_names=include_names,
-            include_start_names=set(args.include_start or []),
-            exclude_names=set(args.exclude or []),
-            include_teams=set(args.include_teams or []),
-            exclude_teams=set(args.exclude_teams or []),
-            block_add_names=set(args.block_add or []),
-            solver_msg=args.solver_msg,
-        )
-        results[k] = res
+    ks = range(0, max_k + 1)
+    # Under a deadline the hit-aware solve keeps half of what the k sweep leaves
+    batch = deadline.share(2) if deadline and args.hit_aware else deadline
+    if args.quick > 0 and (args.quick_only or args.jobs > 1):
+        quick = {k: _quick(model, k, args.quick, seed_milp=False) for k in ks}
+        results = quick if args.quick_only else model.solve_many(ks, jobs=args.jobs, budget=batch)
+    elif args.quick > 0:
+        # Serially each k's quick squad is the MIP start of its own solve
+        results = {}
+        for n, k in enumerate(ks):
+            _quick(model, k, args.quick, seed_milp=True)
+            results[k] = model.solve(k, batch.share(len(ks) - n) if batch else None)
+    else:
+        results = model.solve_many(ks, jobs=args.jobs, budget=batch)
+    hit_result = model.solve_hits(args.free_transfers, args.hit_cost, max_k) if args.hit_aware else None
+    if args.sims > 0:
+        _simulate(results, hit_result, chance_by_key(elements_api, _key), None, args.sims)
+    solve_txt = ", ".join(f"k={k} {t:.2f}s" for k, t in model.solve_s.items())
+    print(f"Timing: build {model.build_s:.2f}s | solve {solve_txt}", file=sys.stderr)
+    if model.exact_moves:
+        moves = ", ".join(f"k={k} {n}" for k, n in model.exact_moves.items())
+        print(f"Exact swaps (no MILP): moves scored {moves}", file=sys.stderr)
+    if deadline:
+        labels = ", ".join(f"k={k} {solve_label(r['status'], r['gap'])}" for k, r in results.items() if r and "status" in r)
+        print(f"Time budget: {labels} ({deadline.left():.1f}s left)", file=sys.stderr)
+    if model.prune_stats:
+        print(prune_summary(total_stats(model.prune_stats.values()), "(k, formation) passes"), file=sys.stderr)
 
     outfile = args.outfile or f"enhanced_transfer_suggestions_{args.entry}.txt"
-    write_enhanced_report(args.entry, bank_m, owned_df, results, outfile)
+    write_enhanced_report(args.entry, bank_m, owned_df, results, outfile,
+                          free_transfers=args.free_transfers, hit_cost=args.hit_cost, hit_result=hit_result, pool=pool)
+
+    if args.top > 0:
+        # Runner-up squads may use players presolve drops, so the pool gets its own full model
+        pool_model = TransferModel(**model_kw, presolve=False, cache=False)
+        write_top_squads(
+            args.entry, pool_model.iter_squads(max_k, min_diff=args.min_diff, limit=args.top),
+            max_k, args.min_diff, f"enhanced_top_squads_{args.entry}.txt", pool=pool,
+        )
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,250 @@
+# Requires: requests, pandas, pulp
+# Usage:
+#   python fpl_multi_gw_planner.py --entry 123456 --preds gw10/blended_model.csv \
+#       --preds_3gw gw10/blended_model_3gw_adjusted.csv --horizon 4
+# Optional:
+#   --window 2 (rolling horizon; 0 = whole horizon in one model)
+#   --time_limit 50 (solver seconds for the whole plan)
+#   --free_transfers 1 --hit_cost 4 --max_transfers_per_gw 2 --bench_budget 20
+#   --keep "O'Shea" --exclude Muniz --bank 2.0 --solver highs
+#   --chips wildcard free_hit bench_boost triple_captain --jobs 4 (chip calendar)
+#
+# Notes:
+# - Current 15, bank and squad mapping work exactly as in fpl_transfers_optimizer.py.
+# - GW1 is scored with --preds; GW2..GWH with --preds_3gw rescaled to the 1GW
+#   points scale (see multi_gw_model.horizon_points). Without --preds_3gw every GW
+#   uses the 1GW points, so the plan only spreads transfers to save hits.
+# - Free transfers roll over (up to 5); each transfer beyond them costs --hit_cost.
+# - The report lists each GW's moves, bank, FT and XI, then the solve timings.
+# - With --chips, every placement of those chips is scored (chip_planner.py) and
+#   the report ranks the calendars, then details the best one.
+
+import argparse
+import sys
+from typing import List
+
+import pandas as pd
+
+from fpl_transfers_optimizer import (
+    _get_json,
+    _row_str,
+    fetch_bootstrap,
+    fetch_entry,
+    fetch_picks,
+    get_current_event_id,
+    load_predictions_csv,
+    map_current_ids_to_csv_rows,
+)
+from chip_planner import CHIPS, ChipPlanner
+from multi_gw_model import MAX_FT, MultiGWPlanner, horizon_points
+from presolve import presolve_summary
+from solvers import SOLVER_BACKENDS
+
+
+CHIP_LABELS = {"wildcard": "WC", "free_hit": "FH", "bench_boost": "BB", "triple_captain": "TC"}
+
+
+def gw_lines(df: pd.DataFrame, gw: dict) -> List[str]:
+    """Report block for one planned GW; df is the pool indexed by PID."""
+    col = f"Points_gw{gw['gw']}"
+    lines = []
+    chip = f"  |  Chip: {gw['chip']}" if gw.get("chip") else ""
+    if gw.get("chip") in ("wildcard", "free_hit"):
+        lines.append(f"GW+{gw['gw'] - 1}{chip}  |  Bank after: {gw['bank']:.2f}")
+    else:
+        lines.append(f"GW+{gw['gw'] - 1}  |  Transfers: {gw['transfers']} (FT {gw['ft']}, hits {gw['hits']})  |  "
+                     f"Bank after: {gw['bank']:.2f}{chip}")
+    lines.append(f"Projected XI points: {gw['xi_points']:.2f} | Bench points: {gw['bench_points']:.2f}")
+    if gw["in"]:
+        lines.append("OUT:")
+        for pid in gw["out"]:
+            lines.append("  " + _row_str(df.loc[pid], df.loc[pid, col]))
+        lines.append("IN:")
+        for pid in gw["in"]:
+            lines.append("  " + _row_str(df.loc[pid], df.loc[pid, col]))
+    else:
+        lines.append("No transfers (free transfer rolls over)")
+
+    lines.append(f"\nSTARTING XI:")
+    for P in ["Goalkeeper", "Defender", "Midfielder", "Forward"]:
+        for pid in gw["starting"]:
+            if df.loc[pid, "Position"] == P:
+                lines.append("  " + _row_str(df.loc[pid], df.loc[pid, col]))
+    lines.append("BENCH:")
+    for pid in gw["bench"]:
+        lines.append("  " + _row_str(df.loc[pid], df.loc[pid, col]))
+
+    xi_sorted = sorted(gw["starting"], key=lambda pid: float(df.loc[pid, col]), reverse=True)
+    if len(xi_sorted) > 1:
+        lines.append(f"\nSuggested (C): {df.loc[xi_sorted[0], 'Name']} | (VC): {df.loc[xi_sorted[1], 'Name']}")
+    lines.append("-"*96 + "\n")
+    return lines
+
+
+def plan_lines(plan: dict, hit_cost: float) -> List[str]:
+    """Report block for a MultiGWPlanner.plan() result."""
+    df = plan["_df"].set_index("PID")
+    lines = []
+    lines.append(f"Plan: {len(plan['gws'])} GW(s) | XI points {plan['total_points']:.2f} | "
+                 f"Hits {plan['hits']} (-{hit_cost * plan['hits']:.2f}) | Net {plan['net_points']:.2f}")
+    lines.append("="*96 + "\n")
+
+    for gw in plan["gws"]:
+        lines.extend(gw_lines(df, gw))
+
+    lines.append("Solves:")
+    lines.append(f"  {'GWs':<12} {'Build s':>8} {'Solve s':>8}  Status")
+    for s in plan["solves"]:
+        gws = f"{s['gws'][0]}-{s['gws'][-1]}" if len(s["gws"]) > 1 else str(s["gws"][0])
+        lines.append(f"  {gws:<12} {s['build_s']:>8.2f} {s['solve_s']:>8.2f}  {s['status']}")
+    lines.append(f"  {'total':<12} {plan['build_s']:>8.2f} {plan['solve_s']:>8.2f}")
+    return lines
+
+
+def chip_lines(result: dict, pool_df: pd.DataFrame, hit_cost: float) -> List[str]:
+    """Report block for a ChipPlanner.plan() result: ranked calendars, then the best in detail."""
+    df = pool_df.reset_index(drop=True)
+    chips = list(result["best"]["chips"]) if result["best"] else list(CHIPS)
+    lines = []
+    lines.append(f"Chip calendars: {len(result['scenarios'])} scenario(s) in {result['wall_s']:.2f}s")
+    lines.append("  " + "".join(f"{CHIP_LABELS[c]:>4}" for c in chips)
+                 + f"{'Score':>9}{'XI pts':>9}{'Hits':>6}{'Chips':>8}{'Time s':>8}{'Solves':>8}")
+    for s in result["scenarios"]:
+        gws = "".join(f"{s['chips'][c] or '-':>4}" for c in chips)
+        if s["score"] is None:
+            lines.append(f"  {gws}  NO FEASIBLE PLAN")
+            continue
+        lines.append(f"  {gws}{s['score']:>9.2f}{s['xi_points']:>9.2f}{s['hits']:>6}{s['chip_points']:>8.2f}"
+                     f"{s['elapsed_s']:>8.2f}{s['solves']:>8}")
+    lines.append("="*96 + "\n")
+
+    best = result["best"]
+    if best is None:
+        lines.append("NO FEASIBLE PLAN")
+        return lines
+    played = ", ".join(f"{c} GW+{gw - 1}" for c, gw in best["chips"].items() if gw) or "none"
+    lines.append(f"Best calendar: {played} | Score {best['score']:.2f} (XI {best['xi_points']:.2f}, "
+                 f"hits -{hit_cost * best['hits']:.2f}, chips +{best['chip_points']:.2f})")
+    lines.append("="*96 + "\n")
+    for gw in best["gws"]:
+        lines.extend(gw_lines(df, gw))
+    return lines
+
+# ------------------------ CLI ------------------------ #
+
+def parse_args():
+    p = argparse.ArgumentParser(description="FPL multi-gameweek transfer planner (bank and free-transfer rollover).")
+    p.add_argument("--entry", type=int, required=True, help="FPL entry (manager) ID")
+    p.add_argument("--preds", type=str, required=True, help="1GW predictions CSV (Name,Price,Position,Team,Points)")
+    p.add_argument("--preds_3gw", type=str, default=None, help="3GW predictions CSV, scores GW2 onwards")
+    p.add_argument("--horizon", type=int, default=3, choices=range(2, 7), help="Gameweeks to plan (2-6)")
+    p.add_argument("--window", type=int, default=0,
+                   help="Rolling window in GWs: plan W GWs, commit the first, step on (0 = whole horizon)")
+    p.add_argument("--time_limit", type=float, default=50.0,
+                   help="Solver seconds for the whole plan; the best plan found so far is kept (0 = no limit)")
+    p.add_argument("--free_transfers", type=int, default=1, help=f"Free transfers available now (max {MAX_FT})")
+    p.add_argument("--hit_cost", type=float, default=4.0, help="Points deducted per extra transfer")
+    p.add_argument("--max_transfers_per_gw", type=int, default=2)
+    p.add_argument("--bench_budget", type=float, default=20.0)
+    p.add_argument("--max_per_team", type=int, default=3)
+    p.add_argument("--keep", nargs="*", default=[])
+    p.add_argument("--exclude", nargs="*", default=[])
+    p.add_argument("--chips", nargs="*", choices=list(CHIPS), default=None,
+                   help="Plan a chip calendar with these chips (no names = all four) instead of a transfer plan")
+    p.add_argument("--jobs", type=int, default=1, help="Worker processes for the chip scenarios")
+    p.add_argument("--solver", choices=list(SOLVER_BACKENDS), default="cbc",
+                   help="MILP backend: cbc (default), highs (in-process, needs highspy), cbc-inproc (needs cylp)")
+    p.add_argument("--outfile", type=str, default=None)
+    p.add_argument("--solver_msg", action="store_true")
+    p.add_argument("--bank", type=float, default=None, help="Override bank in millions (e.g., 2.0)")
+    return p.parse_args()
+
+def main():
+    args = parse_args()
+
+    # Load FPL API data
+    bootstrap = _get_json("https://fantasy.premierleague.com/api/bootstrap-static/")
+    elements_api = fetch_bootstrap()
+    entry_meta = fetch_entry(args.entry)
+    current_event = get_current_event_id(entry_meta, bootstrap)
+    picks = fetch_picks(args.entry, current_event)
+    current_ids = [p["element"] for p in picks.get("picks", [])]
+    if len(current_ids) != 15:
+        print(f"Warning: expected 15 current picks, got {len(current_ids)}", file=sys.stderr)
+
+    # Determine bank (in millions): precedence is --bank > API > error
+    if args.bank is not None:
+        bank_m = float(args.bank)
+    elif entry_meta.get("bank") is not None:
+        bank_m = float(entry_meta["bank"]) / 10.0
+    else:
+        sys.exit(
+            "Bank balance not available from API. Please rerun with --bank <amount_in_millions>, "
+            "e.g., --bank 2.0"
+        )
+
+    # Map the current squad with the 1GW CSV, then add the per-GW points
+    preds_df = load_predictions_csv(args.preds)
+    pool_df, owned_df, warn = map_current_ids_to_csv_rows(current_ids, elements_api, preds_df)
+    for w in warn:
+        print(f"NOTE: {w['Name']} ({w['Team']}): {w['note']}", file=sys.stderr)
+    df_3gw = load_predictions_csv(args.preds_3gw) if args.preds_3gw else None
+    pool_df = horizon_points(pool_df, df_3gw, args.horizon)
+
+    if args.chips is not None:
+        chip_planner = ChipPlanner(
+            pool_df, owned_df, bank_m, args.horizon,
+            chips=args.chips or CHIPS,
+            free_transfers=args.free_transfers,
+            hit_cost=args.hit_cost,
+            max_transfers_per_gw=args.max_transfers_per_gw,
+            max_per_team=args.max_per_team,
+            bench_budget=args.bench_budget,
+            keep_names=set(args.keep or []),
+            exclude_names=set(args.exclude or []),
+            solver=args.solver,
+        )
+        result = chip_planner.plan(jobs=args.jobs)
+        lines = [f"FPL chip planner (predictions CSV) for Entry {args.entry}",
+                 f"Bank: {bank_m:.2f} | Current-15 CSV cost: {owned_df['Price'].sum():.2f} | "
+                 f"Horizon: {args.horizon} GW(s)"]
+        lines.extend(chip_lines(result, pool_df, args.hit_cost))
+        _save(lines, args.outfile or f"chip_plan_{args.entry}.txt")
+        return
+
+    planner = MultiGWPlanner(
+        pool_df, owned_df, bank_m, args.horizon,
+        free_transfers=args.free_transfers,
+        hit_cost=args.hit_cost,
+        max_transfers_per_gw=args.max_transfers_per_gw,
+        max_per_team=args.max_per_team,
+        bench_budget=args.bench_budget,
+        keep_names=set(args.keep or []),
+        exclude_names=set(args.exclude or []),
+        solver=args.solver,
+        solver_msg=args.solver_msg,
+        time_limit=args.time_limit or None,
+    )
+    if planner.presolve:
+        print(presolve_summary(planner.presolve, 3), file=sys.stderr)
+    plan = planner.plan(window=args.window or None)
+
+    lines = [f"FPL multi-GW plan (predictions CSV) for Entry {args.entry}",
+             f"Bank: {bank_m:.2f} | Current-15 CSV cost: {owned_df['Price'].sum():.2f} | "
+             f"Horizon: {args.horizon} GW(s) | Window: {args.window or args.horizon}"]
+    if plan is None:
+        lines.append("NO FEASIBLE PLAN")
+    else:
+        lines.extend(plan_lines(plan, args.hit_cost))
+
+    _save(lines, args.outfile or f"multi_gw_plan_{args.entry}.txt")
+
+def _save(lines: List[str], outfile: str):
+    text = "\n".join(lines)
+    print(text)
+    with open(outfile, "w", encoding="utf-8") as f:
+        f.write(text)
+    print(f"\nSaved: {outfile}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# gw_simulator.py – Monte-Carlo gameweek outcomes for a finished 15 (auto-subs, captaincy)
+# --------------------------------------------------------
+# The reports used to sum the XI's points and name the top two as captain and
+# vice. A gameweek is messier: a starter who doesn't play is replaced by the
+# first bench player (in bench order) who did and keeps the formation legal,
+# and the vice-captain only doubles when the captain doesn't play. This draws N
+# gameweeks at once and applies those rules in batch:
+#   plays  – Bernoulli(chance of playing), from the API's chance_of_playing_next_round
+#            (no news = 100%);
+#   points – what a player scores when he plays: gamma around his Points, with
+#            the position spread of scenarios.py; 0 when he doesn't play.
+# Auto-subs: the bench keeper only covers the starting keeper; the three outfield
+# bench players go in bench order, each replacing the first unplayed outfield
+# starter whose swap keeps >= 3 defenders and >= 1 forward.
+# All arrays are (N, 15); the rules loop over the 3 bench x 10 outfield slots only.
+# The draws are fixed per squad, so every bench order and captain pair is scored on
+# the same gameweeks: the 6 outfield bench orders are simulated outright and the
+# captain/vice pick comes from one (11 x 11) matrix product over the draws.
+
+from itertools import permutations
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from scenarios import POSITION_CV, DEFAULT_CV, draw_scenarios
+
+DEFAULT_SIMS = 10000
+MIN_DEF, MIN_FWD = 3, 1
+
+
+class GWSimulator:
+    """
+    N simulated gameweeks for one squad.
+    xi: the 11 starters; bench: the 4 others (any order; the keeper is found by position).
+    pos/pts: position and points-when-playing by id; chance: probability of playing
+    by id (missing = 1.0).
+    """
+
+    def __init__(self, xi: List, bench: List, pos: Dict, pts: Dict, chance: Dict = None,
+                 n: int = DEFAULT_SIMS, seed: int = 0):
+        if len(xi) != 11 or len(bench) != 4:
+            raise ValueError(f"need 11 starters and 4 on the bench, got {len(xi)} + {len(bench)}")
+        chance = chance or {}
+        self.xi = list(xi)
+        self.bench_gk = next((i for i in bench if pos[i] == "Goalkeeper"), None)
+        self.bench_out = [i for i in bench if i != self.bench_gk]
+        self.ids = self.xi + [self.bench_gk] + self.bench_out if self.bench_gk is not None else self.xi + list(bench)
+        self.pos = [pos[i] for i in self.ids]
+        self.n = int(n)
+
+        mean = np.array([float(pts[i]) for i in self.ids])
+        cv = np.array([POSITION_CV.get(P, DEFAULT_CV) for P in self.pos])
+        rng = np.random.default_rng(seed)
+        p_play = np.array([float(np.clip(chance.get(i, 1.0), 0.0, 1.0)) for i in self.ids])
+        self.played = rng.random((self.n, len(self.ids))) < p_play
+        self.points = np.where(self.played, draw_scenarios(mean, cv * np.abs(mean), self.n, seed + 1), 0.0)
+
+    def _base(self, order: List[int]) -> np.ndarray:
+        """(N,) points of the XI after auto-subs, no captain; order = bench outfield columns in bench order."""
+        P, V = self.played, self.points
+        total = (P[:, :11] * V[:, :11]).sum(axis=1)
+        gk = next(c for c in range(11) if self.pos[c] == "Goalkeeper")
+        if self.bench_gk is not None:
+            total += (~P[:, gk] & P[:, 11]) * V[:, 11]
+
+        outfield = [c for c in range(11) if c != gk]
+        need = ~P[:, outfield]
+        n_def = np.full(self.n, sum(self.pos[c] == "Defender" for c in outfield))
+        n_fwd = np.full(self.n, sum(self.pos[c] == "Forward" for c in outfield))
+        for b in order:
+            free = P[:, b].copy()
+            pb = self.pos[b]
+            for j, c in enumerate(outfield):
+                ok = need[:, j] & free
+                pa = self.pos[c]
+                if pa != pb:
+                    if pa == "Defender":
+                        ok &= n_def > MIN_DEF
+                    elif pa == "Forward":
+                        ok &= n_fwd > MIN_FWD
+                    n_def += ok * ((pb == "Defender") - (pa == "Defender"))
+                    n_fwd += ok * ((pb == "Forward") - (pa == "Forward"))
+                total += ok * V[:, b]
+                need[:, j] &= ~ok
+                free &= ~ok
+        return total
+
+    def _bonus(self, c: int, v: int) -> np.ndarray:
+        """(N,) captain's extra points: the captain's if he plays, else the vice's."""
+        P, V = self.played, self.points
+        return np.where(P[:, c], V[:, c], P[:, v] * V[:, v])
+
+    def best_captains(self):
+        """(captain column, vice column) with the highest expected bonus."""
+        A = self.played[:, :11] * self.points[:, :11]  # captain's points when he plays
+        B = (~self.played[:, :11]).astype(float)       # captain missing -> vice doubles
+        own = A.mean(axis=0)
+        gain = own[:, None] + (B.T @ A) / self.n
+        np.fill_diagonal(gain, -np.inf)
+        # A captain who always plays leaves every vice level: take the one with most points
+        tied = np.argwhere(gain >= gain.max() - 1e-9)
+        c, v = max(tied, key=lambda cv: (own[cv[0]], own[cv[1]]))
+        return int(c), int(v)
+
+    def best(self) -> dict:
+        """
+        Best bench order and captain/vice with the resulting points per gameweek:
+        {"mean", "var", "sd", "captain", "vice", "bench" (keeper first), "n"}.
+        """
+        first = 12 if self.bench_gk is not None else 11
+        cols = list(range(first, len(self.ids)))
+        best_order, best_base = None, None
+        for order in permutations(cols):  # the given order first, so it wins ties
+            base = self._base(list(order))
+            if best_base is None or base.mean() > best_base.mean() + 1e-9:
+                best_order, best_base = order, base
+        c, v = self.best_captains()
+        total = best_base + self._bonus(c, v)
+        bench = ([self.bench_gk] if self.bench_gk is not None else []) + [self.ids[b] for b in best_order]
+        return {"n": self.n, "mean": float(total.mean()), "var": float(total.var()), "sd": float(total.std()),
+                "captain": self.ids[c], "vice": self.ids[v], "bench": bench}
+
+
+def simulate_payload(res: dict, chance_by_key: Dict[str, float], points_by_key: Dict = None,
+                     n: int = DEFAULT_SIMS, seed: int = 0) -> Optional[dict]:
+    """
+    GWSimulator.best() for a transfer optimizer payload (PIDs, "_pool" with key/Position/Points).
+    points_by_key overrides the Points column (e.g. the 1GW arrangement points).
+    """
+    if len(res["starting"]) != 11 or len(res["bench"]) != 4:
+        return None
+    pool = res["_pool"]
+    ids = res["starting"] + res["bench"]
+    keys = {i: pool.keys[i] for i in ids}
+    pts = {i: float(pool.points[i]) for i in ids}
+    if points_by_key is not None:
+        pts = {i: float(points_by_key.get(keys[i], pts[i])) for i in ids}
+    chance = {i: chance_by_key[keys[i]] for i in ids if keys[i] in chance_by_key}
+    return GWSimulator(res["starting"], res["bench"], pool.pos_by_pid, pts, chance, n, seed).best()
+
+
+def chance_by_key(elements_api: pd.DataFrame, key_fn) -> Dict[str, float]:
+    """Probability of playing per CSV key from fetch_bootstrap()'s ChanceAPI column (percent)."""
+    if "ChanceAPI" not in elements_api.columns:
+        return {}
+    rows = elements_api.dropna(subset=["ChanceAPI"])
+    return {key_fn(nm, tm): float(c) / 100.0 for nm, tm, c in zip(rows["NameAPI"], rows["Team"], rows["ChanceAPI"])}
+
+
+def sim_lines(sim: dict, name_of) -> List[str]:
+    """Report lines for a GWSimulator.best() result; name_of(id) -> display name."""
+    return [
+        f"\nSimulated ({sim['n']} GWs, auto-subs + captain): expected {sim['mean']:.2f} pts, sd {sim['sd']:.2f}",
+        f"Suggested (C): {name_of(sim['captain'])} | (VC): {name_of(sim['vice'])}",
+        "Bench order: " + ", ".join(name_of(i) for i in sim["bench"]),
+    ]
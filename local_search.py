@@ -0,0 +1,418 @@
+# local_search.py – anytime swap search for a squad in milliseconds
+# --------------------------------------------------------
+# The MILPs take a second or more per run; this gives a good feasible squad almost
+# at once and keeps improving it until a time budget runs out.
+#   start  – the current squad (transfers) or a greedy fill (wildcard): best points
+#            first, each pick leaving enough budget for the cheapest completion.
+#   moves  – 1-for-1 same-position swaps that keep the budget, the club cap and
+#            the transfer limit. Every swap is scored at once with numpy: taking
+#            player i out and j in only changes i's position, so each formation's
+#            XI points are the other positions' top-n sums plus that position's
+#            new top-n, read off prefix sums.
+#   search – tabu: take the best swap even if it is worse, then keep the player just
+#            sold out and the one just bought in for a few moves (unless undoing
+#            it beats the best squad). This walks out of the local optima plain
+#            hill climbing stops in. After STALL moves without a better squad the
+#            search goes back to the best one and tries paired swaps: one of the
+#            PAIRED best swaps the budget or the transfer limit rules out, plus the
+#            best swap that puts it right (a sale that pays for it, or buying an
+#            owned player back), from the best squad and from the first one. If
+#            no pair beats the best squad, it makes KICK random swaps instead
+#            (seeded, so runs repeat).
+# Squads rank as in the MILPs: XI points (best XI over the formations), then lower
+# total cost, then bench points. A bench budget is checked one of two ways:
+#   bench_rule="xi"  – that XI's own bench must fit (wildcard: the model's XI is
+#                      the reported one, so this stays on the safe side);
+#   bench_rule="any" – a formation counts if its cheapest bench fits (transfers:
+#                      the payload re-arranges the XI without the cap).
+# A squad whose bench is too dear is never reported, and the search steers towards
+# one that fits first. Each reported squad is feasible for the MILP, and the LP
+# bound (bounds.py) covers both rules, so gap() is an honest measure. Under "any"
+# the search can even edge out the transfer MILP, which maximizes the XI it fits
+# the bench cap to rather than the re-arranged one the payload reports.
+
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+POSITIONS = ("Goalkeeper", "Defender", "Midfielder", "Forward")
+TABU_TENURE = 7  # moves a swap stays tabu: TABU_TENURE..2*TABU_TENURE-1, drawn per swap
+STALL = 40
+KICK = 3
+PAIRED = 10
+ROUND = 6  # decimals points are compared on, so float noise can't reorder ties
+BENCH_RULES = ("xi", "any")
+
+
+def _pick_formation(xi_f: np.ndarray, excess_f: np.ndarray):
+    """Per column: the formation with the smallest bench excess, then the most XI points (first on ties)."""
+    fits = excess_f == excess_f.min(axis=0)
+    f = np.argmax(np.where(fits, xi_f, -np.inf), axis=0)
+    return f
+
+
+class SwapSearch:
+    """
+    Squads of exactly caps[P] players per position from `ids`, total price <= budget,
+    <= max_per_team per club, every `forced` id in, and at most max_buys players
+    outside `owned` (None: no limit). XI formations are (DEF, MID, FWD) tuples with
+    one goalkeeper; caps equal to one formation's counts give an XI-only squad.
+    bench_rule: how bench_budget is checked ("xi" or "any", see the module notes).
+    """
+
+    def __init__(
+        self,
+        ids: Iterable,
+        pos: Dict,
+        team: Dict,
+        price: Dict,
+        pts: Dict,
+        caps: Dict[str, int],
+        formations: List[Tuple[int, int, int]],
+        budget: float,
+        max_per_team: int = 3,
+        bench_budget: Optional[float] = None,
+        forced: Iterable = (),
+        owned: Iterable = (),
+        max_buys: Optional[int] = None,
+        bench_rule: str = "xi",
+    ):
+        if bench_rule not in BENCH_RULES:
+            raise ValueError(f"bench_rule must be one of {BENCH_RULES}, got {bench_rule!r}")
+        self.bench_rule = bench_rule
+        self.ids = list(ids)
+        index = {i: n for n, i in enumerate(self.ids)}
+        clubs = {c: n for n, c in enumerate(dict.fromkeys(team[i] for i in self.ids))}
+        self.P = np.array([POSITIONS.index(pos[i]) for i in self.ids])
+        self.T = np.array([clubs[team[i]] for i in self.ids])
+        self.C = np.array([int(round(float(price[i]) * 10)) for i in self.ids])  # tenths: exact sums
+        self.V = np.array([float(pts[i]) for i in self.ids])
+        self.owned = np.zeros(len(self.ids), dtype=bool)
+        self.owned[[index[i] for i in owned if i in index]] = True
+        self.forced = np.zeros(len(self.ids), dtype=bool)
+        self.forced[[index[i] for i in forced if i in index]] = True
+        self.n_forced_missing = sum(1 for i in forced if i not in index)
+        self.index = index
+
+        self.caps = np.array([caps.get(P, 0) for P in POSITIONS])
+        self.need = np.array([(1,) + tuple(f) for f in formations])  # (n_formations, 4)
+        self.n_bench = self.caps[None, :] - self.need
+        self.formations = [tuple(f) for f in formations]
+        self.budget_t = int(np.floor(float(budget) * 10 + 1e-6))
+        self.bench_t = None if bench_budget is None else int(np.floor(float(bench_budget) * 10 + 1e-6))
+        self.max_per_team = max_per_team
+        self.max_buys = len(self.ids) if max_buys is None else int(max_buys)
+        self.by_pos = [np.flatnonzero(self.P == p) for p in range(len(POSITIONS))]
+
+    # ------------------------ Squad state ------------------------ #
+
+    def _excess(self, cost, xi_cost_f, cheap_f):
+        """Tenths by which each formation's bench is over bench_budget (0: fits)."""
+        if self.bench_t is None:
+            return np.zeros_like(xi_cost_f)
+        bench = cheap_f if self.bench_rule == "any" else cost - xi_cost_f
+        return np.maximum(0, bench - self.bench_t)
+
+    def _state(self, squad: List[int]) -> dict:
+        """Score of a squad (indices): best formation, XI/bench split and the ranking key."""
+        width = self.caps.max() + 1
+        top_pts, top_cost, cheap = (np.zeros((len(POSITIONS), width)) for _ in range(3))
+        ranked = []
+        for p in range(len(POSITIONS)):
+            mem = sorted((j for j in squad if self.P[j] == p), key=lambda j: -self.V[j])
+            ranked.append(mem)
+            top_pts[p, 1:len(mem) + 1] = np.cumsum(self.V[mem])
+            top_cost[p, 1:len(mem) + 1] = np.cumsum(self.C[mem])
+            cheap[p, 1:len(mem) + 1] = np.cumsum(np.sort(self.C[mem]))
+        rows = np.arange(len(POSITIONS))
+        xi_f = np.round(top_pts[rows, self.need].sum(axis=1), ROUND)
+        xi_cost_f = top_cost[rows, self.need].sum(axis=1)
+        cheap_f = cheap[rows, self.n_bench].sum(axis=1)
+        cost = int(self.C[squad].sum())
+        excess_f = self._excess(cost, xi_cost_f, cheap_f)
+        f = int(_pick_formation(xi_f, excess_f))
+        xi = float(xi_f[f])
+        bench = float(self.V[squad].sum()) - xi
+        return {
+            "squad": list(squad), "ranked": ranked, "top_pts": top_pts, "top_cost": top_cost, "cheap": cheap,
+            "xi_f": xi_f, "xi_cost_f": xi_cost_f, "cheap_f": cheap_f, "formation": f, "cost": cost,
+            "buys": int((~self.owned[squad]).sum()),
+            "clubs": np.bincount(self.T[squad], minlength=self.T.max() + 1),
+            "key": (-float(excess_f[f]), xi, -cost, round(bench, ROUND)),
+        }
+
+    def _fill(self, squad: List[int], by_cost: bool = False) -> Optional[List[int]]:
+        """
+        Complete a partial squad greedily by points (by_cost: cheapest first), keeping
+        the cheapest completion affordable. The reserve ignores the club cap, so a
+        tight budget can still run out; cheapest first is the fallback.
+        """
+        squad = list(squad)
+        clubs = np.bincount(self.T[squad], minlength=self.T.max() + 1)
+        cost = int(self.C[squad].sum())
+        buys = int((~self.owned[squad]).sum())
+        order = np.argsort(self.C if by_cost else -self.V, kind="stable")
+        while len(squad) < self.caps.sum():
+            left = self.caps - np.bincount(self.P[squad], minlength=len(POSITIONS))
+            free = np.ones(len(self.ids), dtype=bool)
+            free[squad] = False
+            cheapest = [np.sort(self.C[self.by_pos[p][free[self.by_pos[p]]]])[:left[p]] for p in range(len(POSITIONS))]
+            if any(len(c) < n for c, n in zip(cheapest, left)):
+                return None
+            reserve = sum(int(c.sum()) for c in cheapest)
+            pick = None
+            for j in order:
+                p = self.P[j]
+                if not free[j] or left[p] <= 0 or clubs[self.T[j]] >= self.max_per_team:
+                    continue
+                if buys + (not self.owned[j]) > self.max_buys:
+                    continue
+                # Cheapest completion after taking j: j fills one of its position's reserved slots
+                after = reserve - int(min(self.C[j], cheapest[p][-1]))
+                if cost + self.C[j] + after > self.budget_t:
+                    continue
+                pick = j
+                break
+            if pick is None:
+                return None
+            squad.append(int(pick))
+            clubs[self.T[pick]] += 1
+            cost += int(self.C[pick])
+            buys += int(not self.owned[pick])
+        return squad
+
+    def start(self, start: Iterable = ()) -> Optional[List[int]]:
+        """A feasible first squad from `start` ids (kept where allowed) plus forced players, filled greedily."""
+        if self.n_forced_missing:
+            return None
+        squad = [int(j) for j in np.flatnonzero(self.forced)]
+        for i in start:
+            j = self.index.get(i)
+            if j is not None and j not in squad:
+                squad.append(j)
+        # Over a position's cap or the club cap: keep forced players first, then the highest scoring
+        squad.sort(key=lambda j: (not self.forced[j], -self.V[j]))
+        kept, per_pos, clubs = [], np.zeros(len(POSITIONS), int), {}
+        for j in squad:
+            if per_pos[self.P[j]] < self.caps[self.P[j]] and clubs.get(self.T[j], 0) < self.max_per_team:
+                kept.append(j)
+                per_pos[self.P[j]] += 1
+                clubs[self.T[j]] = clubs.get(self.T[j], 0) + 1
+        if self.forced[kept].sum() < self.forced.sum():
+            return None
+        squad = self._fill(kept) or self._fill(kept, by_cost=True)
+        if squad is None or self.C[squad].sum() > self.budget_t or (~self.owned[squad]).sum() > self.max_buys:
+            return None
+        return squad
+
+    # ------------------------ Moves ------------------------ #
+
+    def _moves(self, st: dict, budget_t: Optional[int] = None, max_buys: Optional[int] = None):
+        """All feasible swaps (out, in) with their keys and buys, as arrays (budget_t/max_buys override the limits)."""
+        budget_t = self.budget_t if budget_t is None else budget_t
+        max_buys = self.max_buys if max_buys is None else max_buys
+        in_squad = np.zeros(len(self.ids), dtype=bool)
+        in_squad[st["squad"]] = True
+        squad_pts = self.V[st["squad"]].sum()
+        outs, ins, keys, n_buys = [], [], [], []
+        for p in range(len(POSITIONS)):
+            cands = self.by_pos[p][~in_squad[self.by_pos[p]]]
+            if not len(cands):
+                continue
+            n, nb = self.need[:, p], self.n_bench[:, p]  # this position's XI / bench count per formation
+            other_pts = st["xi_f"] - st["top_pts"][p, n]
+            other_cost = st["xi_cost_f"] - st["top_cost"][p, n]
+            other_cheap = st["cheap_f"] - st["cheap"][p, nb]
+            for i in st["ranked"][p]:
+                if self.forced[i]:
+                    continue
+                cost = st["cost"] - self.C[i] + self.C[cands]
+                clubs = st["clubs"][self.T[cands]] + 1 - (self.T[cands] == self.T[i])
+                buys = st["buys"] - (not self.owned[i]) + (~self.owned[cands])
+                ok = (cost <= budget_t) & (clubs <= self.max_per_team) & (buys <= max_buys)
+                if not ok.any():
+                    continue
+                c, cost = cands[ok], cost[ok]
+                n_buys.append(buys[ok])
+                rest = [j for j in st["ranked"][p] if j != i]
+                top_p = _with_one(self.V[rest], self.V[c], n, descending=True)
+                top_c = _with_one(self.V[rest], self.V[c], n, descending=True, sums=(self.C[rest], self.C[c]))
+                cheap = _with_one(np.sort(self.C[rest]), self.C[c], nb, descending=False)
+                xi_f = np.round(other_pts[:, None] + top_p, ROUND)
+                excess_f = self._excess(cost[None, :], other_cost[:, None] + top_c, other_cheap[:, None] + cheap)
+                f = _pick_formation(xi_f, excess_f)
+                cols = np.arange(len(c))
+                xi = xi_f[f, cols]
+                bench = np.round(squad_pts - self.V[i] + self.V[c] - xi, ROUND)
+                outs.append(np.full(len(c), i))
+                ins.append(c)
+                keys.append(np.stack([-excess_f[f, cols], xi, -cost, bench]))
+        if not outs:
+            return None
+        return np.concatenate(outs), np.concatenate(ins), np.concatenate(keys, axis=1), np.concatenate(n_buys)
+
+    # ------------------------ Search ------------------------ #
+
+    def improve(self, start: Iterable = (), time_limit: float = 0.2, max_iters: Optional[int] = None,
+                seed: int = 0):
+        """
+        Yields (state, stats) for the first feasible squad and then each better one,
+        until time_limit seconds have passed, max_iters moves were made or no swap
+        is left. stats: iterations, improvements, elapsed_s.
+        """
+        t0 = perf_counter()
+        squad = self.start(start)
+        if squad is None:
+            return
+        rng = np.random.default_rng(seed)
+        st = best = first = self._state(squad)
+        best_key = None
+        tabu = np.full(len(self.ids), -1)  # a player can't change sides before this move
+        stats = {"iterations": 0, "improvements": 0, "restarts": 0, "elapsed_s": 0.0}
+        it = last = 0
+        while True:
+            if st["key"][0] == 0 and (best_key is None or st["key"] > best_key):
+                best, best_key, last = st, st["key"], it
+                stats.update(improvements=stats["improvements"] + 1, elapsed_s=perf_counter() - t0)
+                yield st, dict(stats)
+            if perf_counter() - t0 >= time_limit or (max_iters is not None and it >= max_iters):
+                break
+            moves = self._moves(st)
+            if moves is None:
+                break
+            outs, ins, keys, _ = moves
+            order = np.lexsort(keys[::-1])[::-1]  # best key first
+            allowed = (tabu[ins[order]] < it) & (tabu[outs[order]] < it)
+            top = tuple(keys[:, order[0]])
+            stalled = it - last >= STALL or not allowed.any()
+            if stalled and best_key is not None:
+                if perf_counter() - t0 >= time_limit:
+                    break  # a restart costs several moves; don't start one past the limit
+                # Back to the best squad: a paired swap that beats it, else shaken up
+                paired = [p for p in (self._paired(best), self._paired(first)) if p is not None]
+                paired = max(paired, key=lambda p: p["key"], default=None)
+                if paired is not None and paired["key"] > best_key:
+                    st, last = paired, it
+                else:
+                    st, last = self._kick(best, rng), it
+                tabu[:] = -1
+                stats["restarts"] += 1
+                it += 1
+                continue
+            # Aspiration: a tabu swap is fine if it beats the best squad so far
+            if not allowed[0] and not (top[0] == 0 and (best_key is None or top > best_key)):
+                if not allowed.any():
+                    break
+                pick = order[np.argmax(allowed)]
+            else:
+                pick = order[0]
+            i, j = int(outs[pick]), int(ins[pick])
+            tabu[[i, j]] = it + rng.integers(TABU_TENURE, 2 * TABU_TENURE)
+            st = self._state([j if s == i else s for s in st["squad"]])
+            it += 1
+            stats["iterations"] = it
+        stats["elapsed_s"] = perf_counter() - t0
+        self.last_stats = stats
+
+    def _paired(self, st: dict) -> Optional[dict]:
+        """Best squad after one of the PAIRED best swaps over the budget or transfer limit and the best swap that fixes it."""
+        moves = self._moves(st, budget_t=np.iinfo(np.int64).max // 2, max_buys=self.max_buys + 1)
+        if moves is None:
+            return None
+        outs, ins, keys, buys = moves
+        over = np.flatnonzero((-keys[2] > self.budget_t) | (buys > self.max_buys))
+        over = over[np.lexsort(keys[::-1, over])[::-1]]
+        over = over[np.unique(ins[over], return_index=True)[1]]  # best swap per player bought
+        over = over[np.lexsort(keys[::-1, over])[::-1][:PAIRED]]
+        found = None
+        for n in over:
+            i, j = int(outs[n]), int(ins[n])
+            st1 = self._state([j if s == i else s for s in st["squad"]])
+            second = self._moves(st1)
+            if second is None:
+                continue
+            # The second swap is checked against the real limits, so the pair is feasible
+            outs2, ins2, keys2, _ = second
+            m = np.lexsort(keys2[::-1])[-1]
+            if found is None or tuple(keys2[:, m]) > found[0]:
+                found = (tuple(keys2[:, m]), st1, int(outs2[m]), int(ins2[m]))
+        if found is None:
+            return None
+        _, st1, i, j = found
+        return self._state([j if s == i else s for s in st1["squad"]])
+
+    def _kick(self, st: dict, rng) -> dict:
+        """st after KICK random feasible swaps."""
+        for _ in range(KICK):
+            moves = self._moves(st)
+            if moves is None:
+                break
+            n = rng.integers(len(moves[0]))
+            i, j = int(moves[0][n]), int(moves[1][n])
+            st = self._state([j if s == i else s for s in st["squad"]])
+        return st
+
+    def run(self, start: Iterable = (), time_limit: float = 0.2, max_iters: Optional[int] = None,
+            seed: int = 0) -> Optional[dict]:
+        """Best squad improve() finds, as ids: squad, xi, bench, formation, xi_points, bench_points, cost, stats."""
+        t0 = perf_counter()
+        best = None
+        first_s = None
+        history = []
+        for st, stats in self.improve(start, time_limit, max_iters, seed):
+            first_s = perf_counter() - t0 if first_s is None else first_s
+            history.append((stats["elapsed_s"], st["key"][1]))
+            best = (st, stats)
+        if best is None:
+            return None
+        st, stats = best
+        f = st["formation"]
+        xi = [j for p in range(len(POSITIONS)) for j in st["ranked"][p][:self.need[f, p]]]
+        bench = [j for j in st["squad"] if j not in xi]
+        return {
+            "squad": [self.ids[j] for j in st["squad"]],
+            "xi": [self.ids[j] for j in xi],
+            "bench": [self.ids[j] for j in bench],
+            "formation": self.formations[f],
+            "xi_points": float(self.V[xi].sum()),
+            "bench_points": float(self.V[bench].sum()),
+            "cost": st["cost"] / 10.0,
+            "stats": dict(self.last_stats, improvements=stats["improvements"], best_s=stats["elapsed_s"],
+                          first_s=first_s, history=history),
+        }
+
+
+def _with_one(rest: np.ndarray, new: np.ndarray, n: np.ndarray, descending: bool, sums=None) -> np.ndarray:
+    """
+    Sum over the first n[f] of `rest` (already sorted) plus one new value, for each
+    formation f (rows) and new value (columns). The order is by `rest`/`new`, the
+    summed values are `sums` = (rest values, new values) if given, else the same.
+    """
+    rest_s, new_s = sums if sums is not None else (rest, new)
+    prefix = np.concatenate(([0.0], np.cumsum(rest_s)))
+    # how many rest entries come before the new one (ties: rest first)
+    ahead = np.searchsorted(-rest, -new, side="right") if descending else np.searchsorted(rest, new, side="right")
+    into = ahead[None, :] < n[:, None]
+    with_new = prefix[np.maximum(n - 1, 0)][:, None] + new_s[None, :]
+    without = prefix[np.minimum(n, len(rest))][:, None]
+    return np.where(into, with_new, without)
+
+
+def gap(lower: float, upper: Optional[float]) -> Optional[float]:
+    """Relative optimality gap (upper - lower) / |upper|; None without a finite bound."""
+    if upper is None or not np.isfinite(upper):
+        return None
+    return max(0.0, upper - lower) / max(abs(upper), 1e-9)
+
+
+def quick_summary(quick: dict, label: str = "Quick") -> str:
+    """One-line report of a quick answer: its XI points, the search and the gap to the LP bound."""
+    line = (f"{label}: {quick['xi_points']:.2f} XI pts in {quick['elapsed_s']:.2f}s "
+            f"(first after {1000 * (quick['first_s'] or 0.0):.1f} ms, {quick['iterations']} swaps, "
+            f"{quick['restarts']} restarts)")
+    if quick.get("lp_bound") is None:
+        return line + "; no LP bound"
+    if quick["gap"] is None:
+        return line + "; LP bound unavailable"
+    return line + f"; LP bound {quick['lp_bound']:.2f}, gap {100 * quick['gap']:.1f}%"
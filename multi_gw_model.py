@@ -0,0 +1,305 @@
+# multi_gw_model.py – multi-gameweek transfer planner (bank + free-transfer rollover)
+# --------------------------------------------------------
+# The 1GW and 3GW optimizers each pick transfers for one horizon and the plans were
+# reconciled by hand. MultiGWPlanner plans GW1..GWH in one MILP, starting from the
+# owned 15, the bank and the free transfers (FT) in hand:
+#
+#   squad[i,g] = squad[i,g-1] + buy[i,g] - sell[i,g]         (squad[i,0] = owned)
+#   bank[g]    = bank[g-1] + sum(price * sell) - sum(price * buy) >= 0
+#   hits[g]   >= bought[g] - ft[g],  0 <= hits[g] <= bought[g]
+#   ft[g+1]   <= ft[g] - bought[g] + hits[g] + 1,  ft[g+1] <= max_ft
+#
+# plus the usual 15-man caps, max per club, a valid XI (1 GK, 3-5 DEF, 2-5 MID,
+# 1-3 FWD) and the optional bench budget in every GW. The objective is
+#   sum_g (XI points + bench_weight * bench points) - hit_cost * sum_g hits
+# with per-GW points from horizon_points(). Paying a hit now to bank a free
+# transfer for later would tie with taking the hit later, so earlier hits are made
+# a hair (HIT_TIE) dearer and hits[g] always comes out as max(0, bought - ft). Prices are the CSV prices throughout,
+# as in TransferModel's budget.
+#
+# The model grows linearly with the horizon and CBC time grows faster than that, so
+# plan(window=W) solves it rolling: plan GWs t..t+W-1 from the current state,
+# keep only GW t's moves, step on (the last window keeps all its GWs). time_limit
+# is a budget for the whole plan, shared out over the windows still to solve; a
+# solve that hits its share returns CBC's best integer plan so far.
+# Presolve uses per-GW point tuples with churn = max_transfers_per_gw * horizon
+# (see presolve.py), so it is still exact but removes fewer players than for one GW.
+
+from time import perf_counter
+from typing import Dict, List, Set
+
+import pandas as pd
+from pulp import LpProblem, LpMaximize, LpSolutionOptimal, LpVariable, lpSum, value
+
+from presolve import presolve_pool
+from solvers import make_solver, solved
+from transfer_model import XI_BOUNDS
+from utils_2025 import SQUAD_CAPS, group_ids
+
+BENCH_WEIGHT = 0.01  # bench points only break ties between equal XIs
+MAX_FT = 5
+HIT_TIE = 1e-3
+
+
+def gw_columns(horizon: int) -> List[str]:
+    return [f"Points_gw{g + 1}" for g in range(horizon)]
+
+
+def horizon_points(pool_df: pd.DataFrame, df_3gw: pd.DataFrame | None, horizon: int) -> pd.DataFrame:
+    """
+    pool_df (1GW predictions, with 'key') plus Points_gw1..Points_gwH.
+    GW1 uses the 1GW points. Later GWs use the 3GW points, rescaled so their pool
+    total matches the 1GW total: the horizon CSVs are on different scales, and a 3GW
+    row is not a 3-week sum. Rows missing from df_3gw (or every row, when df_3gw
+    is None) keep their 1GW points for the whole horizon.
+    """
+    df = pool_df.copy()
+    p1 = df["Points"].astype(float)
+    later = p1
+    if df_3gw is not None:
+        p3_by_key = df_3gw.drop_duplicates("key").set_index("key")["Points"].astype(float)
+        p3 = df["key"].map(p3_by_key)
+        both = p3.notna() & (p1 > 0) & (p3 > 0)
+        scale = p1[both].sum() / p3[both].sum() if both.any() else 1.0
+        later = (p3 * scale).fillna(p1)
+    for g, col in enumerate(gw_columns(horizon)):
+        df[col] = p1 if g == 0 else later
+    return df
+
+
+class MultiGWPlanner:
+    """
+    Transfer plan over `horizon` gameweeks for one pool/owned squad.
+
+    plan(window=None) solves the whole horizon in one model; plan(window=W) rolls
+    a W-GW window forward (see the module header). time_limit (seconds) bounds
+    the solver time of the whole plan. Either way the result is
+      {"gws": [per-GW dict], "total_points", "hits", "net_points",
+       "solves": [{"gws", "build_s", "solve_s", "status"}], "build_s", "solve_s"}
+    with each GW holding squad/starting/bench PIDs, buys/sells, bank, ft, hits
+    and XI points. None if some window is infeasible.
+
+    pool_df needs 'key' and Points_gw1..Points_gwH (horizon_points()).
+    """
+
+    def __init__(
+        self,
+        pool_df: pd.DataFrame,
+        owned_df: pd.DataFrame,
+        bank_m: float,
+        horizon: int,
+        free_transfers: int = 1,
+        hit_cost: float = 4.0,
+        max_transfers_per_gw: int | None = 2,
+        max_ft: int = MAX_FT,
+        max_per_team: int = 3,
+        bench_budget: float | None = None,
+        keep_names: Set[str] = None,
+        exclude_names: Set[str] = None,
+        bench_weight: float = BENCH_WEIGHT,
+        solver: str = "cbc",
+        solver_msg: bool = False,
+        time_limit: float | None = None,
+        presolve: bool = True,
+        tmp_dir: str = None,
+    ):
+        if horizon < 1:
+            raise ValueError(f"horizon must be >= 1, got {horizon}")
+        missing = set(gw_columns(horizon)) - set(pool_df.columns)
+        if missing:
+            raise ValueError(f"pool_df is missing per-GW points {sorted(missing)} (see horizon_points)")
+        make_solver(solver)  # fail fast on an unknown/unavailable backend
+        t_build = perf_counter()
+
+        self.horizon = horizon
+        self.free_transfers = min(max_ft, max(0, int(free_transfers)))
+        self.hit_cost = hit_cost
+        self.max_transfers_per_gw = max_transfers_per_gw
+        self.max_ft = max_ft
+        self.max_per_team = max_per_team
+        self.bench_budget = bench_budget
+        self.bench_weight = bench_weight
+        self.solver = solver
+        self.solver_msg = solver_msg
+        self.time_limit = time_limit
+        self.tmp_dir = tmp_dir
+        self.bank_m = float(bank_m)
+
+        df = pool_df.copy().reset_index(drop=True)
+        df["PID"] = df.index
+        self.df = df
+        by_pid = df.set_index("PID")
+        self.name  = by_pid["Name"].to_dict()
+        self.team  = by_pid["Team"].to_dict()
+        self.pos   = by_pid["Position"].to_dict()
+        self.price = by_pid["Price"].astype(float).to_dict()
+        self.pts = {
+            pid: tuple(float(by_pid.at[pid, c]) for c in gw_columns(horizon))
+            for pid in by_pid.index
+        }
+
+        pid_by_key = df.set_index("key")["PID"].to_dict()
+        self.owned = {pid_by_key[k] for k in set(owned_df["key"]) if k in pid_by_key}
+
+        by_name: Dict[str, Set[int]] = df.groupby("Name")["PID"].apply(set).to_dict()
+        self.keep_ids = set().union(*(by_name.get(n, set()) for n in (keep_names or [])))
+        self.exc_ids = set().union(*(by_name.get(n, set()) for n in (exclude_names or [])))
+
+        # Excluded players we don't own need no variables; owned ones must be sold
+        id_list = df["PID"].tolist()
+        self.presolve = None
+        if presolve:
+            churn = 15 * horizon if max_transfers_per_gw is None else max_transfers_per_gw * horizon
+            id_list, self.presolve = presolve_pool(
+                id_list, self.pos, self.team, self.price, self.pts, SQUAD_CAPS, max_per_team, 15,
+                excluded=self.exc_ids - self.owned - self.keep_ids,
+                protected=self.owned | self.keep_ids, churn=churn,
+            )
+        self.id_list = id_list
+        self.by_pos = group_ids(id_list, self.pos)
+        self.by_club = group_ids(id_list, self.team)
+        self.build_s = perf_counter() - t_build
+
+    # ------------------------ One window ------------------------ #
+
+    def _build(self, squad: Set[int], bank: float, ft: int, gws: List[int]) -> dict:
+        id_list, price, pts = self.id_list, self.price, self.pts
+        by_pos, by_club = self.by_pos, self.by_club
+        T = range(len(gws))
+
+        m = LpProblem("FPL_MultiGW", LpMaximize)
+        idx = [(i, t) for i in id_list for t in T]
+        x = LpVariable.dicts("squad", idx, 0, 1, cat="Binary")
+        y = LpVariable.dicts("start", idx, 0, 1, cat="Binary")
+        buy = LpVariable.dicts("buy", idx, 0, 1, cat="Binary")
+        sell = LpVariable.dicts("sell", idx, 0, 1, cat="Binary")
+        bank_v = LpVariable.dicts("bank", T, 0)
+        hits = LpVariable.dicts("hits", T, 0, 15, cat="Integer")
+        ft_v = LpVariable.dicts("ft", T, 0, self.max_ft, cat="Integer")
+
+        for t in T:
+            bought = lpSum(buy[i, t] for i in id_list)
+            for i in id_list:
+                prev = (1 if i in squad else 0) if t == 0 else x[i, t - 1]
+                m += x[i, t] == prev + buy[i, t] - sell[i, t]
+                m += y[i, t] <= x[i, t]
+
+            m += lpSum(x[i, t] for i in id_list) == 15
+            m += lpSum(y[i, t] for i in id_list) == 11
+            for P, cap in SQUAD_CAPS.items():
+                m += lpSum(x[i, t] for i in by_pos.get(P, [])) == cap
+            m += lpSum(y[i, t] for i in by_pos.get("Goalkeeper", [])) == 1
+            for P, (lo, hi) in XI_BOUNDS.items():
+                count = lpSum(y[i, t] for i in by_pos.get(P, []))
+                m += count >= lo
+                m += count <= hi
+            for club, members in by_club.items():
+                m += lpSum(x[i, t] for i in members) <= self.max_per_team
+            if self.bench_budget is not None:
+                m += lpSum(price[i] * (x[i, t] - y[i, t]) for i in id_list) <= self.bench_budget
+
+            prev_bank = bank if t == 0 else bank_v[t - 1]
+            m += bank_v[t] == prev_bank + lpSum(price[i] * (sell[i, t] - buy[i, t]) for i in id_list)
+
+            # Free transfers: the first GW's are known; later ones roll over (max max_ft)
+            if t == 0:
+                m += ft_v[t] == ft
+            else:
+                m += ft_v[t] <= ft_v[t - 1] - lpSum(buy[i, t - 1] for i in id_list) + hits[t - 1] + 1
+            m += hits[t] >= bought - ft_v[t]
+            m += hits[t] <= bought
+            if self.max_transfers_per_gw is not None:
+                m += bought <= self.max_transfers_per_gw
+
+            for i in self.keep_ids & set(id_list):
+                m += x[i, t] == 1
+            for i in self.exc_ids & set(id_list) - self.keep_ids:
+                m += x[i, t] == 0
+
+        g0 = gws[0]
+        m += (
+            lpSum(pts[i][g0 + t] * (y[i, t] + self.bench_weight * (x[i, t] - y[i, t])) for i in id_list for t in T)
+            - self.hit_cost * lpSum((1 + HIT_TIE * (len(gws) - t)) * hits[t] for t in T)
+        )
+        return {"m": m, "x": x, "y": y, "buy": buy, "sell": sell, "bank": bank_v, "hits": hits, "ft": ft_v, "gws": gws}
+
+    def _read(self, p: dict, t: int) -> dict:
+        """Decisions of window slot t as a per-GW dict."""
+        x, y, buy, sell = p["x"], p["y"], p["buy"], p["sell"]
+        g = p["gws"][t]
+        pts = {i: self.pts[i][g] for i in self.id_list}
+        squad = [i for i in self.id_list if value(x[i, t]) > 0.5]
+        starting = [i for i in squad if value(y[i, t]) > 0.5]
+        bench = sorted((i for i in squad if i not in set(starting)), key=lambda i: pts[i], reverse=True)
+        buys = [i for i in self.id_list if value(buy[i, t]) > 0.5]
+        sells = [i for i in self.id_list if value(sell[i, t]) > 0.5]
+        return {
+            "gw": g + 1,
+            "squad": squad,
+            "starting": starting,
+            "bench": bench,
+            "in": buys,
+            "out": sells,
+            "transfers": len(buys),
+            "ft": int(round(value(p["ft"][t]))),
+            "hits": int(round(value(p["hits"][t]))),
+            "bank": float(value(p["bank"][t])),
+            "xi_points": sum(pts[i] for i in starting),
+            "bench_points": sum(pts[i] for i in bench),
+        }
+
+    # ------------------------ Plan ------------------------ #
+
+    def plan(self, window: int | None = None):
+        """Full-horizon plan (window None or >= horizon) or rolling W-GW windows."""
+        H = self.horizon
+        W = H if not window or window >= H else max(1, int(window))
+        squad, bank, ft = set(self.owned), self.bank_m, self.free_transfers
+        gws_out, solves = [], []
+        n_windows = H - W + 1
+        t_start = perf_counter()
+
+        t0 = 0
+        while t0 < H:
+            gws = list(range(t0, min(t0 + W, H)))
+            last = gws[-1] == H - 1
+            t_build = perf_counter()
+            p = self._build(squad, bank, ft, gws)
+            build_s = perf_counter() - t_build
+            limit = None
+            if self.time_limit is not None:
+                left = self.time_limit - (perf_counter() - t_start)
+                limit = max(1.0, left / (n_windows - len(solves)))
+            t_solve = perf_counter()
+            status = p["m"].solve(make_solver(self.solver, msg=self.solver_msg, tmp_dir=self.tmp_dir, time_limit=limit))
+            solve_s = perf_counter() - t_solve
+            ok = solved(p["m"], status)
+            if not ok:
+                status_txt = "Infeasible"
+            else:
+                status_txt = "Optimal" if p["m"].sol_status == LpSolutionOptimal else "Time limit"
+            solves.append({"gws": [g + 1 for g in gws], "build_s": build_s, "solve_s": solve_s, "status": status_txt})
+            if not ok:
+                return None
+
+            # Keep GW t0 only, unless this window reaches the end of the horizon
+            for t in range(len(gws) if last else 1):
+                gw = self._read(p, t)
+                gws_out.append(gw)
+                squad = set(gw["squad"])
+                bank = gw["bank"]
+                ft = min(self.max_ft, max(0, gw["ft"] - gw["transfers"]) + 1)
+            t0 = H if last else t0 + 1
+
+        total = sum(g["xi_points"] for g in gws_out)
+        n_hits = sum(g["hits"] for g in gws_out)
+        return {
+            "gws": gws_out,
+            "total_points": total,
+            "hits": n_hits,
+            "net_points": total - self.hit_cost * n_hits,
+            "solves": solves,
+            "build_s": self.build_s + sum(s["build_s"] for s in solves),
+            "solve_s": sum(s["solve_s"] for s in solves),
+            "_df": self.df,
+        }
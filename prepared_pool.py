@@ -0,0 +1,101 @@
+# prepared_pool.py – the predictions pool indexed once per run
+# --------------------------------------------------------
+# Every TransferModel used to re-derive its lookups from the pool frame: a copy
+# with a PID column, set_index("PID") into five {PID: value} dicts, set_index("key")
+# for the owned PIDs and a groupby("Name") for the include/exclude names. main()
+# builds a second model for --top, each --jobs worker task builds its own, and the
+# report re-indexed the frame per block and did a df.loc per printed row.
+# PreparedPool does that indexing once; main() builds it and hands the same object
+# to the models and the reporter.
+#   arrays   – name/key (object), price/points (float64) and team/position as
+#              small int codes into .teams / .positions, one slot per PID (PID =
+#              row position, as before).
+#   indexes  – key -> PID (the last row wins, as set_index did), Name -> PIDs.
+#   dicts    – the {PID: value} views the models, presolve and the XI arrangement
+#              take, built on first use and shared by every model on the pool.
+#   extra    – further float columns a report prints (the variant CLIs pass
+#              Points_Original), as arrays under .extra and in row().
+# .df is the frame with its PID column (cache fingerprints and payload["_df"]
+# readers keep working). Pickling sends the frame and arrays but not the dicts,
+# so a worker rebuilds only what it uses.
+
+from functools import cached_property
+from typing import Dict, Iterable, Sequence, Set
+
+import numpy as np
+import pandas as pd
+
+_VIEWS = ("name_by_pid", "team_by_pid", "pos_by_pid", "price_by_pid", "pts_by_pid", "key_by_pid")
+
+
+class PreparedPool:
+    """Parallel PID-indexed arrays (plus key/Name indexes) for one pool frame (Name/Team/Position/Price/Points/key)."""
+
+    def __init__(self, pool_df: pd.DataFrame, extra: Sequence[str] = ()):
+        df = pool_df.copy().reset_index(drop=True)
+        df["PID"] = df.index
+        self.df = df
+        self.n = len(df)
+
+        self.names = df["Name"].to_numpy(dtype=object)
+        self.keys = df["key"].to_numpy(dtype=object)
+        self.price = df["Price"].to_numpy(dtype=np.float64)
+        self.points = df["Points"].to_numpy(dtype=np.float64)
+        team_code, self.teams = pd.factorize(df["Team"], use_na_sentinel=False)
+        pos_code, self.positions = pd.factorize(df["Position"], use_na_sentinel=False)
+        self.team_code = team_code.astype(np.int16)
+        self.pos_code = pos_code.astype(np.int8)
+        self.extra: Dict[str, np.ndarray] = {col: df[col].to_numpy(dtype=np.float64) for col in extra}
+
+        self.pid_by_key: Dict[str, int] = dict(zip(self.keys.tolist(), range(self.n)))
+        self.ids_by_name: Dict[str, np.ndarray] = df.groupby("Name", sort=False).indices
+
+    def ids_for_names(self, names: Iterable[str]) -> Set[int]:
+        """PIDs of every row whose Name is in names."""
+        out = set()
+        for nm in names or []:
+            out.update(self.ids_by_name.get(nm, np.empty(0, dtype=int)).tolist())
+        return out
+
+    def row(self, pid: int) -> dict:
+        """Name/Team/Position/Price/Points/key (and the extra columns) of one PID (what a report line prints)."""
+        out = {"Name": self.names[pid], "Team": self.teams[self.team_code[pid]],
+               "Position": self.positions[self.pos_code[pid]], "Price": float(self.price[pid]),
+               "Points": float(self.points[pid]), "key": self.keys[pid]}
+        for col, arr in self.extra.items():
+            out[col] = float(arr[pid])
+        return out
+
+    def nbytes(self) -> int:
+        """Bytes held by the arrays and the two indexes (excluding .df and the dict views)."""
+        arrays = (self.names, self.keys, self.price, self.points, self.team_code, self.pos_code, *self.extra.values())
+        return sum(a.nbytes for a in arrays) + sum(g.nbytes for g in self.ids_by_name.values())
+
+    # ------------------------ Dict views ------------------------ #
+
+    @cached_property
+    def name_by_pid(self) -> Dict[int, str]:
+        return dict(enumerate(self.names.tolist()))
+
+    @cached_property
+    def team_by_pid(self) -> Dict[int, str]:
+        return dict(enumerate(self.teams[self.team_code].tolist()))
+
+    @cached_property
+    def pos_by_pid(self) -> Dict[int, str]:
+        return dict(enumerate(self.positions[self.pos_code].tolist()))
+
+    @cached_property
+    def price_by_pid(self) -> Dict[int, float]:
+        return dict(enumerate(self.price.tolist()))
+
+    @cached_property
+    def pts_by_pid(self) -> Dict[int, float]:
+        return dict(enumerate(self.points.tolist()))
+
+    @cached_property
+    def key_by_pid(self) -> Dict[int, str]:
+        return dict(enumerate(self.keys.tolist()))
+
+    def __getstate__(self):
+        return {k: v for k, v in self.__dict__.items() if k not in _VIEWS}
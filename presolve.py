@@ -0,0 +1,131 @@
+# presolve.py – shrink the candidate pool before a squad MILP is built
+# --------------------------------------------------------
+# The prediction CSVs carry 180–700 rows, but most of them can never be picked.
+# Two kinds of rows are removed before any variable is created:
+#
+#   excluded   – players the caller has already ruled out (exclude lists, excluded
+#                or not-included teams, blocked buys). These used to become
+#                `x[i] == 0` rows; now they simply get no variables.
+#   dominated  – player i with so many same-position players j that are no dearer
+#                and score no less (price_j <= price_i, pts_j >= pts_i; exact ties
+#                go to the earlier row) that, in ANY feasible squad holding i, at
+#                least one such j is left over and can replace i: it is not in the
+#                squad (at most slots-1 others of i's position are) and its club is
+#                not already full (at most (squad_size-1) // max_per_team other
+#                clubs can be). Swapping i -> j keeps every count, never raises the
+#                price and never lowers XI/bench points, so an optimal squad
+#                without i always exists.
+#
+# Protected rows (owned players, includes) are never dropped as dominated, and the
+# swap partner may be any remaining row, so the argument holds for the transfer
+# model too (a swap to an owned player only lowers the transfer count).
+#
+# Multi-gameweek plans pass per-GW point tuples (j must score no less in every GW)
+# and `churn`, the most players that can be bought over the horizon. i is swapped
+# for j in every GW it is held. So j must stay out of the squad for that whole
+# stretch, and its club must never be full. Each buy adds at most one more
+# same-position player and fills at most one more club, so both allowances grow
+# by churn.
+
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def presolve_pool(
+    ids: List,
+    pos: Dict,
+    team: Dict,
+    price: Dict,
+    pts: Dict,
+    slots_by_pos: Dict[str, int],
+    max_per_team: int,
+    squad_size: int,
+    excluded: Iterable = (),
+    protected: Iterable = (),
+    churn: int = 0,
+) -> Tuple[List, dict]:
+    """
+    Returns (kept ids in input order, stats). stats has 'players', 'excluded',
+    'dominated' and 'kept' counts; see presolve_summary() for a one-line report.
+    pts values may be numbers or equal-length per-GW tuples.
+    """
+    excluded = set(excluded)
+    protected = set(protected)
+    candidates = [i for i in ids if i not in excluded]
+    full_clubs = max(0, (squad_size - 1) // max(1, max_per_team)) + churn
+
+    dominated = set()
+    for P, slots in slots_by_pos.items():
+        grp = [i for i in candidates if pos[i] == P]
+        n = len(grp)
+        if slots <= 0 or n <= slots:
+            continue
+        pr = np.array([float(price[i]) for i in grp])
+        pt = np.array([np.atleast_1d(pts[i]) for i in grp], dtype=float)
+        order = np.arange(n)
+
+        # dom[j, i]: j can always stand in for i
+        dom = (pr[:, None] <= pr[None, :]) & (pt[:, None, :] >= pt[None, :, :]).all(axis=2)
+        dom &= (pr[:, None] < pr[None, :]) | (pt[:, None, :] > pt[None, :, :]).any(axis=2) | (order[:, None] < order[None, :])
+        n_dom = dom.sum(axis=0)
+
+        # Dominators per club; i's own club never blocks a swap
+        clubs, codes = np.unique([str(team[i]) for i in grp], return_inverse=True)
+        by_club = (codes[None, :] == np.arange(len(clubs))[:, None]).astype(int) @ dom
+        by_club[codes, order] = 0
+        blocked = np.sort(by_club, axis=0)[-full_clubs:].sum(axis=0) if full_clubs else 0
+
+        spare = n_dom - (slots - 1 + churn) - blocked
+        dominated.update(i for i, s in zip(grp, spare) if s >= 1 and i not in protected)
+
+    kept = [i for i in candidates if i not in dominated]
+    stats = {
+        "players": len(ids),
+        "excluded": len(ids) - len(candidates),
+        "dominated": len(dominated),
+        "kept": len(kept),
+    }
+    return kept, stats
+
+
+def presolve_summary(stats: dict, vars_per_player: int) -> str:
+    removed = stats["players"] - stats["kept"]
+    return (f"Presolve: {stats['players']} -> {stats['kept']} players "
+            f"(excluded {stats['excluded']}, dominated {stats['dominated']}); "
+            f"{removed * vars_per_player} fewer variables")
+
+
+def presolve_frame(
+    df: pd.DataFrame,
+    slots_by_pos: Dict[str, int],
+    max_per_team: int,
+    squad_size: int,
+    excluded_players: Iterable[str] = (),
+    excluded_teams: Iterable[str] = (),
+    included_teams: Iterable[str] = (),
+    included_players: Iterable[str] = (),
+) -> Tuple[pd.DataFrame, dict]:
+    """
+    DataFrame variant for the legacy utils.py builders: drops excluded and
+    dominated rows and returns the rest re-indexed 0..n-1 (they address rows by
+    position). Included players are kept as-is.
+    """
+    df = df.reset_index(drop=True)
+    ids = list(df.index)
+    names = df["Name"]
+    included_players = set(included_players or [])
+    included_teams = set(included_teams or [])
+
+    excluded = set(df.index[names.isin(set(excluded_players or [])) | df["Team"].isin(set(excluded_teams or []))])
+    if included_teams:
+        excluded |= set(df.index[~df["Team"].isin(included_teams)])
+    protected = set(df.index[names.isin(included_players)])
+    excluded -= protected
+
+    kept, stats = presolve_pool(
+        ids, df["Position"].to_dict(), df["Team"].to_dict(), df["Price"].to_dict(), df["Points"].to_dict(),
+        slots_by_pos, max_per_team, squad_size, excluded=excluded, protected=protected,
+    )
+    return df.loc[kept].reset_index(drop=True), stats
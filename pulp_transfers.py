@@ -1,149 +1,254 @@
+# pulp_transfers.py – ranked t-for-t transfer sets per transfer count, as one MILP per squad
+# --------------------------------------------------------
+# Remove/add binaries over the sellable squad and the pool: points in minus points
+# out is maximised, with as many in as out per position, the money out plus the bank
+# covering the money in, and at most max_per_team per club after the moves (club
+# counts over the whole squad, not-to-remove players included). Each squad's model is
+# built once from numpy coefficient arrays; the transfer count is the right-hand
+# side of the transfers_out / transfers_in rows, so sweeping t = 1..N only changes
+# those two bounds. The top_m sets per count come from no-good cuts on the live model
+# (solution_pool.iter_distinct); they are dropped again before the next count.
+#
+# Run as a script it does this for every team_<name>.csv / transferable_players_<name>.csv
+# pair in --dir and writes one consolidated report (.txt as before, plus .csv and .json).
+# Points are reported x3 (POINTS_SCALE), as transfer_results.txt always showed them.
+
+import argparse
+import glob
+import json
+import os
 import time
-import pandas as pd
-from pulp import LpMaximize, LpProblem, LpVariable, lpSum
-from pprint import pprint
-
-start_time = time.time()
-
-# Load the data from a file into a table called "table1"
-# table1 = pd.read_csv("team_niyi.csv")
-# table1 = pd.read_csv("team_joy.csv")
-table1 = pd.read_csv("team_tosin.csv")
-# table1 = pd.read_csv("mod_challenge_players.csv")
-
-# Load the data from another file into a table called "transferable_players_info.csv"
-# table2 = pd.read_csv("transferable_players_niyi.csv")
-# table2 = pd.read_csv("transferable_players_joy.csv")
-table2 = pd.read_csv("transferable_players_tosin.csv")
+from typing import Dict, Iterable, List
 
-# Combine teams from table1 and table2
-unique_teams = set(table1["Team"].unique()).union(table2["Team"].unique())
-
-# Create a dictionary with teams as keys and counts as zero
-team_counts = {team: 0 for team in unique_teams}
-
-# Count the number of occurrences of every team in table1 and update the dictionary
-for team in table1["Team"]:
-    team_counts[team] += 1
+import numpy as np
+import pandas as pd
+from pulp import LpAffineExpression, LpMaximize, LpProblem, LpVariable, value
 
-# Remove players already in table1 from table2
-table2 = table2[~table2["Name"].isin(table1["Name"])]
+from solution_pool import iter_distinct
+from solvers import SOLVER_BACKENDS, make_solver, solved, solver_tmp_dir
 
-# Set the number of players we want to transfer and our maximum budget
-# transfers = 1
-# budget_remaining = 1.0
-# budget_remaining = 0.5
-budget_remaining = 3.8
+POSITIONS = ("Goalkeeper", "Defender", "Midfielder", "Forward")
+TRANSFERS_OUT = "transfers_out"
+TRANSFERS_IN = "transfers_in"
+POINTS_SCALE = 3
 
 players_not_to_remove = ["O'Shea"]  # Replace with the names of the players you don't want to remove
 players_not_to_add = ['Tielemans', 'Butler-Oyedeji', 'G.Jesus', 'Füllkrug', 'Ferguson', 'Ings', 'Antonio']  # Replace with the names of the players you don't want to add
 
-# Remove the players we don't want to consider for removal from table1
-table1 = table1[~table1["Name"].isin(players_not_to_remove)]
-
-# Remove the players we don't want to consider for adding from table2
-table2 = table2[~table2["Name"].isin(players_not_to_add)]
-
-# Initialize list to store all the results
-all_results = []
-
-# Loop over the number of transfers 1 to 12
-for transfers in range(2, 3):
-
-    # Initialize the problem
-    prob = LpProblem("OptimalTransfers", LpMaximize)
-
-    # Define variables for players to remove and add
-    remove_vars = LpVariable.dicts("Remove", table1.index, 0, 1, cat="Binary")
-    add_vars = LpVariable.dicts("Add", table2.index, 0, 1, cat="Binary")
-
-    # Add the objective function: maximize the difference in points
-    prob += lpSum(add_vars[i] * table2.loc[i, "Points"] for i in table2.index) - \
-            lpSum(remove_vars[i] * table1.loc[i, "Points"] for i in table1.index)
 
-    # Constraint: exactly 'transfers' players to be transferred out
-    prob += lpSum(remove_vars[i] for i in table1.index) == transfers
-
-    # Constraint: exactly 'transfers' players to be transferred in
-    prob += lpSum(add_vars[i] for i in table2.index) == transfers
-
-    # Constraint: total cost must not exceed available budget
-    prob += lpSum(remove_vars[i] * table1.loc[i, "Price"] for i in table1.index) + budget_remaining >= \
-            lpSum(add_vars[i] * table2.loc[i, "Price"] for i in table2.index)
-
-    # Constraint: maintain position counts
-    for position in table1["Position"].unique():
-        prob += lpSum(remove_vars[i] for i in table1.index if table1.loc[i, "Position"] == position) == \
-                lpSum(add_vars[i] for i in table2.index if table2.loc[i, "Position"] == position)
-
-    # Add constraint to ensure no more than 3 players from any team
-    for team in unique_teams:
-        prob += lpSum(add_vars[i] for i in table2.index if table2.loc[i, "Team"] == team) + \
-                team_counts.get(team, 0) - lpSum(remove_vars[i] for i in table1.index if table1.loc[i, "Team"] == team) <= 3
-
-    # # Constraint: Do not remove players projected to score more than 5.5 points
-    # for i in table1.index:
-    #     if table1.loc[i, "Points"] >= 1:
-    #         prob += remove_vars[i] == 0
-
-    # # Constraint: Allow only transfers if there's at least a 50% gain in points
-    # prob += lpSum(add_vars[i] * table2.loc[i, 'Points'] for i in table2.index) >= 1.2 * lpSum(remove_vars[i] *
-    # table1.loc[i, 'Points'] for i in table1.index)
-
-    print(table1)
-    print(table2)
-
-    # Solve the problem
-    prob.solve()
-
-    # Check and print the results
-    best_transfer_out = [i for i in table1.index if remove_vars[i].varValue >= 1]
-    best_transfer_in = [i for i in table2.index if add_vars[i].varValue >= 1]
-
-    if best_transfer_out and best_transfer_in:
-        result = {
-            'transfers': transfers,
-            'out': table1.loc[best_transfer_out],
-            'in': table2.loc[best_transfer_in],
-            'points_out': sum(table1.loc[best_transfer_out]['Points']),
-            'points_in': sum(table2.loc[best_transfer_in]['Points']),
-            'points_diff': (sum(table2.loc[best_transfer_in]['Points']) - sum(table1.loc[best_transfer_out]['Points'])) / (sum(table1.loc[best_transfer_out]['Points']) + 0.1),
-            'budget_left': sum(table1.loc[best_transfer_out]["Price"]) + budget_remaining - sum(table2.loc[best_transfer_in]["Price"]),
-
-        }
-        all_results.append(result)
-
-    else:
-        result = {
-            'transfers': transfers,
-            'out': 'None',
-            'in': 'No valid transfer combination found.',
-            'points_out': 0,
-            'points_in': 0,
-            'points_diff': 0,
-            'budget_left': 0,
+class TransferSetModel:
+    """
+    The remove/add MILP for `team` (Name/Team/Position/Price/Points rows) and `pool`
+    (same columns; players already in the team are ignored). keep: names never sold;
+    block: names never bought. Results refer to the frames' index labels.
+    """
+
+    def __init__(self, team: pd.DataFrame, pool: pd.DataFrame, bank: float, max_per_team: int = 3,
+                 keep: Iterable[str] = (), block: Iterable[str] = (), solver: str = "cbc",
+                 solver_msg: bool = False, tmp_dir: str = None):
+        self.team = team
+        self.sell = team[~team["Name"].isin(set(keep))]
+        self.pool = pool[~pool["Name"].isin(team["Name"]) & ~pool["Name"].isin(set(block))]
+        self.bank = float(bank)
+        self.solver = make_solver(solver, msg=solver_msg, tmp_dir=tmp_dir)
+
+        s_pts, s_price = self.sell["Points"].to_numpy(dtype=float), self.sell["Price"].to_numpy(dtype=float)
+        p_pts, p_price = self.pool["Points"].to_numpy(dtype=float), self.pool["Price"].to_numpy(dtype=float)
+        self.remove = [LpVariable(f"Remove_{i}", cat="Binary") for i in range(len(self.sell))]
+        self.add = [LpVariable(f"Add_{j}", cat="Binary") for j in range(len(self.pool))]
+
+        def expr(add_idx=(), add_coef=1.0, rem_idx=(), rem_coef=-1.0):
+            add_coef = np.broadcast_to(add_coef, len(add_idx)).tolist()
+            rem_coef = np.broadcast_to(rem_coef, len(rem_idx)).tolist()
+            return LpAffineExpression(list(zip([self.add[j] for j in add_idx], add_coef))
+                                      + list(zip([self.remove[i] for i in rem_idx], rem_coef)))
+
+        every_add, every_rem = np.arange(len(self.pool)), np.arange(len(self.sell))
+        m = LpProblem("OptimalTransfers", LpMaximize)
+        self.points_in = expr(every_add, p_pts)
+        self.points_out = expr(rem_idx=every_rem, rem_coef=s_pts)
+        m += self.points_in - self.points_out
+        m += (expr(rem_idx=every_rem, rem_coef=1.0) == 0, TRANSFERS_OUT)
+        m += (expr(every_add) == 0, TRANSFERS_IN)
+        m += (expr(every_add, -p_price, every_rem, s_price) >= -self.bank, "budget")
+
+        # Same positions in as out, for every position (a position with no sellable
+        # player can't be bought either)
+        s_pos, p_pos = self.sell["Position"].to_numpy(), self.pool["Position"].to_numpy()
+        for P in POSITIONS:
+            m += (expr(np.flatnonzero(p_pos == P), 1.0, np.flatnonzero(s_pos == P)) == 0, f"pos_{P}")
+
+        # Clubs the pool can add to: at most max_per_team after the moves
+        s_club, p_club = self.sell["Team"].to_numpy(), self.pool["Team"].to_numpy()
+        count = team["Team"].value_counts()
+        for n, club in enumerate(sorted(set(p_club))):
+            m += (expr(np.flatnonzero(p_club == club), 1.0, np.flatnonzero(s_club == club))
+                  <= max_per_team - int(count.get(club, 0)), f"club_{n}")
+        self.m = m
+
+    def _set_transfers(self, t: int):
+        self.m.constraints[TRANSFERS_OUT].changeRHS(t)
+        self.m.constraints[TRANSFERS_IN].changeRHS(t)
+
+    def iter_sets(self, transfers: int, limit: int | None = None):
+        """
+        Result dicts for exactly `transfers` moves, best points gain first, each a
+        different set of players out and in. The no-good cuts are removed again when
+        the generator finishes or is closed.
+        """
+        self._set_transfers(int(transfers))
+        picks = self.remove + self.add
+        n_cuts = [0]
+
+        def solve_pass(_):
+            if not solved(self.m, self.m.solve(self.solver)):
+                return None
+            chosen = [n for n, v in enumerate(picks) if v.varValue is not None and v.varValue > 0.5]
+            out = [n for n in chosen if n < len(self.remove)]
+            ins = [n - len(self.remove) for n in chosen if n >= len(self.remove)]
+            return (round(value(self.points_in) - value(self.points_out), 6),), chosen, self._result(out, ins)
+
+        def add_cut(_, squad, rhs):
+            self.m += (LpAffineExpression([(picks[n], 1.0) for n in squad]) <= rhs, f"nogood_{n_cuts[0]}")
+            n_cuts[0] += 1
+
+        try:
+            yield from iter_distinct(1, solve_pass, add_cut, 1, limit)
+        finally:
+            for c in range(n_cuts[0]):
+                self.m.constraints.pop(f"nogood_{c}", None)
+
+    def _result(self, out: List[int], ins: List[int]) -> dict:
+        out_rows, in_rows = self.sell.iloc[out], self.pool.iloc[ins]
+        points_out, points_in = float(out_rows["Points"].sum()), float(in_rows["Points"].sum())
+        return {
+            "out": list(out_rows.index),
+            "in": list(in_rows.index),
+            "points_out": points_out,
+            "points_in": points_in,
+            "points_diff": points_in - points_out,
+            "points_diff_pct": (points_in - points_out) / (points_out + 0.1),
+            "budget_left": float(out_rows["Price"].sum()) + self.bank - float(in_rows["Price"].sum()),
         }
 
-        all_results.append(result)
-
-# Write results to a txt file
-with open("transfer_results.txt", "w", encoding='utf-8') as file:
-    for result in all_results:
-        file.write(f"Transfers: {result['transfers']}\n")
-        file.write(f"Out: \n{result['out']}\n")
-        file.write(f"In: \n{result['in']}\n")
-        file.write(f"Points Out: {result['points_out'] * 3:.2f}\n")
-        file.write(f"Points In: {result['points_in'] * 3:.2f}\n")
-        file.write(f"Points Difference: {(result['points_in'] - result['points_out']) * 3:.2f}\n")
-        file.write(f"Points Diff %: {result['points_diff'] * 100:.2f}%\n")
-        file.write(f"Budget Left: {result['budget_left']:.2f}\n")
-        file.write("\n------------------------------\n")
-
-# Record end time
-end_time = time.time()
-
-# Calculate the total execution time
-execution_time = end_time - start_time
-
-# Print the execution time
-print(f"\nExecution time: {execution_time:.2f} seconds")
+    def sweep(self, max_transfers: int, top_m: int = 5) -> Dict[int, List[dict]]:
+        """{t: the top_m sets of exactly t transfers} for t = 1..max_transfers."""
+        return {t: list(self.iter_sets(t, top_m)) for t in range(1, int(max_transfers) + 1)}
+
+
+def best_transfers_by_count(team: pd.DataFrame, pool: pd.DataFrame, bank: float, max_transfers: int = 3,
+                            top_m: int = 5, **kwargs) -> Dict[int, List[dict]]:
+    """TransferSetModel(...).sweep(max_transfers, top_m); kwargs as for TransferSetModel."""
+    with solver_tmp_dir() as tmp:
+        return TransferSetModel(team, pool, bank, tmp_dir=tmp, **kwargs).sweep(max_transfers, top_m)
+
+
+# ------------------------ Households ------------------------ #
+
+def find_households(folder: str) -> Dict[str, tuple]:
+    """{name: (team csv, transferable players csv)} for every team_<name>.csv with its pair in folder."""
+    found = {}
+    for team_csv in sorted(glob.glob(os.path.join(folder, "team_*.csv"))):
+        name = os.path.basename(team_csv)[len("team_"):-len(".csv")]
+        pool_csv = os.path.join(folder, f"transferable_players_{name}.csv")
+        if os.path.exists(pool_csv):
+            found[name] = (team_csv, pool_csv)
+    return found
+
+
+def _records(rows: pd.DataFrame) -> List[dict]:
+    return rows[["Name", "Team", "Position", "Price", "Points"]].to_dict(orient="records")
+
+
+def write_reports(results: Dict[str, dict], out_stem: str):
+    """
+    results: {household: {"team", "pool", "bank", "sets": {t: [result, ...]}}}.
+    Writes <out_stem>.txt (the old transfer_results.txt blocks), .csv (one row per
+    set) and .json (the same rows with the players as records).
+    """
+    rows = []
+    with open(out_stem + ".txt", "w", encoding='utf-8') as file:
+        for name, r in results.items():
+            file.write(f"===== {name} (bank {r['bank']:.1f}) =====\n\n")
+            for transfers, sets in r["sets"].items():
+                if not sets:
+                    file.write(f"Transfers: {transfers}\n")
+                    file.write("No valid transfer combination found.\n")
+                    file.write("\n------------------------------\n")
+                for rank, result in enumerate(sets, 1):
+                    out_rows, in_rows = r["team"].loc[result["out"]], r["pool"].loc[result["in"]]
+                    file.write(f"Transfers: {transfers} (#{rank})\n")
+                    file.write(f"Out: \n{out_rows}\n")
+                    file.write(f"In: \n{in_rows}\n")
+                    file.write(f"Points Out: {result['points_out'] * POINTS_SCALE:.2f}\n")
+                    file.write(f"Points In: {result['points_in'] * POINTS_SCALE:.2f}\n")
+                    file.write(f"Points Difference: {result['points_diff'] * POINTS_SCALE:.2f}\n")
+                    file.write(f"Points Diff %: {result['points_diff_pct'] * 100:.2f}%\n")
+                    file.write(f"Budget Left: {result['budget_left']:.2f}\n")
+                    file.write("\n------------------------------\n")
+                    rows.append({
+                        "household": name,
+                        "transfers": transfers,
+                        "rank": rank,
+                        "out": _records(out_rows),
+                        "in": _records(in_rows),
+                        "points_out": round(result["points_out"] * POINTS_SCALE, 4),
+                        "points_in": round(result["points_in"] * POINTS_SCALE, 4),
+                        "points_diff": round(result["points_diff"] * POINTS_SCALE, 4),
+                        "points_diff_pct": round(result["points_diff_pct"] * 100, 2),
+                        "budget_left": round(result["budget_left"], 2),
+                    })
+            file.write("\n")
+
+    flat = [{**row, "out": "; ".join(p["Name"] for p in row["out"]), "in": "; ".join(p["Name"] for p in row["in"])}
+            for row in rows]
+    pd.DataFrame(flat, columns=["household", "transfers", "rank", "out", "in", "points_out", "points_in",
+                                "points_diff", "points_diff_pct", "budget_left"]).to_csv(out_stem + ".csv", index=False)
+    with open(out_stem + ".json", "w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=2, ensure_ascii=False)
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Top transfer sets per transfer count for every team_<name>.csv in a folder.")
+    p.add_argument("--dir", type=str, default=".", help="Folder with the team_<name>.csv / transferable_players_<name>.csv pairs")
+    p.add_argument("--households", nargs="*", default=[], help="Only these names (default: every pair found)")
+    p.add_argument("--max_transfers", type=int, default=3)
+    p.add_argument("--top", type=int, default=5, help="Transfer sets to list per transfer count")
+    p.add_argument("--bank", type=float, default=3.8, help="Money in the bank (millions) for every household")
+    p.add_argument("--banks", nargs="*", default=[], metavar="NAME=BANK", help="Per-household bank overrides, e.g. tosin=3.8 joy=0.5")
+    p.add_argument("--max_per_team", type=int, default=3)
+    p.add_argument("--solver", choices=list(SOLVER_BACKENDS), default="cbc")
+    p.add_argument("--outfile", type=str, default="transfer_results", help="Report path without extension (.txt/.csv/.json)")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    start_time = time.time()
+
+    households = find_households(args.dir)
+    if args.households:
+        households = {n: households[n] for n in args.households if n in households}
+    if not households:
+        raise SystemExit(f"No team_<name>.csv / transferable_players_<name>.csv pairs in {args.dir}")
+    banks = dict(item.split("=", 1) for item in args.banks)
+
+    results = {}
+    for name, (team_csv, pool_csv) in households.items():
+        table1, table2 = pd.read_csv(team_csv), pd.read_csv(pool_csv)
+        bank = float(banks.get(name, args.bank))
+        sets = best_transfers_by_count(table1, table2, bank, args.max_transfers, args.top,
+                                       max_per_team=args.max_per_team, keep=players_not_to_remove,
+                                       block=players_not_to_add, solver=args.solver)
+        results[name] = {"team": table1, "pool": table2, "bank": bank, "sets": sets}
+        print(f"{name}: " + ", ".join(f"{t} transfer(s): {len(s)} set(s)" for t, s in sets.items()))
+
+    write_reports(results, args.outfile)
+    print(f"Saved: {args.outfile}.txt, {args.outfile}.csv, {args.outfile}.json")
+
+    # Print the execution time
+    print(f"\nExecution time: {time.time() - start_time:.2f} seconds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# scenarios.py – sampled point scenarios for risk-aware squad selection
+# --------------------------------------------------------
+# The CSVs give one point estimate per player. A scenario run instead draws N
+# outcomes per player around that mean and picks the squad on them:
+#   sample average – expected XI points over the draws (linear, so the usual
+#                    model with the sample means as points);
+#   CVaR           – mean XI points over the worst alpha share of the draws
+#                    (Rockafellar-Uryasev: max eta - sum(short_s) / (alpha N) with
+#                    short_s >= eta - XI_s), mixed in with weight risk_weight.
+# Draws are gamma distributed: non-negative and right-skewed like FPL returns
+# (many blanks, the odd haul), with the player's mean and a spread of
+# cv * mean, where cv comes from the position or price bracket table below.
+# Players with mean <= 0 (e.g. the -9999 fallback rows) keep their mean in
+# every draw. Everything is one (N, players) numpy array; no per-player loops.
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+SPREAD_MODES = ("position", "price")
+# Coefficient of variation of one player's points (sd / mean)
+POSITION_CV = {"Goalkeeper": 0.6, "Defender": 0.7, "Midfielder": 0.8, "Forward": 0.9}
+PRICE_CV = ((5.0, 0.9), (7.5, 0.8), (10.0, 0.7), (float("inf"), 0.6))  # (price below, cv)
+DEFAULT_CV = 0.8
+
+
+def point_spread(df: pd.DataFrame, by: str = "position", scale: float = 1.0) -> np.ndarray:
+    """Per-row sd of df['Points']: cv (by position or price bracket) * |mean| * scale."""
+    if by not in SPREAD_MODES:
+        raise ValueError(f"spread must be one of {SPREAD_MODES}, got {by!r}")
+    mean = df["Points"].to_numpy(dtype=float)
+    if by == "position":
+        cv = df["Position"].map(POSITION_CV).fillna(DEFAULT_CV).to_numpy(dtype=float)
+    else:
+        edges = np.array([hi for hi, _ in PRICE_CV])
+        cvs = np.array([c for _, c in PRICE_CV])
+        cv = cvs[np.searchsorted(edges, df["Price"].to_numpy(dtype=float), side="right").clip(max=len(cvs) - 1)]
+    return cv * np.abs(mean) * float(scale)
+
+
+def draw_scenarios(mean: np.ndarray, sd: np.ndarray, n: int, seed: int = 0) -> np.ndarray:
+    """(n, players) gamma draws with the given means and sds; mean <= 0 or sd == 0 stays constant."""
+    mean = np.asarray(mean, dtype=float)
+    sd = np.asarray(sd, dtype=float)
+    live = (mean > 0) & (sd > 0)
+    shape = np.where(live, (mean / np.where(live, sd, 1.0)) ** 2, 1.0)
+    theta = np.where(live, sd ** 2 / np.where(live, mean, 1.0), 0.0)
+    rng = np.random.default_rng(seed)
+    return rng.gamma(shape, theta, size=(int(n), len(mean))) + np.where(live, 0.0, mean)
+
+
+def cvar(totals: np.ndarray, alpha: float) -> float:
+    """Mean of the worst alpha share of `totals` (the LP's Rockafellar-Uryasev value at its optimum)."""
+    totals = np.asarray(totals, dtype=float)
+    n = len(totals)
+    k = min(n - 1, max(0, int(np.ceil(alpha * n)) - 1))
+    eta = np.partition(totals, k)[k]  # value-at-risk: the k-th worst draw
+    return float(eta - np.maximum(eta - totals, 0.0).sum() / (alpha * n))
+
+
+def scenario_draws(df: pd.DataFrame, spec: Dict) -> np.ndarray:
+    """Draws for df's rows (in row order) under a scenario spec (see wildcard_team_11)."""
+    sd = point_spread(df, spec.get("spread", "position"), spec.get("scale", 1.0))
+    return draw_scenarios(df["Points"].to_numpy(dtype=float), sd, spec["n"], spec.get("seed", 0))
+
+
+def scenario_summary(stats: Dict) -> str:
+    """One-line report of a squad's scenario stats."""
+    return (f"Scenarios: {stats['n']} draws | mean XI {stats['mean']:.2f} | "
+            f"CVaR{100 * stats['alpha']:.0f}% {stats['cvar']:.2f} | objective {stats['objective']:.2f}")
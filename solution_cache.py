@@ -0,0 +1,114 @@
+# solution_cache.py – on-disk cache of solver results
+# --------------------------------------------------------
+# Re-running a script on the same CSV (only a report flag changed) used to re-solve
+# every model. Results are now stored in a content-addressed directory: the file
+# name is a SHA-256 of the normalized pool (Name/Team/Position/Price/Points, in row
+# order, since payload ids index rows) plus every setting that can change the
+# answer. Writes are atomic (temp file + rename) and the directory is kept under
+# a byte budget by evicting the least recently used entries (hits touch the file).
+#
+# FPL_SOLVER_CACHE overrides the location; pass cache=False / --no-cache to bypass.
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from typing import Any, Optional
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get("FPL_SOLVER_CACHE", os.path.join(HERE, ".solver_cache"))
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+CACHE_VERSION = 2  # bump when a cached payload's shape changes
+
+POOL_COLUMNS = ["Name", "Team", "Position", "Price", "Points"]
+
+
+def _normalize(value):
+    """JSON-stable form of a setting: sets sorted, tuples as lists, floats rounded."""
+    if isinstance(value, (set, frozenset)):
+        return sorted(_normalize(v) for v in value)
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, float):
+        return round(value, 9)
+    return value
+
+
+def pool_fingerprint(df: pd.DataFrame) -> str:
+    rows = zip(
+        df["Name"].astype(str).str.strip(),
+        df["Team"].astype(str).str.strip(),
+        df["Position"].astype(str).str.strip(),
+        df["Price"].astype(float).round(1),
+        df["Points"].astype(float).round(9),
+    )
+    h = hashlib.sha256()
+    for r in rows:
+        h.update(repr(r).encode("utf-8"))
+    return h.hexdigest()
+
+
+def cache_key(kind: str, pools, **settings) -> str:
+    """Key for one solve: kind ('transfers', 'wildcard', ...), pool frame(s), settings."""
+    if isinstance(pools, pd.DataFrame):
+        pools = [pools]
+    blob = json.dumps({
+        "v": CACHE_VERSION,
+        "kind": kind,
+        "pools": [pool_fingerprint(p) for p in pools],
+        "settings": _normalize(settings),
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def cache_get(key: str, root: str = None) -> Optional[Any]:
+    path = os.path.join(root or CACHE_DIR, key + ".pkl")
+    try:
+        with open(path, "rb") as f:
+            value = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    try:
+        os.utime(path)  # mark as recently used
+    except OSError:
+        pass
+    return value
+
+
+def cache_put(key: str, value: Any, root: str = None, max_bytes: int = CACHE_MAX_BYTES):
+    root = root or CACHE_DIR
+    try:
+        os.makedirs(root, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=root, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, os.path.join(root, key + ".pkl"))
+    except OSError:
+        return  # a cache that can't be written is just a miss next time
+    _evict(root, max_bytes)
+
+
+def _evict(root: str, max_bytes: int):
+    """Drop least recently used entries until the directory fits in max_bytes."""
+    entries = []
+    for fn in os.listdir(root):
+        if fn.endswith(".pkl"):
+            try:
+                st = os.stat(os.path.join(root, fn))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, fn))
+    total = sum(size for _, size, _ in entries)
+    for _, size, fn in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(root, fn))
+            total -= size
+        except OSError:
+            pass
@@ -0,0 +1,48 @@
+# solution_pool.py – best-first enumeration of distinct squads over live models
+# --------------------------------------------------------
+# The optimizers return one squad per formation (wildcard) or per k (transfers).
+# To get the N best *different* squads we keep every formation pass's model alive,
+# take the best current head across passes, then add a no-good cut
+#     sum(x[i] for i in squad) <= len(squad) - min_diff
+# to every pass and re-solve only the passes whose head now violates it. Each head
+# is optimal for its pass under the cuts so far, so the best head is the best
+# remaining squad overall: squads come out in descending objective order, and any
+# two share at most len(squad) - min_diff players.
+#
+# Dominance presolve must be off for these models: it only guarantees that *an
+# optimal* squad survives, and the 2nd-best squad may use a dropped player.
+
+from typing import Callable, Iterator, Optional
+
+
+def iter_distinct(
+    n_passes: int,
+    solve_pass: Callable,
+    add_cut: Callable,
+    min_diff: int = 1,
+    limit: Optional[int] = None,
+) -> Iterator:
+    """
+    solve_pass(j) -> (key, squad ids, payload) or None: (re-)solve pass j's live model.
+    add_cut(j, squad, rhs): add sum(x[squad]) <= rhs to pass j.
+    Yields payloads best key first (ties go to the lower pass, as in the serial loops).
+    """
+    if min_diff < 1:
+        raise ValueError(f"min_diff must be >= 1, got {min_diff}")
+    heads = [solve_pass(j) for j in range(n_passes)]
+    found = 0
+    while limit is None or found < limit:
+        live = [j for j in range(n_passes) if heads[j] is not None]
+        if not live:
+            return
+        j_best = max(live, key=lambda j: (heads[j][0], -j))
+        _, squad, payload = heads[j_best]
+        yield payload
+        found += 1
+
+        squad = set(squad)
+        rhs = len(squad) - min_diff
+        for j in range(n_passes):
+            add_cut(j, squad, rhs)
+            if heads[j] is not None and len(squad & set(heads[j][1])) > rhs:
+                heads[j] = solve_pass(j)
@@ -0,0 +1,166 @@
+# solvers.py – solver backends shared by utils_2025 and transfer_model
+# --------------------------------------------------------
+# The models are plain PuLP problems; this picks what solves them.
+#   cbc        – PuLP's bundled CBC binary (writes an MPS file, spawns cbc, parses
+#                the solution file on every solve). Default, always available.
+#   highs      – HiGHS in-process via highspy: the model is passed straight into the
+#                bindings, no temp files or subprocess.
+#   cbc-inproc – CBC in-process via CyLP (pip install cylp).
+#   dp         – exact dynamic program on integer prices (dp_solver.py), no MILP at
+#                all; only for squads without a bench, so it is offered where those
+#                are solved (XI_SOLVER_BACKENDS), not by make_solver().
+#
+# map_jobs() fans independent solves out to a process pool (--jobs N). Each task
+# gets its own temp directory for the cbc model/solution files (solver_tmp_dir),
+# so concurrent CBC runs never share a file location. shared_memo() gives the tasks
+# one dict to memoize sub-results in across processes.
+#
+# Deadline is a run-wide wall-clock budget (--time-budget). Each solve takes an
+# equal share of what is left for the work still queued (share(n)), so time a
+# fast solve doesn't use rolls over to the rest, and is stopped by the solver's
+# time limit with the best integer solution so far (a "best-found" answer).
+
+import re
+import tempfile
+from time import monotonic
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import Manager
+
+from pulp import PULP_CBC_CMD, HiGHS, CYLP, LpStatus, LpSolutionIntegerFeasible, LpSolutionOptimal
+
+SOLVER_BACKENDS = ("cbc", "highs", "cbc-inproc")
+DP_BACKEND = "dp"
+XI_SOLVER_BACKENDS = SOLVER_BACKENDS + (DP_BACKEND,)
+MIN_SOLVE_S = 0.05  # a solve given less than this is skipped (cbc's start-up alone takes about that)
+QUICK_S, QUICK_SHARE = 0.2, 0.1  # a deadline run's swap-search incumbent: at most QUICK_S and this share
+
+_NODES_RE = re.compile(r"Enumerated nodes:\s+(\d+)")
+
+_INSTALL_HINT = {
+    "highs": "pip install highspy",
+    "cbc-inproc": "pip install cylp",
+}
+
+
+def make_solver(backend: str = "cbc", msg: bool = False, warm_start: bool = False, tmp_dir: str = None,
+                time_limit: float = None, mip: bool = True, gap_rel: float = None, log_path: str = None):
+    """
+    PuLP solver object for `backend`.
+    warm_start is only honoured by cbc (MIP start from the variables' current values);
+    the in-process backends rebuild the model on every solve and ignore it.
+    tmp_dir: where cbc writes its model/solution files (default: the system temp dir).
+    time_limit: seconds per solve; the best integer solution so far is kept (see solved()).
+    mip=False solves the LP relaxation (bounds.py).
+    gap_rel: stop once the incumbent is within this relative gap of the solver's bound.
+    log_path: cbc only, write the solver log there (see cbc_nodes()).
+    """
+    if backend == DP_BACKEND:
+        raise ValueError("the dp backend only solves squads without a bench (use_bench=False)")
+    if backend not in SOLVER_BACKENDS:
+        raise ValueError(f"solver must be one of {SOLVER_BACKENDS}, got {backend!r}")
+    gap = {"gapRel": gap_rel} if gap_rel else {}
+    if backend == "cbc":
+        solver = PULP_CBC_CMD(mip=mip, msg=msg, warmStart=warm_start and mip, timeLimit=time_limit,
+                              logPath=log_path, **gap)
+        if tmp_dir:
+            solver.tmpDir = tmp_dir
+        return solver
+    solver = (HiGHS if backend == "highs" else CYLP)(mip=mip, msg=msg, timeLimit=time_limit, **gap)
+    if not solver.available():
+        raise RuntimeError(f"solver {backend!r} is not available here ({_INSTALL_HINT[backend]})")
+    return solver
+
+
+def cbc_nodes(log_path: str) -> int:
+    """Branch-and-bound nodes of the cbc run logged at log_path (0 if the log has none)."""
+    try:
+        with open(log_path, encoding="utf-8", errors="replace") as f:
+            found = _NODES_RE.findall(f.read())
+    except OSError:
+        return 0
+    return int(found[-1]) if found else 0
+
+
+def solved(m, status) -> bool:
+    """Optimal, or stopped by time_limit holding an integer-feasible solution."""
+    return LpStatus[status] == "Optimal" or m.sol_status == LpSolutionIntegerFeasible
+
+
+def settled(m, status) -> bool:
+    """Solved to optimality or proved infeasible, not just stopped by a limit."""
+    return LpStatus[status] == "Infeasible" or (LpStatus[status] == "Optimal" and m.sol_status == LpSolutionOptimal)
+
+
+class Deadline:
+    """
+    Wall-clock budget shared by a run's solves. time.monotonic() is system-wide,
+    so a Deadline pickled to a worker process keeps the same end.
+    within: never end later than this one.
+    """
+
+    def __init__(self, seconds: float, within: "Deadline" = None):
+        self.end = monotonic() + max(0.0, float(seconds))
+        if within is not None:
+            self.end = min(self.end, within.end)
+
+    def left(self) -> float:
+        return max(0.0, self.end - monotonic())
+
+    def expired(self) -> bool:
+        """Too little left to start another solve."""
+        return self.left() < MIN_SOLVE_S
+
+    def share(self, n: int) -> "Deadline":
+        """The next of n equal parts of the time left (n = work items still to run, this one included)."""
+        return Deadline(self.left() / max(1, int(n)), self)
+
+
+def time_limit(budget: "Deadline | None"):
+    """Solver time limit for a solve under `budget` (None: no limit)."""
+    return None if budget is None else max(MIN_SOLVE_S, budget.left())
+
+
+def quick_time(budget: Deadline) -> float:
+    """Seconds of swap search (local_search.py) for the incumbent of a solve under `budget`."""
+    return min(QUICK_S, QUICK_SHARE * budget.left())
+
+
+def solve_label(status: str, gap: float | None) -> str:
+    """'optimal' or 'best found (gap <= x%)' for a deadline run's report."""
+    if status == "optimal":
+        return "optimal"
+    return "best found" + ("" if gap is None else f" (gap <= {100 * gap:.1f}%)")
+
+
+# ------------------------ Process pool ------------------------ #
+
+@contextmanager
+def solver_tmp_dir():
+    """Private temp directory for one task's solver files; removed afterwards."""
+    with tempfile.TemporaryDirectory(prefix="fpl_solver_") as d:
+        yield d
+
+
+@contextmanager
+def shared_memo(jobs: int = 1):
+    """Dict for memoizing across map_jobs tasks: a plain dict when serial, a manager dict otherwise."""
+    if int(jobs or 1) <= 1:
+        yield {}
+        return
+    with Manager() as manager:
+        yield manager.dict()
+
+
+def map_jobs(fn, tasks, jobs: int = 1):
+    """
+    [fn(*task) for task in tasks], fanned out over `jobs` processes when jobs > 1.
+    Results always come back in task order, so merges stay deterministic.
+    fn must be a module-level function (it is pickled to the workers).
+    """
+    tasks = list(tasks)
+    jobs = min(int(jobs or 1), len(tasks))
+    if jobs <= 1:
+        return [fn(*t) for t in tasks]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(fn, *zip(*tasks)))
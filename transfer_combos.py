@@ -0,0 +1,193 @@
+# transfer_combos.py – ranked t-for-t transfer sets for a fixed squad
+# --------------------------------------------------------
+# transfers.py and best_transfer_algo.py ask: which t players out and t in (same
+# positions, in price <= out price + bank, <= max_per_team per club after the
+# moves) gain the most points? They looped over every out-combination and every
+# in-combination with a .loc lookup per player. This enumerates the same sets,
+# ranked, for any t:
+#   buckets  – the pool per position as numpy arrays sorted by price. A player
+#              with top_n + t - 1 others in his position that are no dearer, score
+#              no less and come from clubs with room for t more can't be in the
+#              top_n (each of those gives a set at least as good), so he is dropped.
+#   in-sets  – per (position, count) every combination of the remaining bucket,
+#              sorted by price with a running best-points column, so the best
+#              points any group can add within a budget is one searchsorted.
+#   search   – out-combinations cheapest to lose first; the in-groups are filled
+#              one at a time, a branch is cut when its points plus the other
+#              groups' best within the money left can't reach the current
+#              top_n-th set, and the largest group is filtered last in one numpy pass.
+# Sets rank by points gained, then money left (first found on exact ties).
+
+import heapq
+from itertools import chain, combinations
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+POSITIONS = ("Goalkeeper", "Defender", "Midfielder", "Forward")
+TOL = 1e-9
+
+
+class TransferCombos:
+    """
+    Transfer sets for `team` (Name/Team/Position/Price/Points rows) from `pool`
+    (same columns; players already in the team are ignored). keep: names never
+    sold; block: names never bought. Results refer to the frames' index labels.
+    """
+
+    def __init__(self, team: pd.DataFrame, pool: pd.DataFrame, bank: float, max_per_team: int = 3,
+                 keep: Iterable[str] = (), block: Iterable[str] = ()):
+        self.team = team
+        self.pool = pool[~pool["Name"].isin(team["Name"]) & ~pool["Name"].isin(set(block))]
+        self.bank = float(bank)
+        self.max_per_team = max_per_team
+
+        clubs = {c: n for n, c in enumerate(sorted(set(team["Team"]) | set(self.pool["Team"])))}
+        # Club counts are taken over the whole squad, kept players included
+        self.count = np.bincount(team["Team"].map(clubs).to_numpy(), minlength=len(clubs))
+        sell = team[~team["Name"].isin(set(keep))]
+        self.s_ids = sell.index.to_numpy()
+        self.s_pos = sell["Position"].to_numpy()
+        self.s_pts = sell["Points"].to_numpy(dtype=float)
+        self.s_price = sell["Price"].to_numpy(dtype=float)
+        self.s_club = sell["Team"].map(clubs).to_numpy()
+
+        self.buckets: Dict[str, dict] = {}
+        for P in POSITIONS:
+            rows = self.pool[self.pool["Position"] == P].sort_values("Price", kind="stable")
+            self.buckets[P] = {
+                "ids": rows.index.to_numpy(),
+                "pts": rows["Points"].to_numpy(dtype=float),
+                "price": rows["Price"].to_numpy(dtype=float),
+                "club": rows["Team"].map(clubs).to_numpy(),
+            }
+        self.stats: Dict[str, int] = {}
+
+    # ------------------------ In-sets ------------------------ #
+
+    def _live(self, P: str, transfers: int, top_n: int) -> np.ndarray:
+        """Bucket positions of P's buys that can be in a top_n set (see the module notes)."""
+        b = self.buckets[P]
+        price, pts = b["price"], b["pts"]
+        n = np.arange(len(price))
+        safe = self.count[b["club"]] <= self.max_per_team - transfers
+        tie = (price[:, None] == price[None, :]) & (pts[:, None] == pts[None, :])
+        better = (price[:, None] <= price[None, :]) & (pts[:, None] >= pts[None, :]) & (~tie | (n[:, None] < n[None, :]))
+        return np.flatnonzero((better & safe[:, None]).sum(axis=0) < top_n + transfers - 1)
+
+    def _group(self, P: str, c: int, live: np.ndarray) -> dict:
+        """Every c-combination of P's live buys, sorted by price, with the best points at each price."""
+        b = self.buckets[P]
+        combo = np.fromiter(chain.from_iterable(combinations(live, c)), dtype=int).reshape(-1, c)
+        price = b["price"][combo].sum(axis=1)
+        order = np.argsort(price, kind="stable")
+        combo, price = combo[order], price[order]
+        pts = b["pts"][combo].sum(axis=1)
+        return {"ids": b["ids"][combo], "price": price, "pts": pts, "club": b["club"][combo],
+                "best": np.maximum.accumulate(pts) if len(pts) else pts}
+
+    @staticmethod
+    def _best_within(g: dict, money: float) -> float:
+        """Most points the group can add for at most `money` (-inf if it can't afford any)."""
+        n = np.searchsorted(g["price"], money + TOL, side="right")
+        return g["best"][n - 1] if n else -np.inf
+
+    # ------------------------ Search ------------------------ #
+
+    def top(self, transfers: int, top_n: int = 10) -> List[dict]:
+        """
+        The top_n transfer sets of exactly `transfers` players, best first: dicts with
+        out/in (index labels), points_out, points_in, points_diff and budget_left.
+        """
+        t, top_n = int(transfers), max(1, int(top_n))
+        if t < 1 or t > len(self.s_ids):
+            return []
+        live = {P: self._live(P, t, top_n) for P in POSITIONS}
+        groups: Dict[tuple, dict] = {}
+        heap: List[tuple] = []  # (points_diff, budget_left, -seq, out, in): the worst kept set on top
+        seq = 0
+        self.stats = {"buys": sum(len(v) for v in live.values()), "out_sets": 0, "branches": 0}
+
+        def floor():
+            return heap[0][0] if len(heap) >= top_n else -np.inf
+
+        def push(diff, left, out, ins):
+            nonlocal seq
+            for d, l, i in zip(diff, left, ins):
+                seq += 1
+                item = (float(d), float(l), -seq, out, tuple(i))
+                if len(heap) < top_n:
+                    heapq.heappush(heap, item)
+                elif item[:3] > heap[0][:3]:
+                    heapq.heapreplace(heap, item)
+
+        def bound(pattern, money):
+            return sum(self._best_within(groups[key], money) for key in pattern)
+
+        def fill(out, need, pattern, money, gained, chosen, count):
+            # pattern: the (position, count) groups still to fill; gained: points bought so far
+            grp, rest = groups[pattern[0]], pattern[1:]
+            n = np.searchsorted(grp["price"], money + TOL, side="right")
+            pts, price, club = grp["pts"][:n], grp["price"][:n], grp["club"][:n]
+            if not rest:
+                # Last group: every affordable in-set at once
+                ok = gained + pts - need >= floor() - TOL
+                for j in range(club.shape[1]):
+                    c = club[:, j]
+                    ok &= count[c] + (club == c[:, None]).sum(axis=1) <= self.max_per_team
+                idx = np.flatnonzero(ok)
+                if len(idx) > top_n:
+                    idx = idx[np.lexsort((price[idx], -pts[idx]))[:top_n]]
+                push(gained + pts[idx] - need, money - price[idx], out,
+                     [chosen + list(grp["ids"][i]) for i in idx])
+                return
+            top_rest = bound(rest, np.inf)
+            for i in np.argsort(-pts, kind="stable"):
+                if gained + pts[i] + top_rest - need < floor() - TOL:
+                    break  # points only fall from here
+                if gained + pts[i] + bound(rest, money - price[i]) - need < floor() - TOL:
+                    continue
+                after = count.copy()
+                np.add.at(after, club[i], 1)
+                if (after[club[i]] > self.max_per_team).any():
+                    continue
+                self.stats["branches"] += 1
+                fill(out, need, rest, money - price[i], gained + pts[i], chosen + list(grp["ids"][i]), after)
+
+        # Out-sets that lose the fewest points first, so the floor rises early
+        outs = sorted(combinations(range(len(self.s_ids)), t), key=lambda o: self.s_pts[list(o)].sum())
+        for o in outs:
+            o = list(o)
+            need, money = self.s_pts[o].sum(), self.s_price[o].sum() + self.bank
+            sold = dict(zip(*np.unique(self.s_pos[o], return_counts=True)))
+            pattern = tuple((P, int(sold[P])) for P in POSITIONS if P in sold)
+            for key in pattern:
+                if key not in groups:
+                    groups[key] = self._group(key[0], key[1], live[key[0]])
+            # Branch on the smallest groups, leave the largest to the vectorized last step
+            pattern = tuple(sorted(pattern, key=lambda key: len(groups[key]["price"])))
+            if bound(pattern, money) - need < floor() - TOL:
+                continue
+            self.stats["out_sets"] += 1
+            count = self.count.copy()
+            np.subtract.at(count, self.s_club[o], 1)
+            fill(tuple(self.s_ids[o]), need, pattern, money, 0.0, [], count)
+
+        ranked = []
+        for diff, left, _, out_ids, in_ids in sorted(heap, reverse=True):
+            ranked.append({
+                "out": list(out_ids),
+                "in": list(in_ids),
+                "points_out": float(self.team.loc[list(out_ids), "Points"].sum()),
+                "points_in": float(self.pool.loc[list(in_ids), "Points"].sum()),
+                "points_diff": diff,
+                "budget_left": left,
+            })
+        return ranked
+
+
+def top_transfers(team: pd.DataFrame, pool: pd.DataFrame, transfers: int, bank: float, top_n: int = 10,
+                  max_per_team: int = 3, keep: Iterable[str] = (), block: Iterable[str] = ()) -> List[dict]:
+    """TransferCombos(...).top(transfers, top_n) in one call."""
+    return TransferCombos(team, pool, bank, max_per_team, keep, block).top(transfers, top_n)
@@ -0,0 +1,1035 @@
+# transfer_model.py – persistent transfer MILP shared by the fpl_*_transfers_optimizer scripts
+# --------------------------------------------------------
+# optimize_k used to rebuild the pool dicts, the variables and every constraint for
+# each k, although only the `removed <= k` / `added <= k` right-hand sides change.
+# TransferModel builds the model(s) once per formation set and re-solves for
+# successive k by changing just those two bounds. CBC is given the previous optimum
+# as a MIP start, which is always feasible when k grows (0, 1, 2, ...). Where the
+# variables hold no squad within k transfers (a pass's first solve, or k going
+# down), the start is the current 15 with its best XI: it is feasible for every
+# k unless an include/exclude rule or the bench cap rules it out. The tie-break
+# stages start from the stage before. count_nodes=True tallies cbc's
+# branch-and-bound nodes per k (.nodes) to see what the starts save.
+#
+# Hits: solve_hits() makes the transfer count a variable instead, with
+#     hits >= bought - free_transfers,  hits >= 0
+# and hit_cost * hits taken off the XI objective, so one solve picks how many
+# transfers are worth it. solve_frontier() gives the whole points-vs-transfers
+# frontier from the same live models: it solves k = max_k, and when the optimum
+# only uses t < k transfers that squad is also the answer for t..k, so the next
+# solve is at t - 1 (one solve per frontier point rather than one per k).
+#
+# Pruning: solve(k) bounds every formation pass by its LP relaxation first and
+# skips the passes that cannot reach the best XI points found so far (bounds.py).
+# The payload ranks the 15's XI re-arranged without the bench cap or the
+# include-start rows, so those rows are loosened for the bound.
+#
+# quick(k) is the anytime answer: a swap search from the current squad
+# (local_search.py) that returns in a fraction of a second, with its gap to the
+# same LP bounds, and can hand its squad to solve(k) as the MIP start.
+#
+# k <= 2 (most weeks) skips the MILP: exact_swaps.py scores every squad within
+# two same-position swaps and picks, per formation pass, what that pass's MILP
+# would, so solve(k) returns the same payload in milliseconds without building
+# a model (owned players the rules exclude are forced sales). Larger k,
+# "free"/"weighted" runs, an include for a player not owned, or a current squad
+# already over a club cap go to the MILP as before.
+
+import os
+import tempfile
+from collections import Counter
+from time import perf_counter
+from typing import Dict, List, Set, Tuple
+
+import pandas as pd
+from pulp import LpProblem, LpMaximize, LpVariable, lpSum, LpStatus, value
+
+from bounds import bound_and_prune, lp_bound
+from exact_swaps import MAX_K as EXACT_MAX_K, ExactSwaps
+from local_search import SwapSearch, gap
+from prepared_pool import PreparedPool
+from presolve import presolve_pool
+from solution_cache import cache_get, cache_key, cache_put
+from solution_pool import iter_distinct
+from solvers import Deadline, cbc_nodes, make_solver, map_jobs, quick_time, settled, solver_tmp_dir, time_limit
+
+from utils_2025 import (
+    OBJECTIVE_MODES, SQUAD_CAPS, arrange_xi, arrange_xi_over_formations, group_ids,
+    ids_in_groups, lexicographic_point_step, lexicographic_weights
+)
+
+XI_BOUNDS = {"Defender": (3, 5), "Midfielder": (2, 5), "Forward": (1, 3)}
+FORMATION_MODES = ("loop", "free")
+EPS = 1e-6
+
+# Named rows we touch between solves
+TRANSFERS_OUT = "transfers_out"
+TRANSFERS_IN = "transfers_in"
+HITS = "hits"
+BENCH_CAP = "bench_cap"
+INC_START = "inc_start_{}"
+PINS = ("pin_xi_lo", "pin_xi_hi", "pin_bench_lo", "pin_bench_hi")
+
+
+def _add_formation_choice(m, y, by_pos, formations):
+    """
+    Let the model pick the XI formation instead of fixing DEF/MID/FWD.
+    One binary per allowed formation; exactly one is active and the XI position
+    counts must equal that formation's counts (plus the FPL 3-5/2-5/1-3 bounds).
+    Returns the formation binaries so the caller can read the chosen shape back.
+    """
+    z = LpVariable.dicts("formation", range(len(formations)), 0, 1, cat="Binary")
+    m += lpSum(z[j] for j in range(len(formations))) == 1
+    for slot, P in enumerate(["Defender", "Midfielder", "Forward"]):
+        lo, hi = XI_BOUNDS[P]
+        count = lpSum(y[i] for i in by_pos.get(P, []))
+        m += count >= lo
+        m += count <= hi
+        m += count == lpSum(f[slot] * z[j] for j, f in enumerate(formations))
+    return z
+
+
+class TransferModel:
+    """
+    Transfer MILP(s) for one pool/owned squad/formation set, reusable across k.
+
+    Build once, then call solve(k) for each transfer count; each call returns the
+    same payload dict optimize_k always returned (or None if infeasible).
+    pool_df: the pool frame, or a PreparedPool (prepared_pool.py) to index it once
+    for every model built on it; payloads carry it as "_pool" (and its frame as "_df").
+    Multi-stage solve per formation pass:
+      1) Max XI points
+      2) Max bench points (tie-break)
+      3) Min total cost (tie-break)
+    then the chosen 15 is re-arranged into its true best XI.
+
+    formation_mode:
+      "loop" – one model per formation, keep the best.
+      "free" – one model where the XI formation is itself a decision variable.
+
+    objective_mode:
+      "lexicographic" – the three-stage chain above.
+      "weighted"      – one solve of a single integer-weighted objective with the
+                        same XI > bench > cost priority (utils_2025.lexicographic_weights).
+
+    solver: backend from solvers.SOLVER_BACKENDS ("cbc", "highs", "cbc-inproc");
+    warm_start (MIP start from the previous k or the current squad) only applies to "cbc";
+    count_nodes: add up cbc's branch-and-bound nodes per k in .nodes (serial solves).
+
+    presolve: drop excluded and dominated players before building (presolve.py);
+    the counts are kept in .presolve (None when disabled).
+
+    prune: in "loop" mode, solve(k) skips formation passes whose LP bound is below
+    the best XI points so far (bounds.py); same payload, stats in .prune_stats[k].
+
+    deadline: a solvers.Deadline for every solve (--time-budget). Each k gets an
+    equal share of what is left, its passes run in LP-bound order with a share each,
+    and the payload is labelled "status" ("optimal"/"best-found") with its "gap" to
+    the LP bound. Only optimal answers are cached; solve_many runs serially.
+    mip_gap: relative gap each MIP solve may stop at (answers are then best-found).
+
+    exact_small_k: answer k <= 2 by exact swap enumeration (exact_swaps.py) instead
+    of the MILP, in "loop" + "lexicographic" runs; moves scored in .exact_moves[k].
+
+    quick(k, time_limit) is the anytime heuristic (local_search.py) with its gap to
+    the LP bound; seed_milp=True makes its squad the MIP start of the next solve(k).
+
+    cache: look solve(k) up in the on-disk solution cache first (solution_cache.py);
+    models are only built on a miss.
+
+    solve_hits(free_transfers, hit_cost, max_k) is the hit-aware single solve;
+    solve_frontier(max_k) fills {k: payload} from the frontier points only
+    (transfer_frontier() / frontier_lines() turn either into the net-points table).
+
+    iter_squads(k, min_diff, limit) yields the best distinct squads one at a time
+    (no-good cuts on the live models; needs presolve=False).
+
+    solve_many(ks, jobs=N) fans the (formation, k) solves out to N processes and
+    merges them in formation order, so the best payload matches solve(k) exactly.
+
+    Wall time is kept apart: build_s (pool indexing + every model) and
+    solve_s[k] (solver + XI re-arrangement for that k).
+    """
+
+    def __init__(
+        self,
+        pool_df: "pd.DataFrame | PreparedPool",
+        owned_df: pd.DataFrame,
+        bank_m: float,
+        formations: List[Tuple[int,int,int]],
+        max_per_team: int = 3,
+        bench_budget: float | None = None,
+        include_names: Set[str] = None,
+        include_start_names: Set[str] = None,
+        exclude_names: Set[str] = None,
+        include_teams: Set[str] = None,
+        exclude_teams: Set[str] = None,
+        block_add_names: Set[str] = None,
+        solver_msg: bool = False,
+        arrange_points_by_key: Dict[str, float] | None = None,
+        arrange_over_formations: bool = True,
+        formation_mode: str = "loop",
+        warm_start: bool = True,
+        objective_mode: str = "lexicographic",
+        solver: str = "cbc",
+        presolve: bool = True,
+        cache: bool = True,
+        prune: bool = True,
+        deadline: Deadline | None = None,
+        mip_gap: float | None = None,
+        count_nodes: bool = False,
+        exact_small_k: bool = True,
+    ):
+        # Worker processes (solve_many with jobs > 1) rebuild the model from these
+        self._init_kwargs = {nm: v for nm, v in locals().items() if nm != "self"}
+        if formation_mode not in FORMATION_MODES:
+            raise ValueError(f"formation_mode must be one of {FORMATION_MODES}, got {formation_mode!r}")
+        if objective_mode not in OBJECTIVE_MODES:
+            raise ValueError(f"objective_mode must be one of {OBJECTIVE_MODES}, got {objective_mode!r}")
+        make_solver(solver)  # fail fast on an unknown/unavailable backend
+        if "key" not in owned_df.columns:
+            raise ValueError("owned_df needs a 'key' column (see map_current_ids_to_csv_rows)")
+        t_build = perf_counter()
+
+        self.formations = list(formations)
+        self.formation_mode = formation_mode
+        self.objective_mode = objective_mode
+        self.max_per_team = max_per_team
+        self.bench_budget = bench_budget
+        self.solver_msg = solver_msg
+        self.arrange_over_formations = arrange_over_formations
+        self.warm_start = warm_start
+        self.solver = solver
+        self.prune = prune
+        self.deadline = deadline
+        self.mip_gap = mip_gap
+        self.count_nodes = count_nodes and solver == "cbc"
+        self.nodes: Dict[int, int] = {}
+        self.exact_small_k = exact_small_k
+        self.exact_moves: Dict[int, int] = {}
+        self.tmp_dir = None  # set per worker task so parallel cbc runs never share files
+        self.bank_m = bank_m
+
+        # PIDs and lookups come from the PreparedPool (built here from a plain frame);
+        # models sharing one pool share its dicts
+        pool = pool_df if isinstance(pool_df, PreparedPool) else PreparedPool(pool_df)
+        self.pool = pool
+        self.df = pool.df
+        self.id_list = id_list = list(range(pool.n))
+        self.name  = pool.name_by_pid
+        self.team  = pool.team_by_pid
+        self.pos   = pool.pos_by_pid
+        self.price = pool.price_by_pid
+        self.pts   = pool.pts_by_pid
+        key_by_pid = pool.key_by_pid
+
+        # Owned PIDs via 'key'
+        owned_keys = set(owned_df["key"])
+        self.current_pids = {pool.pid_by_key[k] for k in owned_keys if k in pool.pid_by_key}
+        ids_for_names = pool.ids_for_names
+
+        self.inc_ids       = ids_for_names(include_names or set())
+        self.inc_start_ids = ids_for_names(include_start_names or set())
+        self.exc_ids       = ids_for_names(exclude_names or set())
+        self.block_add_ids = ids_for_names(block_add_names or set())
+        self.include_teams = set(include_teams or [])
+        self.exclude_teams = set(exclude_teams or [])
+
+        # Ruled-out players get no variables (unless also included: keep the clash
+        # as an x == 0 row so the model stays infeasible, as before)
+        teams_of = group_ids(id_list, self.team)
+        blocked = self.exc_ids | ids_in_groups(teams_of, self.exclude_teams)
+        if self.include_teams:
+            blocked |= set(id_list) - ids_in_groups(teams_of, self.include_teams)
+        # Only block if it's a *new* buy
+        blocked |= self.block_add_ids - self.current_pids
+        forced = self.inc_ids | self.inc_start_ids
+        self.blocked_ids = blocked & forced
+
+        self.total_current_cost = float(owned_df["Price"].sum())
+
+        # Map PID -> 1GW arrangement points (fallback to preds pts if not provided)
+        if arrange_points_by_key is not None:
+            self.arrange_pts = {pid: float(arrange_points_by_key.get(key_by_pid[pid], self.pts[pid])) for pid in id_list}
+        else:
+            self.arrange_pts = self.pts
+
+        # Presolve: drop excluded and dominated players before any variable exists
+        # (owned and included players are always kept)
+        self.presolve = None
+        if presolve:
+            id_list, self.presolve = presolve_pool(
+                id_list, self.pos, self.team, self.price, self.pts, SQUAD_CAPS, max_per_team, 15,
+                excluded=blocked - forced, protected=self.current_pids | forced,
+            )
+        else:
+            self.blocked_ids = blocked
+        self.id_list = id_list
+
+        # Position / club groups, built once and shared by every pass
+        self.by_pos  = group_ids(id_list, self.pos)
+        self.by_club = group_ids(id_list, self.team)
+
+        # Everything that can change a payload (solver/presolve/warm start cannot)
+        self.cache = cache
+        self._cache_settings = dict(
+            owned=sorted(owned_keys), owned_cost=self.total_current_cost, bank=bank_m,
+            formations=self.formations, max_per_team=max_per_team, bench_budget=bench_budget,
+            include=include_names, include_start=include_start_names, exclude=exclude_names,
+            include_teams=self.include_teams, exclude_teams=self.exclude_teams, block_add=block_add_names,
+            arrange=None if arrange_points_by_key is None else [self.arrange_pts[i] for i in self.df["PID"]],
+            arrange_over_formations=arrange_over_formations,
+            formation_mode=formation_mode, objective_mode=objective_mode,
+            **({"mip_gap": mip_gap} if mip_gap else {}),
+        )
+
+        # In "free" mode a single pass covers every formation (None = let the model choose).
+        # Models are built on the first cache miss.
+        self.formation_passes = [None] if formation_mode == "free" else self.formations
+        self.passes = None
+        self._swaps = None
+        self.build_s = perf_counter() - t_build
+        self.solve_s: Dict[int, float] = {}
+        self.prune_stats: Dict[int, dict] = {}
+        self._lp_bounds: Dict[tuple, float] = {}
+        self._proved: Dict[tuple, tuple] = {}  # deadline runs: (pass, k) -> result solved to optimality
+        self._incumbents: Dict[int, dict] = {}  # deadline runs: best payload so far per k
+
+    def _ensure_built(self):
+        if self.passes is None:
+            t_build = perf_counter()
+            self.passes = [self._build(f) for f in self.formation_passes]
+            self.build_s += perf_counter() - t_build
+
+    # ------------------------ Build (once) ------------------------ #
+
+    def _build(self, formation) -> dict:
+        id_list, price, pts = self.id_list, self.price, self.pts
+        by_pos, by_club = self.by_pos, self.by_club
+        current_pids = self.current_pids
+
+        m = LpProblem("FPL_FromCSV", LpMaximize)
+        x = LpVariable.dicts("in_squad", id_list, 0, 1, cat="Binary")
+        y = LpVariable.dicts("start",    id_list, 0, 1, cat="Binary")
+        b = LpVariable.dicts("bench",    id_list, 0, 1, cat="Binary")
+
+        # Sizes
+        m += lpSum(x[i] for i in id_list) == 15
+        m += lpSum(y[i] for i in id_list) == 11
+        m += lpSum(b[i] for i in id_list) == 4
+
+        # Consistency
+        for i in id_list:
+            m += y[i] + b[i] <= x[i]
+
+        # Formation (XI)
+        m += lpSum(y[i] for i in by_pos.get("Goalkeeper", [])) == 1
+        z = None
+        if formation is None:
+            z = _add_formation_choice(m, y, by_pos, self.formations)
+        else:
+            DEF, MID, FWD = formation
+            m += lpSum(y[i] for i in by_pos.get("Defender", []))   == DEF
+            m += lpSum(y[i] for i in by_pos.get("Midfielder", [])) == MID
+            m += lpSum(y[i] for i in by_pos.get("Forward", []))    == FWD
+
+        # Full 15 caps
+        for P, cap in SQUAD_CAPS.items():
+            m += lpSum(x[i] for i in by_pos.get(P, [])) == cap
+
+        # ≤3 per club across 15
+        for club, members in by_club.items():
+            m += lpSum(x[i] for i in members) <= self.max_per_team
+
+        # Budget: new 15 within current_15_csv_cost + bank
+        total_cost_expr = lpSum(price[i] * x[i] for i in id_list)
+        m += total_cost_expr <= self.total_current_cost + self.bank_m
+
+        # Bench soft cap (ONLY if explicitly provided)
+        if self.bench_budget is not None:
+            bench_cost_expr = lpSum(price[i] * b[i] for i in id_list)
+            m += (bench_cost_expr <= self.bench_budget, BENCH_CAP)
+
+        # Transfers ≤ k: removed = 15 - kept, added = new buys. Built with k=15 (no
+        # limit); solve(k) only moves these two right-hand sides.
+        bought = lpSum(x[i] for i in set(id_list) - current_pids)
+        m += (lpSum(x[i] for i in current_pids & set(id_list)) >= 0, TRANSFERS_OUT)
+        m += (bought <= 15, TRANSFERS_IN)
+
+        # Includes/excludes
+        for i in sorted(self.inc_ids):       m += x[i] == 1
+        for i in sorted(self.inc_start_ids): m += (y[i] >= 1, INC_START.format(i))
+        for i in sorted(self.blocked_ids):   m += x[i] == 0
+
+        p = {
+            "formation": formation,
+            "m": m, "x": x, "y": y, "b": b, "z": z,
+            "start_points": lpSum(pts[i] * y[i] for i in id_list),
+            "bench_points": lpSum(pts[i] * b[i] for i in id_list),
+            "total_cost": total_cost_expr,
+            "bought": bought,
+        }
+        if self.objective_mode == "weighted":
+            pt_u, cost_u, w_start, w_bench = lexicographic_weights(pts, price, 11, 4)
+            p["w_start"] = w_start
+            p["pt_step"] = lexicographic_point_step(pts)
+            p["weighted"] = (
+                w_start * lpSum(pt_u[i] * y[i] for i in id_list)
+                + w_bench * lpSum(pt_u[i] * b[i] for i in id_list)
+                - lpSum(cost_u[i] * x[i] for i in id_list)
+            )
+        return p
+
+    # ------------------------ Solve (per k) ------------------------ #
+
+    def _solver(self, limit: float | None = None):
+        return make_solver(self.solver, msg=self.solver_msg, warm_start=self.warm_start, tmp_dir=self.tmp_dir,
+                           time_limit=limit, gap_rel=self.mip_gap, log_path=self._node_log())
+
+    def _node_log(self):
+        if not self.count_nodes:
+            return None
+        return os.path.join(self.tmp_dir or tempfile.gettempdir(), f"fpl_cbc_nodes_{os.getpid()}.log")
+
+    def _set_k(self, p: dict, k: int):
+        m = p["m"]
+        m.constraints[TRANSFERS_OUT].changeRHS(15 - k)
+        m.constraints[TRANSFERS_IN].changeRHS(k)
+        # Drop tie-break pins left over from the previous k
+        for nm in PINS:
+            if nm in m.constraints:
+                del m.constraints[nm]
+
+    def _solve_pass(self, p: dict, k: int, hits=None, budget: Deadline | None = None, queued: int = 0):
+        """
+        Run the three-stage chain on one pass; returns the chosen 15 or None.
+        hits: (hits variable, hit_cost) to maximise XI points net of hits instead.
+        budget: Deadline the stages draw on; each gets an equal share with the
+        `queued` solves still to come after this pass. A tie-break stage that gets
+        no time (or stops without a solution) leaves the last stage's squad.
+        p["proved"] says whether every stage was solved to optimality.
+        """
+        self._set_k(p, k)
+        m, x, y, b = p["m"], p["x"], p["y"], p["b"]
+        id_list, pts = self.id_list, self.pts
+        n_stages = 1 if self.objective_mode == "weighted" else 3
+        p["proved"] = not self.mip_gap
+
+        def _solve(stage: int) -> bool:
+            limit = None
+            if budget is not None:
+                if budget.expired():
+                    p["proved"] = False
+                    return False
+                limit = time_limit(budget.share(n_stages - stage + queued))
+            status = m.solve(self._solver(limit))
+            if self.count_nodes:
+                self.nodes[k] = self.nodes.get(k, 0) + cbc_nodes(self._node_log())
+            if not settled(m, status):
+                p["proved"] = False
+            return LpStatus[status] == "Optimal"
+
+        def _chosen():
+            return [i for i in id_list if value(x[i]) > 0.5]
+
+        if self.warm_start:
+            self._warm(p, k)
+        if self.objective_mode == "weighted":
+            # XI > bench > cost in a single solve (hits priced on the XI grid)
+            m.objective = p["weighted"]
+            if hits:
+                h, hit_cost = hits
+                m.objective = p["weighted"] - p["w_start"] * round(hit_cost / p["pt_step"]) * h
+            return _chosen() if _solve(0) else None
+
+        # 1) Max XI points (net of hits)
+        xi_expr = p["start_points"]
+        if hits:
+            h, hit_cost = hits
+            xi_expr = p["start_points"] - hit_cost * h
+        m.objective = xi_expr
+        if not _solve(0):
+            return None
+        start_best = value(xi_expr) if hits else sum(pts[i] * value(y[i]) for i in id_list)
+        m += (xi_expr >= start_best - EPS, "pin_xi_lo")
+        m += (xi_expr <= start_best + EPS, "pin_xi_hi")
+        fallback = _chosen() if budget is not None else None
+
+        # 2) Max bench points (tie-break)
+        m.objective = p["bench_points"]
+        if not _solve(1):
+            return fallback
+        bench_best = sum(pts[i] * value(b[i]) for i in id_list)
+        m += (p["bench_points"] >= bench_best - EPS, "pin_bench_lo")
+        m += (p["bench_points"] <= bench_best + EPS, "pin_bench_hi")
+        fallback = _chosen() if budget is not None else None
+
+        # 3) Min total cost (final tie-break)
+        m.objective = -p["total_cost"]
+        if not _solve(2):
+            return fallback
+
+        return _chosen()
+
+    def _payload(self, x_sel: List[int], formation) -> Tuple[tuple, dict]:
+        pts, pos, price = self.pts, self.pos, self.price
+        arrange_pts = self.arrange_pts
+        current_pids = self.current_pids
+
+        if formation is None:
+            # The model's own XI may be bent by the bench cap, so take the formation the
+            # chosen 15 arranges best into (what the loop finds by trying each one).
+            formation = arrange_xi_over_formations(x_sel, pos, pts, self.formations)["formation"]
+
+        # --- Re-arrange best XI for the fixed squad (guarantees maximum XI points) ---
+        # (A) Preds-based XI for THIS formation (also used to rank solutions by preds)
+        y_sel, b_sel, _ = arrange_xi(x_sel, pos, pts, formation)
+
+        # (B) 1GW-based XI; allow ANY valid formation if requested (used for reporting/selection order)
+        if self.arrange_over_formations:
+            best_arr = arrange_xi_over_formations(x_sel, pos, arrange_pts, self.formations)
+            y_sel_arr, b_sel_arr = best_arr["xi"], best_arr["bench"]
+            arr_formation = best_arr["formation"]
+        else:
+            y_sel_arr, b_sel_arr, _ = arrange_xi(x_sel, pos, arrange_pts, formation)
+            arr_formation = formation
+
+        # Transfers
+        out_pids = sorted(list(current_pids - set(x_sel)))
+        in_pids  = sorted(list(set(x_sel) - current_pids))
+
+        # Metrics
+        total_cost = sum(price[i] for i in x_sel)
+
+        # Preds metrics (used for 'best' selection across formation loops)
+        start_pts_pred  = sum(pts[i] for i in y_sel)
+        bench_pts_pred  = sum(pts[i] for i in b_sel)
+
+        # 1GW arrangement metrics (for printing/sorting)
+        start_pts_arr   = sum(arrange_pts[i] for i in y_sel_arr)
+        bench_pts_arr   = sum(arrange_pts[i] for i in b_sel_arr)
+
+        points_out = sum(pts[i] for i in out_pids)
+        points_in  = sum(pts[i] for i in in_pids)
+        points_diff = points_in - points_out
+        points_diff_pct = points_diff / (points_out + 0.1)
+        budget_left = (self.total_current_cost + self.bank_m) - total_cost
+
+        key = (start_pts_pred, -total_cost, bench_pts_pred)
+
+        payload = {
+            "formation": formation,
+            "arrangement_formation": arr_formation,
+            "selected": x_sel,
+            "starting": y_sel_arr,
+            "bench": b_sel_arr,
+            "out": out_pids,
+            "in": in_pids,
+            "starting_points": start_pts_pred,
+            "bench_points": bench_pts_pred,
+            "starting_points_arr": start_pts_arr,
+            "bench_points_arr": bench_pts_arr,
+            "total_cost": total_cost,
+            "starting_cost": sum(price[i] for i in y_sel_arr),
+            "bench_cost": sum(price[i] for i in b_sel_arr),
+            "points_out": points_out,
+            "points_in": points_in,
+            "points_diff": points_diff,
+            "points_diff_pct": points_diff_pct,
+            "budget_left": budget_left,
+            "_df": self.df,
+            "_pool": self.pool,
+        }
+        return key, payload
+
+    def _bound_pass(self, j: int, k: int):
+        """LP bound on the XI points any squad of pass j can rank with at <= k transfers (memoized)."""
+        if (j, k) not in self._lp_bounds:
+            p = self.passes[j]
+            self._set_k(p, k)
+            relax = [(INC_START.format(i), 0) for i in sorted(self.inc_start_ids)]
+            if self.bench_budget is not None:
+                relax.append((BENCH_CAP, 1e6))
+            self._lp_bounds[j, k] = lp_bound(p["m"], p["start_points"], self.solver, relax, self.tmp_dir)
+        return self._lp_bounds[j, k]
+
+    def _solve_pass_ranked(self, p: dict, k: int, budget: Deadline | None = None, queued: int = 0):
+        """(XI points, (key, payload)) for one pass, or None (bound_and_prune's solve_pass)."""
+        x_sel = self._solve_pass(p, k, budget=budget, queued=queued)
+        if x_sel is None:
+            return None
+        key, payload = self._payload(x_sel, p["formation"])
+        return key[0], (key, payload)
+
+    @staticmethod
+    def _pick_best(candidates):
+        """Best payload from (key, payload) pairs in pass order; first wins ties."""
+        best = None
+        best_key = None
+        for cand in candidates:
+            if cand is None:
+                continue
+            key, payload = cand
+            if best_key is None or key > best_key:
+                best_key = key
+                best = payload
+        return best
+
+    def _cache_key(self, k: int):
+        return cache_key("transfers", self.df, k=k, **self._cache_settings) if self.cache else None
+
+    def _cached(self, k: int):
+        ck = self._cache_key(k)
+        cached = cache_get(ck) if ck is not None else None
+        return (cached is not None), self._attach((cached or {}).get("payload"))
+
+    def _store(self, k: int, payload):
+        ck = self._cache_key(k)
+        if ck is not None:
+            cache_put(ck, {"payload": _detach(payload)})
+
+    def _attach(self, payload):
+        """A cached or worker payload with this model's pool put back (see _detach)."""
+        return None if payload is None else dict(payload, _df=self.df, _pool=self.pool)
+
+    def solve(self, k: int, budget: Deadline | None = None):
+        """
+        Best payload with at most k transfers (None if no pass is feasible).
+        budget: this k's share of the deadline (default: all of it that is left).
+        """
+        t_solve = perf_counter()
+        budget = budget or self.deadline
+        hit, payload = self._cached(k)
+        if hit:
+            if budget is not None and payload is not None:
+                payload.update(status="optimal", gap=0.0)
+            self.solve_s[k] = perf_counter() - t_solve
+            return payload
+
+        swaps = self._exact_swaps(k)
+        if swaps is not None:
+            best = self._solve_exact(swaps, k)
+            if budget is not None and best is not None:
+                best.update(status="optimal", gap=0.0)
+            self._store(k, best)
+            self.solve_s[k] = perf_counter() - t_solve
+            return best
+
+        self._ensure_built()
+        if budget is not None:
+            best, complete = self._solve_timed(k, budget)
+            if complete:
+                self._store(k, best)
+            self.solve_s[k] = self.solve_s.get(k, 0.0) + perf_counter() - t_solve  # summed over sweeps
+            return best
+        if self.prune and len(self.passes) > 1:
+            cands, self.prune_stats[k] = bound_and_prune(
+                len(self.passes), lambda j: self._bound_pass(j, k),
+                lambda j: self._solve_pass_ranked(self.passes[j], k))
+        else:
+            cands = []
+            for p in self.passes:
+                x_sel = self._solve_pass(p, k)
+                cands.append(None if x_sel is None else self._payload(x_sel, p["formation"]))
+        best = self._pick_best(cands)
+        self._store(k, best)
+        self.solve_s[k] = perf_counter() - t_solve
+        return best
+
+    def _exact_swaps(self, k: int):
+        """ExactSwaps for this model if it gives solve(k) the MILP's answer, else None."""
+        if not (self.exact_small_k and k <= EXACT_MAX_K and self.formation_mode == "loop"
+                and self.objective_mode == "lexicographic"):
+            return None
+        if self._swaps is None:
+            squad, forced = self.current_pids, self.inc_ids | self.inc_start_ids
+            # Owned players the rules rule out (presolve drops them) have to be sold
+            sell = (squad - set(self.id_list)) | (squad & self.blocked_ids)
+            by_pos = Counter(self.pos[i] for i in squad)
+            valid = (
+                len(squad) == 15 and all(by_pos[P] == cap for P, cap in SQUAD_CAPS.items())
+                and max(Counter(self.team[i] for i in squad).values()) <= self.max_per_team
+                and forced <= squad and not forced & sell
+            )
+            # Otherwise the squad itself breaks the rules (or must buy someone): left to the MILP
+            self._swaps = False
+            if valid:
+                self._swaps = ExactSwaps(
+                    sorted(squad), [i for i in self.id_list if i not in self.blocked_ids],
+                    self.pos, self.team, self.price, self.pts, self.formations,
+                    self.total_current_cost + self.bank_m, self.max_per_team, self.bench_budget,
+                    keep=self.inc_ids, sell=sell, start=self.inc_start_ids,
+                )
+        return self._swaps or None
+
+    def _solve_exact(self, swaps: ExactSwaps, k: int):
+        """solve(k) by exact swap enumeration: each formation's squad, ranked like the MILP passes."""
+        squads = swaps.best(k)
+        self.exact_moves[k] = swaps.n_moves
+        return self._pick_best(None if sq is None else self._payload(sq, f)
+                               for sq, f in zip(squads, self.formation_passes))
+
+    def _solve_timed(self, k: int, budget: Deadline):
+        """
+        solve(k) under a deadline. The swap search's squad (or the best from an
+        earlier call) is the floor and every pass's MIP start; then the passes run
+        in LP-bound order (most promising first), every solve with an equal share
+        of the time left for the solves still queued. Returns (labelled payload, complete); complete means every pass
+        was solved to optimality or bounded out. Proved passes are kept, so a
+        second call only works on the rest.
+        """
+        n = len(self.passes)
+        incumbent = self._incumbents.get(k)
+        if incumbent is None:
+            incumbent = self.quick(k, quick_time(budget), bound=False)
+        if incumbent is not None:
+            self._seed(incumbent["selected"])
+        if budget.expired():
+            # No time for the bounds either: the incumbent is all there is
+            if incumbent is not None:
+                incumbent.update(status="best-found", gap=None)
+            return incumbent, False
+
+        started = []
+        unproved = []  # passes whose optimum is unknown: no time, or stopped early
+
+        n_stages = 1 if self.objective_mode == "weighted" else 3
+
+        def solve_pass(j):
+            if (j, k) in self._proved:
+                return self._proved[j, k]
+            started.append(j)
+            if budget.expired():
+                unproved.append(j)
+                return None
+            queued = n_stages * sum(1 for i in range(n) if i not in started and (i, k) not in self._proved)
+            out = self._solve_pass_ranked(self.passes[j], k, budget, queued)
+            if self.passes[j]["proved"]:
+                self._proved[j, k] = out
+            else:
+                unproved.append(j)
+            return out
+
+        cands, stats = bound_and_prune(n, lambda j: self._bound_pass(j, k), solve_pass, prune=self.prune)
+        if self.prune:
+            self.prune_stats[k] = stats
+        if incumbent is not None and unproved:
+            # Last, so a MILP squad of equal rank wins
+            cands.append(((incumbent["starting_points"], -incumbent["total_cost"], incumbent["bench_points"]),
+                          incumbent))
+        best = self._pick_best(cands)
+        if best is not None:
+            ub = max([best["starting_points"]] + [self._lp_bounds[j, k] for j in unproved
+                                                  if self._lp_bounds.get((j, k)) is not None])
+            best.update(status="best-found" if unproved else "optimal",
+                        gap=gap(best["starting_points"], ub) if unproved else 0.0)
+            self._incumbents[k] = best
+        return best, not unproved
+
+    def quick(self, k: int, time_limit: float = 0.2, bound: bool = True, seed_milp: bool = False, seed: int = 0):
+        """
+        Best squad with <= k transfers a swap search from the current squad finds
+        within time_limit seconds: the usual payload plus "quick" (the search stats,
+        "lp_bound" and "gap"; bound=False skips the LP bounds and the model build).
+        None if the search finds no feasible squad.
+        """
+        search = SwapSearch(
+            [i for i in self.id_list if i not in self.blocked_ids], self.pos, self.team, self.price, self.pts,
+            SQUAD_CAPS, self.formations, self.total_current_cost + self.bank_m, self.max_per_team,
+            self.bench_budget, forced=self.inc_ids | self.inc_start_ids, owned=self.current_pids,
+            max_buys=k, bench_rule="any",
+        )
+        found = search.run(self.current_pids, time_limit, seed=seed)
+        if found is None:
+            return None
+        _, payload = self._payload(found["squad"], found["formation"])
+        ub = None
+        if bound:
+            self._ensure_built()
+            ubs = [b for b in (self._bound_pass(j, k) for j in range(len(self.passes))) if b is not None]
+            ub = max(ubs, default=None)
+        payload["quick"] = dict(found["stats"], xi_points=payload["starting_points"], lp_bound=ub,
+                                gap=gap(payload["starting_points"], ub))
+        if seed_milp:
+            self._seed(found["squad"])
+        return payload
+
+    def _seed(self, squad: List[int]):
+        """Set every pass's variables to `squad` (XI arranged for the pass) as the next MIP start."""
+        self._ensure_built()
+        for p in self.passes:
+            self._seed_pass(p, squad, *self._arranged(p, squad))
+
+    def _arranged(self, p: dict, squad) -> Tuple[List[int], tuple]:
+        """Best XI of `squad` for pass p, and its formation."""
+        f = p["formation"] or arrange_xi_over_formations(squad, self.pos, self.pts, self.formations)["formation"]
+        return arrange_xi(squad, self.pos, self.pts, f)[0], f
+
+    def _seed_pass(self, p: dict, squad, xi: List[int], formation):
+        chosen, xi = set(squad), set(xi)
+        for i in self.id_list:
+            p["x"][i].setInitialValue(int(i in chosen))
+            p["y"][i].setInitialValue(int(i in xi))
+            p["b"][i].setInitialValue(int(i in chosen and i not in xi))
+        if p["z"] is not None:
+            for j, f in enumerate(self.formations):
+                p["z"][j].setInitialValue(int(f == formation))
+
+    def _warm(self, p: dict, k: int):
+        """
+        MIP start for a pass's first stage: the squad its variables hold (an earlier
+        optimum or a quick() squad) if that is within k transfers, else the current 15.
+        """
+        held = [i for i in self.id_list if (p["x"][i].varValue or 0.0) > 0.5]
+        if len(held) == 15 and len(set(held) - self.current_pids) <= k:
+            return
+        start = self._current_start(p)
+        if start is not None:
+            self._seed_pass(p, self.current_pids, *start)
+
+    def _current_start(self, p: dict):
+        """(XI, formation) of the current 15 for pass p; None if the model's rules exclude it."""
+        squad = self.current_pids
+        if len(squad) != 15 or not squad <= set(self.id_list) or squad & self.blocked_ids:
+            return None
+        if not (self.inc_ids | self.inc_start_ids) <= squad:
+            return None
+        if max(Counter(self.team[i] for i in squad).values()) > self.max_per_team:
+            return None
+        xi, f = self._arranged(p, squad)
+        if not self.inc_start_ids <= set(xi):
+            return None
+        if self.bench_budget is not None and sum(self.price[i] for i in squad - set(xi)) > self.bench_budget:
+            return None
+        return xi, f
+
+    def solve_many(self, ks, jobs: int = 1, budget: Deadline | None = None) -> Dict[int, dict]:
+        """
+        {k: solve(k)} for every k in ks. With jobs > 1 the uncached (pass, k-run)
+        subproblems go to a process pool; each task solves an ascending run of k on
+        one pass (so the MIP start chain still holds) in its own solver temp dir.
+        solve_s[k] is then the batch wall time split evenly over the solved ks.
+        budget: deadline for this batch (default: the model's).
+        """
+        ks = list(ks)
+        budget = budget or self.deadline
+        if budget is not None:
+            # Scheduled serially: each k gets an equal share of the time left, and
+            # what the first sweep leaves goes to the ks not yet proved optimal
+            results = {k: self.solve(k, budget.share(len(ks) - n)) for n, k in enumerate(ks)}
+            todo = [k for k in ks if results[k] is not None and results[k]["status"] != "optimal"]
+            for n, k in enumerate(todo):
+                if budget.expired():
+                    break
+                results[k] = self.solve(k, budget.share(len(todo) - n))
+            return results
+        if int(jobs or 1) <= 1:
+            return {k: self.solve(k) for k in ks}
+
+        t_solve = perf_counter()
+        results, todo = {}, []
+        for k in ks:
+            hit, payload = self._cached(k)
+            if hit:
+                results[k] = payload
+                self.solve_s[k] = 0.0
+            elif self._exact_swaps(k) is not None:
+                results[k] = self.solve(k)
+            else:
+                todo.append(k)
+        if todo:
+            # Split the ks into enough contiguous runs to give every worker a task
+            n_pass = len(self.formation_passes)
+            n_runs = min(len(todo), max(1, -(-int(jobs) // n_pass)))
+            runs = [todo[i * len(todo) // n_runs:(i + 1) * len(todo) // n_runs] for i in range(n_runs)]
+            tasks = [(self._init_kwargs, j, run) for j in range(n_pass) for run in runs]
+            outs = map_jobs(_solve_pass_run, tasks, jobs)
+
+            by_pass: Dict[int, dict] = {}
+            for (_, j, _), out in zip(tasks, outs):
+                by_pass.setdefault(j, {}).update(out)
+            elapsed = perf_counter() - t_solve
+            for k in todo:
+                best = self._attach(self._pick_best(by_pass[j][k] for j in range(n_pass)))
+                self._store(k, best)
+                results[k] = best
+                self.solve_s[k] = elapsed / len(todo)
+        return {k: results[k] for k in ks}
+
+    def solve_hits(self, free_transfers: int = 1, hit_cost: float = 4.0, max_k: int = 5):
+        """
+        Best payload over 0..max_k transfers with hit_cost per transfer beyond
+        free_transfers taken off the XI points (None if infeasible). The payload
+        gains 'hits' and 'net_points'; passes are ranked by net points.
+        """
+        free_transfers = max(0, int(free_transfers))
+        ck = cache_key("transfers_hits", self.df, k=max_k, free_transfers=free_transfers,
+                       hit_cost=hit_cost, **self._cache_settings) if self.cache else None
+        cached = cache_get(ck) if ck else None
+        if cached is not None:
+            return self._attach(cached["payload"])
+
+        self._ensure_built()
+        cands = []
+        complete = True
+        for n, p in enumerate(self.passes):
+            m = p["m"]
+            if "hits" not in p:
+                # Added on first use and kept (PuLP keeps the column once seen);
+                # switched off again below so solve(k) is unaffected
+                p["hits"] = LpVariable("hits", 0, 15, cat="Integer")
+                m += (p["hits"] >= p["bought"] - 15, HITS)
+            m.constraints[HITS].changeRHS(-free_transfers)
+            try:
+                budget = self.deadline
+                queued = 3 * (len(self.passes) - n - 1)
+                x_sel = self._solve_pass(p, max_k, hits=(p["hits"], hit_cost), budget=budget, queued=queued)
+                complete = complete and (budget is None or p["proved"])
+            finally:
+                m.constraints[HITS].changeRHS(-15)
+            if x_sel is None:
+                cands.append(None)
+                continue
+            _, payload = self._payload(x_sel, p["formation"])
+            n_hits = max(0, len(payload["in"]) - free_transfers)
+            payload["hits"] = n_hits
+            payload["net_points"] = payload["starting_points"] - hit_cost * n_hits
+            cands.append(((payload["net_points"], -payload["total_cost"], payload["bench_points"]), payload))
+        best = self._pick_best(cands)
+        if ck and complete:
+            cache_put(ck, {"payload": _detach(best)})
+        return best
+
+    def solve_frontier(self, max_k: int) -> Dict[int, dict]:
+        """
+        {k: solve(k)} for k = 0..max_k, walking down the frontier: solve k, and if
+        the best squad makes t < k transfers reuse it for t..k and go on at t - 1.
+        Skipped k get the same squad value solve(k) would (ties may pick another
+        squad of equal value); solve_s only has entries for the k actually solved.
+        """
+        results = {}
+        k = max_k
+        while k >= 0:
+            best = self.solve(k)
+            if best is None:
+                # Fewer transfers only tightens the model
+                results.update({j: None for j in range(k + 1)})
+                break
+            t = len(best["in"])
+            results.update({j: best for j in range(t, k + 1)})
+            k = t - 1
+        return {k: results[k] for k in range(max_k + 1)}
+
+    def iter_squads(self, k: int, min_diff: int = 1, limit: int | None = None):
+        """
+        Payloads for <= k transfers, best first, each squad differing from every
+        earlier one in at least min_diff players (solution_pool.iter_distinct).
+        The no-good cuts are removed again when the generator finishes or is closed.
+        """
+        if self.presolve is not None:
+            raise ValueError("iter_squads needs a model built with presolve=False "
+                             "(dominated players can be in the 2nd-best squad)")
+        self._ensure_built()
+        n_cuts = [0]
+
+        def solve_pass(j):
+            p = self.passes[j]
+            x_sel = self._solve_pass(p, k)
+            if x_sel is None:
+                return None
+            # Rank by the model's own XI > bench > cost values: the payload's re-arranged
+            # XI ignores the bench cap and need not fall in solve order. Rounded so float
+            # noise in equal sums can't reorder ties.
+            key = (round(value(p["start_points"]), 6), round(value(p["bench_points"]), 6),
+                   -round(value(p["total_cost"]), 6))
+            _, payload = self._payload(x_sel, p["formation"])
+            return key, x_sel, payload
+
+        def add_cut(j, squad, rhs):
+            x = self.passes[j]["x"]
+            self.passes[j]["m"] += (lpSum(x[i] for i in squad if i in x) <= rhs, f"nogood_{n_cuts[0]}")
+            if j == len(self.passes) - 1:
+                n_cuts[0] += 1
+
+        try:
+            yield from iter_distinct(len(self.passes), solve_pass, add_cut, min_diff, limit)
+        finally:
+            for p in self.passes:
+                for c in range(n_cuts[0]):
+                    p["m"].constraints.pop(f"nogood_{c}", None)
+
+
+# ------------------------ Frontier ------------------------ #
+
+def transfer_frontier(k_results: Dict[int, dict], free_transfers: int = 1, hit_cost: float = 4.0) -> List[dict]:
+    """
+    Points-vs-transfers frontier from {k: payload} (solve_frontier or solve_many):
+    one row per transfer count actually used, with hits and net XI points.
+    'pareto' is False when fewer transfers already reach at least the same net
+    points; 'best' marks the highest net (fewest transfers on ties).
+    """
+    rows = {}
+    for k in sorted(k_results):
+        res = k_results[k]
+        if not res:
+            continue
+        t = len(res["in"])
+        if t in rows:
+            continue
+        n_hits = max(0, t - free_transfers)
+        rows[t] = {
+            "transfers": t,
+            "hits": n_hits,
+            "xi_points": res["starting_points"],
+            "net_points": res["starting_points"] - hit_cost * n_hits,
+            "payload": res,
+        }
+    out = [rows[t] for t in sorted(rows)]
+    best_net = None
+    for r in out:
+        r["pareto"] = best_net is None or r["net_points"] > best_net + EPS
+        if r["pareto"]:
+            best_net = r["net_points"]
+    for r in out:
+        r["best"] = r["pareto"] and abs(r["net_points"] - best_net) <= EPS
+    return out
+
+
+def frontier_lines(frontier: List[dict], free_transfers: int, hit_cost: float) -> List[str]:
+    """Report table for transfer_frontier() rows."""
+    lines = [f"Transfers vs net points (free transfers: {free_transfers}, hit cost: {hit_cost:g})"]
+    lines.append(f"{'Transfers':>9} {'Hits':>5} {'XI pts':>9} {'Net pts':>9}")
+    for r in frontier:
+        mark = "  <- best" if r["best"] else ("" if r["pareto"] else "  (dominated)")
+        lines.append(f"{r['transfers']:>9} {r['hits']:>5} {r['xi_points']:>9.2f} {r['net_points']:>9.2f}{mark}")
+    if not frontier:
+        lines.append("NO FEASIBLE SOLUTION")
+    lines.append("-"*96 + "\n")
+    return lines
+
+
+def _detach(payload):
+    """
+    payload without "_df"/"_pool": what goes to the cache or back from a worker (the
+    pool is the caller's). "status"/"gap" go too: they label one budgeted run, and
+    solve() puts them back on a cache hit only when it has a budget.
+    """
+    return None if payload is None else {nm: v for nm, v in payload.items() if nm not in ("_df", "_pool", "status", "gap")}
+
+
+def _solve_pass_run(init_kwargs: dict, pass_index: int, ks: List[int]) -> dict:
+    """Worker task: {k: (key, payload) or None} for one formation pass."""
+    model = TransferModel(**dict(init_kwargs, cache=False))
+    with solver_tmp_dir() as tmp:
+        model.tmp_dir = tmp
+        formation = model.formation_passes[pass_index]
+        p = model._build(formation)
+        out = {}
+        for k in ks:
+            x_sel = model._solve_pass(p, k)
+            if x_sel is None:
+                out[k] = None
+            else:
+                key, payload = model._payload(x_sel, formation)
+                out[k] = (key, _detach(payload))
+    return out
@@ -9,6 +9,10 @@ from collections import Counter
 import pandas as pd
 import re
 
+from dp_solver import dp_best_squad
+from presolve import presolve_frame, presolve_summary
+from solvers import DP_BACKEND
+
 
 def get_words_rmt_page(By, driver, filename, rmt_pages, unicodedata):
     """Get all the words on the pages into a string text.
@@ -165,6 +169,75 @@ def merge_dfs(file1, file2):
     return df_merged
 
 
+# -------------- Squad models (the formation loops below) -------------- #
+
+def _squad_model(player_data, BUDGET, squad_size, max_per_team, excluded_teams=(), excluded_players=(),
+                 included_teams=None, included_players=()):
+    """Build the "FPL Optimization" model the formation loops below share.
+    One binary per row of player_data (x[i] for row i, so two players with the same
+    Name stay two players), with the objective and constraint coefficients taken from
+    the Points/Price/Position/Team columns in one pass. The position counts start at
+    0: _set_formation() changes them and the same model is solved again."""
+    x = [LpVariable(f"x_{i}", cat='Binary') for i in range(len(player_data))]
+
+    model = LpProblem("FPL Optimization", LpMaximize)
+    model += LpAffineExpression(zip(x, player_data['Points'].tolist()))
+    model += LpAffineExpression(zip(x, player_data['Price'].tolist())) <= BUDGET  # Total budget constraint
+    model += lpSum(x) == squad_size  # Squad size constraint
+    rows = player_data.groupby('Position', sort=False).indices
+    for position in ['Goalkeeper', 'Defender', 'Midfielder', 'Forward']:
+        model += (lpSum(x[i] for i in rows.get(position, [])) == 0, f"pos_{position}")  # Position constraint
+    for idx in player_data.groupby('Team', sort=False).indices.values():
+        model += lpSum(x[i] for i in idx) <= max_per_team  # Players per Premier League team
+
+    # Excluded teams/players can't be picked, included players must be
+    banned, forced = _squad_rules(player_data, excluded_teams, excluded_players, included_teams, included_players)
+    for i in banned:
+        model += x[i] == 0
+    for i in forced:
+        model += x[i] == 1
+    return model, x
+
+
+def _squad_rules(player_data, excluded_teams=(), excluded_players=(), included_teams=None, included_players=()):
+    """Rows of player_data the squad can't pick and rows it must pick (Team/Name rules)."""
+    names, teams = player_data['Name'], player_data['Team']
+    banned = ~teams.isin(included_teams) if included_teams else teams.isin(excluded_teams)
+    return (set((banned | names.isin(excluded_players)).to_numpy().nonzero()[0].tolist()),
+            set(names.isin(included_players).to_numpy().nonzero()[0].tolist()))
+
+
+def _set_formation(model, GK, DEF, MID, FWD):
+    for position, n in zip(['Goalkeeper', 'Defender', 'Midfielder', 'Forward'], [GK, DEF, MID, FWD]):
+        model.constraints[f"pos_{position}"].changeRHS(n)
+
+
+def _write_team(f, player_data, model, x, DEF, MID, FWD, budget_used=True):
+    """Write one formation's solved team in the optimized_team.txt block format."""
+    picked = [i for i in range(len(player_data)) if x[i].value() == 1]
+    _write_picked(f, player_data, picked, value(model.objective), DEF, MID, FWD, budget_used)
+
+
+def _write_picked(f, player_data, picked, total_points, DEF, MID, FWD, budget_used=True):
+    """The _write_team block for rows picked without a model (solver='dp')."""
+    # Output optimized team to text file
+    f.write("Optimized FPL Team:\n")
+    f.write(f"{DEF} - {MID} - {FWD}\n")
+    f.write(f"{'Name':<25}{'Team':<15}{'Position':<15}{'Price':<10}{'Points':<10}\n")
+    f.write('-' * 75 + '\n')  # Drawing a line for clarity
+
+    for i in picked:
+        f.write(f"{player_data.loc[i, 'Name']:<25}{player_data.loc[i, 'Team']:<15}{player_data.loc[i, 'Position']:<15}{player_data.loc[i, 'Price']:<10}{player_data.loc[i, 'Points']:<10}\n")
+
+    f.write('-' * 75 + '\n')  # Drawing another line
+    f.write(f"Total points: {total_points:.2f}\n")
+    if budget_used:
+        # Calculate total budget used
+        total_budget_used = sum(player_data.loc[i, 'Price'] for i in picked)
+        f.write(f"Total budget used: {total_budget_used:.2f}\n")
+    f.write("\n")
+
+
 def wildcard_team(BUDGET, df_merged):
     """Create a wildcard team based on the team"s money remaining.
     Selection is to maximise the player mention occurence."""
@@ -177,6 +250,15 @@ def wildcard_team(BUDGET, df_merged):
     # Define list of excluded players
     excluded_players = ['Chilwell', 'Olsen', 'Ramsdale', 'Flekken', 'Strakosha', 'Robertson', 'Awoniyi']
 
+    # Drop excluded and dominated players before building any model (10 outfield, ≤3 per club)
+    player_data, presolve_stats = presolve_frame(
+        player_data, {'Defender': 5, 'Midfielder': 5, 'Forward': 3}, 3, 10,
+        excluded_players=excluded_players, excluded_teams=excluded_teams)
+    print(presolve_summary(presolve_stats, 1))
+
+    # Set up optimization problem once; each formation only changes the position counts
+    model, x = _squad_model(player_data, BUDGET, 10, 3, excluded_teams=excluded_teams, excluded_players=excluded_players)
+
     with open('optimized_team.txt', 'w', encoding="utf-8") as f:
         for DEF in [3, 4, 5]:
             for MID in [3, 4, 5]:
@@ -185,60 +267,18 @@ def wildcard_team(BUDGET, df_merged):
         #     for MID in [5]:
         #         for FWD in [3]:
                     if DEF + MID + FWD == 10:
-                        # Set up optimization problem
-                        model = LpProblem("FPL Optimization", LpMaximize)
-
-                        # Define decision variables
-                        players = list(player_data['Name'])
-                        x = LpVariable.dicts("x", players, cat='Binary')
-
-                        # Define objective function
-                        model += lpSum([player_data.loc[i, 'Points'] * x[player_data.loc[i, 'Name']] for i in range(len(player_data))])
-
-                        # Add constraints
-                        model += lpSum([player_data.loc[i, 'Price'] * x[player_data.loc[i, 'Name']] for i in range(len(player_data))]) <= BUDGET # Total budget constraint
-                        model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data))]) == 10 # Squad size constraint
-                        model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data)) if player_data.loc[i, 'Position'] == 'Goalkeeper']) == 0 # GK position constraint
-                        model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data)) if player_data.loc[i, 'Position'] == 'Defender']) == DEF # DEF position constraint
-                        model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data)) if player_data.loc[i, 'Position'] == 'Midfielder']) == MID # MID position constraint
-                        model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data)) if player_data.loc[i, 'Position'] == 'Forward']) == FWD # FWD position constraint
-
-                        # existing_team_dfdd constraint to limit the number of players from each Premier League team to at most 3
-                        prem_teams = player_data['Team'].unique()
-                        for team in prem_teams:
-                            model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data)) if player_data.loc[i, 'Team'] == team]) <= 3
-                        
-                        # Add constraint to set decision variables for players in excluded teams to 0
-                        for i in range(len(player_data)):
-                            if player_data.loc[i, 'Team'] in excluded_teams:
-                                model += x[player_data.loc[i, 'Name']] == 0
-
-                        # Add constraint to set decision variables for excluded players to 0
-                        for i in range(len(player_data)):
-                            if player_data.loc[i, 'Name'] in excluded_players:
-                                model += x[player_data.loc[i, 'Name']] == 0
+                        _set_formation(model, 0, DEF, MID, FWD)
 
                         # Solve optimization problem
                         model.solve()
+                        _write_team(f, player_data, model, x, DEF, MID, FWD, budget_used=False)
 
-                        # Output optimized team to text file
-                        f.write("Optimized FPL Team:\n")
-                        f.write(f"{DEF} - {MID} - {FWD}\n")
-                        f.write(f"{'Name':<25}{'Team':<15}{'Position':<15}{'Price':<10}{'Points':<10}\n")
-                        f.write('-' * 75 + '\n')  # Drawing a line for clarity
 
-                        for i in range(len(player_data)):
-                            if x[player_data.loc[i, 'Name']].value() == 1:
-                                f.write(f"{player_data.loc[i, 'Name']:<25}{player_data.loc[i, 'Team']:<15}{player_data.loc[i, 'Position']:<15}{player_data.loc[i, 'Price']:<10}{player_data.loc[i, 'Points']:<10}\n")
-
-                        f.write('-' * 75 + '\n')  # Drawing another line
-                        f.write(f"Total points: {value(model.objective):.2f}\n")
-                        f.write("\n")
-
-
-def wildcard_team_11(BUDGET, df_merged, included_teams=None, included_players=None):
+def wildcard_team_11(BUDGET, df_merged, included_teams=None, included_players=None, solver='cbc'):
     """Create a wildcard team based on the team"s money remaining.
-    Selection is to maximise the player mention occurence."""
+    Selection is to maximise the player mention occurence.
+    solver='dp' picks each formation's XI with dp_solver instead of the MILP (exact
+    on whole-tenth prices; ties on points go to the cheaper XI)."""
     # Create a pandas dataframe with players and their respective stats (e.g. cost, points, etc.)
     player_data = df_merged
 
@@ -253,76 +293,45 @@ def wildcard_team_11(BUDGET, df_merged, included_teams=None, included_players=No
     if included_players is None:
         included_players = []
 
+    # Drop excluded and dominated players before building any model (XI, ≤3 per club)
+    player_data, presolve_stats = presolve_frame(
+        player_data, {'Goalkeeper': 1, 'Defender': 5, 'Midfielder': 5, 'Forward': 3}, 3, 11,
+        excluded_players=excluded_players, excluded_teams=[] if included_teams else excluded_teams,
+        included_teams=included_teams, included_players=included_players)
+    print(presolve_summary(presolve_stats, 1))
+
+    if solver == DP_BACKEND:
+        # No model: the same rules become the DP's pool and forced rows
+        banned, forced = _squad_rules(player_data, excluded_teams, excluded_players, included_teams, included_players)
+        ids = [i for i in range(len(player_data)) if i not in banned]
+        pos, team = dict(enumerate(player_data['Position'])), dict(enumerate(player_data['Team']))
+        price = dict(enumerate(player_data['Price'].astype(float)))
+        pts = dict(enumerate(player_data['Points'].astype(float)))
+    else:
+        # Set up optimization problem once; each formation only changes the position counts
+        model, x = _squad_model(player_data, BUDGET, 11, 3, excluded_teams=excluded_teams, excluded_players=excluded_players,
+                                included_teams=included_teams, included_players=included_players)
+
     with open('optimized_team.txt', 'w', encoding="utf-8") as f:
         for GK in [1]:
             for DEF in [3, 4, 5]:
                 for MID in [3, 4, 5]:
                     for FWD in [1, 2, 3]:
                         if GK + DEF + MID + FWD == 11:
-                            # Set up optimization problem
-                            model = LpProblem("FPL Optimization", LpMaximize)
-
-                            # Define decision variables
-                            players = list(player_data['Name'])
-                            x = LpVariable.dicts("x", players, cat='Binary')
-
-                            # Define objective function
-                            model += lpSum([player_data.loc[i, 'Points'] * x[player_data.loc[i, 'Name']] for i in range(len(player_data))])
-
-                            # Add constraints
-                            model += lpSum([player_data.loc[i, 'Price'] * x[player_data.loc[i, 'Name']] for i in range(len(player_data))]) <= BUDGET  # Total budget constraint
-                            model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data))]) == 11  # Squad size constraint
-                            model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data)) if player_data.loc[i, 'Position'] == 'Goalkeeper']) == GK  # GK position constraint
-                            model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data)) if player_data.loc[i, 'Position'] == 'Defender']) == DEF  # DEF position constraint
-                            model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data)) if player_data.loc[i, 'Position'] == 'Midfielder']) == MID  # MID position constraint
-                            model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data)) if player_data.loc[i, 'Position'] == 'Forward']) == FWD  # FWD position constraint
-
-                            # No limit to how many players from a team
-                            prem_teams = player_data['Team'].unique()
-                            for team in prem_teams:
-                                model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data)) if player_data.loc[i, 'Team'] == team]) <= 3
-
-                            # Add constraint to set decision variables for players in excluded teams to 0
-                            if included_teams:
-                                for i in range(len(player_data)):
-                                    if player_data.loc[i, 'Team'] not in included_teams:
-                                        model += x[player_data.loc[i, 'Name']] == 0
+                            if solver == DP_BACKEND:
+                                counts = {'Goalkeeper': GK, 'Defender': DEF, 'Midfielder': MID, 'Forward': FWD}
+                                found = None if banned & forced else dp_best_squad(
+                                    ids, pos, team, price, pts, counts, BUDGET, 3, forced=forced)
+                                if found is None:
+                                    f.write(f"{DEF} - {MID} - {FWD}: no feasible team\n\n")
+                                else:
+                                    _write_picked(f, player_data, sorted(found["ids"]), found["points"], DEF, MID, FWD)
                             else:
-                                for i in range(len(player_data)):
-                                    if player_data.loc[i, 'Team'] in excluded_teams:
-                                        model += x[player_data.loc[i, 'Name']] == 0
-
-                            # Add constraint to set decision variables for excluded players to 0
-                            for i in range(len(player_data)):
-                                if player_data.loc[i, 'Name'] in excluded_players:
-                                    model += x[player_data.loc[i, 'Name']] == 0
-
-                            # Add constraint to include specific players
-                            for i in range(len(player_data)):
-                                if player_data.loc[i, 'Name'] in included_players:
-                                    model += x[player_data.loc[i, 'Name']] == 1
-
-                            # Solve optimization problem
-                            model.solve()
-
-                            # Calculate total budget used
-                            total_budget_used = sum(player_data.loc[i, 'Price'] for i in range(len(player_data)) if x[player_data.loc[i, 'Name']].value() == 1)
-
-                            # Output optimized team to text file
-                            f.write("Optimized FPL Team:\n")
-                            f.write(f"{DEF} - {MID} - {FWD}\n")
-                            f.write(f"{'Name':<25}{'Team':<15}{'Position':<15}{'Price':<10}{'Points':<10}\n")
-                            f.write('-' * 75 + '\n')  # Drawing a line for clarity
-
-                            for i in range(len(player_data)):
-                                if x[player_data.loc[i, 'Name']].value() == 1:
-                                    f.write(f"{player_data.loc[i, 'Name']:<25}{player_data.loc[i, 'Team']:<15}{player_data.loc[i, 'Position']:<15}{player_data.loc[i, 'Price']:<10}{player_data.loc[i, 'Points']:<10}\n")
-
-                            f.write('-' * 75 + '\n')  # Drawing another line
-                            f.write(f"Total points: {value(model.objective):.2f}\n")
-                            f.write(f"Total budget used: {total_budget_used:.2f}\n")
-                            f.write("\n")
+                                _set_formation(model, GK, DEF, MID, FWD)
 
+                                # Solve optimization problem
+                                model.solve()
+                                _write_team(f, player_data, model, x, DEF, MID, FWD)
 
 
 def bench_team(BUDGET, df_merged):
@@ -338,65 +347,26 @@ def bench_team(BUDGET, df_merged):
     # Define list of excluded players
     excluded_players = ['Virgil', 'Luis Díaz', 'João Pedro', 'Evanilson', 'Iwobi', 'Sessegnon', 'Muniz', 'Bradley']
 
+    # Drop excluded and dominated players before building any model (4-man bench, ≤1 per club)
+    player_data, presolve_stats = presolve_frame(
+        player_data, {'Goalkeeper': 1, 'Defender': 2, 'Midfielder': 2, 'Forward': 2}, 1, 4,
+        excluded_players=excluded_players, excluded_teams=excluded_teams)
+    print(presolve_summary(presolve_stats, 1))
+
+    # Set up optimization problem once; each formation only changes the position counts
+    model, x = _squad_model(player_data, BUDGET, 4, 1, excluded_teams=excluded_teams, excluded_players=excluded_players)
+
     with open('optimized_bench_team.txt', 'w', encoding="utf-8") as f:
         for GK in [1]:
             for DEF in [0, 1, 2]:
                 for MID in [0, 1, 2]:
                     for FWD in [0, 1, 2]:
                         if GK + DEF + MID + FWD == 4:
-                            # Set up optimization problem
-                            model = LpProblem("FPL Optimization", LpMaximize)
-
-                            # Define decision variables
-                            players = list(player_data['Name'])
-                            x = LpVariable.dicts("x", players, cat='Binary')
-
-                            # Define objective function
-                            model += lpSum([player_data.loc[i, 'Points'] * x[player_data.loc[i, 'Name']] for i in range(len(player_data))])
-
-                            # Add constraints
-                            model += lpSum([player_data.loc[i, 'Price'] * x[player_data.loc[i, 'Name']] for i in range(len(player_data))]) <= BUDGET # Total budget constraint
-                            model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data))]) == 4 # Squad size constraint
-                            model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data)) if player_data.loc[i, 'Position'] == 'Goalkeeper']) == GK # GK position constraint
-                            model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data)) if player_data.loc[i, 'Position'] == 'Defender']) == DEF # DEF position constraint
-                            model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data)) if player_data.loc[i, 'Position'] == 'Midfielder']) == MID # MID position constraint
-                            model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data)) if player_data.loc[i, 'Position'] == 'Forward']) == FWD # FWD position constraint
-
-                            # existing_team_dfdd constraint to limit the number of players from each Premier League team to at most 3
-                            prem_teams = player_data['Team'].unique()
-                            for team in prem_teams:
-                                model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data)) if player_data.loc[i, 'Team'] == team]) <= 1
-                            
-                            # Add constraint to set decision variables for players in excluded teams to 0
-                            for i in range(len(player_data)):
-                                if player_data.loc[i, 'Team'] in excluded_teams:
-                                    model += x[player_data.loc[i, 'Name']] == 0
-
-                            # Add constraint to set decision variables for excluded players to 0
-                            for i in range(len(player_data)):
-                                if player_data.loc[i, 'Name'] in excluded_players:
-                                    model += x[player_data.loc[i, 'Name']] == 0
+                            _set_formation(model, GK, DEF, MID, FWD)
 
                             # Solve optimization problem
                             model.solve()
-
-                            # Calculate total budget used
-                            total_budget_used = sum(player_data.loc[i, 'Price'] for i in range(len(player_data)) if x[player_data.loc[i, 'Name']].value() == 1)
-
-                            # Output optimized team to text file
-                            f.write("Optimized FPL Team:\n")
-                            f.write(f"{DEF} - {MID} - {FWD}\n")
-                            f.write(f"{'Name':<25}{'Team':<15}{'Position':<15}{'Price':<10}{'Points':<10}\n")
-                            f.write('-' * 75 + '\n')  # Drawing a line for clarity
-
-                            for i in range(len(player_data)):
-                                if x[player_data.loc[i, 'Name']].value() == 1:
-                                    f.write(f"{player_data.loc[i, 'Name']:<25}{player_data.loc[i, 'Team']:<15}{player_data.loc[i, 'Position']:<15}{player_data.loc[i, 'Price']:<10}{player_data.loc[i, 'Points']:<10}\n")
-
-                            f.write('-' * 75 + '\n')  # Drawing another line
-                            f.write(f"Total points: {value(model.objective):.2f}\n")
-                            f.write(f"Total budget used: {total_budget_used:.2f}\n")
-                            f.write("\n")
+                            _write_team(f, player_data, model, x, DEF, MID, FWD)
 
 
 def wildcard_team_challenge(BUDGET, df_merged, included_teams=None, included_players=None):
@@ -416,72 +386,25 @@ def wildcard_team_challenge(BUDGET, df_merged, included_teams=None, included_pla
     if included_players is None:
         included_players = []
 
+    # Drop excluded and dominated players before building any model (5-man, ≤5 per club)
+    player_data, presolve_stats = presolve_frame(
+        player_data, {'Goalkeeper': 1, 'Defender': 2, 'Midfielder': 2, 'Forward': 2}, 5, 5,
+        excluded_players=excluded_players, excluded_teams=[] if included_teams else excluded_teams,
+        included_teams=included_teams, included_players=included_players)
+    print(presolve_summary(presolve_stats, 1))
+
+    # Set up optimization problem once; each formation only changes the position counts
+    model, x = _squad_model(player_data, BUDGET, 5, 5, excluded_teams=excluded_teams, excluded_players=excluded_players,
+                            included_teams=included_teams, included_players=included_players)
+
     with open('optimized_team_challenge.txt', 'w', encoding="utf-8") as f:
         for GK in [1]:
             for DEF in [1, 2]:
                 for MID in [1, 2]:
                     for FWD in [1, 2]:
                         if GK + DEF + MID + FWD == 5:
-                            # Set up optimization problem
-                            model = LpProblem("FPL Optimization", LpMaximize)
-
-                            # Define decision variables
-                            players = list(player_data['Name'])
-                            x = LpVariable.dicts("x", players, cat='Binary')
-
-                            # Define objective function
-                            model += lpSum([player_data.loc[i, 'Points'] * x[player_data.loc[i, 'Name']] for i in range(len(player_data))])
-
-                            # Add constraints
-                            model += lpSum([player_data.loc[i, 'Price'] * x[player_data.loc[i, 'Name']] for i in range(len(player_data))]) <= BUDGET  # Total budget constraint
-                            model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data))]) == 5  # Squad size constraint
-                            model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data)) if player_data.loc[i, 'Position'] == 'Goalkeeper']) == GK  # GK position constraint
-                            model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data)) if player_data.loc[i, 'Position'] == 'Defender']) == DEF  # DEF position constraint
-                            model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data)) if player_data.loc[i, 'Position'] == 'Midfielder']) == MID  # MID position constraint
-                            model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data)) if player_data.loc[i, 'Position'] == 'Forward']) == FWD  # FWD position constraint
-
-                            # No limit to how many players from a team
-                            prem_teams = player_data['Team'].unique()
-                            for team in prem_teams:
-                                model += lpSum([x[player_data.loc[i, 'Name']] for i in range(len(player_data)) if player_data.loc[i, 'Team'] == team]) <= 5
-
-                            # Add constraint to set decision variables for players in excluded teams to 0
-                            if included_teams:
-                                for i in range(len(player_data)):
-                                    if player_data.loc[i, 'Team'] not in included_teams:
-                                        model += x[player_data.loc[i, 'Name']] == 0
-                            else:
-                                for i in range(len(player_data)):
-                                    if player_data.loc[i, 'Team'] in excluded_teams:
-                                        model += x[player_data.loc[i, 'Name']] == 0
-
-                            # Add constraint to set decision variables for excluded players to 0
-                            for i in range(len(player_data)):
-                                if player_data.loc[i, 'Name'] in excluded_players:
-                                    model += x[player_data.loc[i, 'Name']] == 0
-
-                            # Add constraint to include specific players
-                            for i in range(len(player_data)):
-                                if player_data.loc[i, 'Name'] in included_players:
-                                    model += x[player_data.loc[i, 'Name']] == 1
+                            _set_formation(model, GK, DEF, MID, FWD)
 
                             # Solve optimization problem
                             model.solve()
-
-                            # Calculate total budget used
-                            total_budget_used = sum(player_data.loc[i, 'Price'] for i in range(len(player_data)) if x[player_data.loc[i, 'Name']].value() == 1)
-
-                            # Output optimized team to text file
-                            f.write("Optimized FPL Team:\n")
-                            f.write(f"{DEF} - {MID} - {FWD}\n")
-                            f.write(f"{'Name':<25}{'Team':<15}{'Position':<15}{'Price':<10}{'Points':<10}\n")
-                            f.write('-' * 75 + '\n')  # Drawing a line for clarity
-
-                            for i in range(len(player_data)):
-                                if x[player_data.loc[i, 'Name']].value() == 1:
-                                    f.write(f"{player_data.loc[i, 'Name']:<25}{player_data.loc[i, 'Team']:<15}{player_data.loc[i, 'Position']:<15}{player_data.loc[i, 'Price']:<10}{player_data.loc[i, 'Points']:<10}\n")
-
-                            f.write('-' * 75 + '\n')  # Drawing another line
-                            f.write(f"Total points: {value(model.objective):.2f}\n")
-                            f.write(f"Total budget used: {total_budget_used:.2f}\n")
-                            f.write("\n")
+                            _write_team(f, player_data, model, x, DEF, MID, FWD)
@@ -5,14 +5,79 @@
 # without changing the core solver.
 
 from typing import Optional, Dict, List, Tuple
+from time import perf_counter
 import pandas as pd
 from pulp import *
 
+from bounds import bound_and_prune, lp_bound, prune_summary
+from dp_solver import dp_best_squad
+from local_search import SwapSearch, gap, quick_summary
+from presolve import presolve_pool
+from scenarios import cvar, scenario_draws, scenario_summary
+from solution_cache import cache_get, cache_key, cache_put
+from solution_pool import iter_distinct
+from solvers import (
+    DP_BACKEND, make_solver, map_jobs, quick_time, settled, solve_label, solver_tmp_dir, time_limit,
+)
+
 # ---------------- Existing core bits (unchanged) ---------------- #
 
 VALID_FORMATIONS = [(3,4,3), (3,5,2), (4,4,2), (4,5,1), (5,3,2), (5,4,1), (4,3,3)]
 SQUAD_CAPS = {'Goalkeeper': 2, 'Defender': 5, 'Midfielder': 5, 'Forward': 3}
 
+# ---------------- Single-solve lexicographic objective ---------------- #
+# XI > bench > cost folded into one objective. Prices are whole tenths; points are
+# put on an integer grid of LEX_POINT_STEPS steps up to the best player's points
+# (anything below -that is clamped, e.g. the -9999 fallback rows). With integer
+# terms, weighting each level by (span of everything below it + 1) means a single
+# step at a higher level beats any change below it, so one solve gives the same
+# order as the three-stage XI -> bench -> cost re-solves (on the gridded points).
+# At 20000 steps the largest objective is ~1e14, still exact in a double (< 2**53);
+# benchmark_optimizers.py --suite objective checks the squads match on weekly CSVs.
+
+OBJECTIVE_MODES = ('lexicographic', 'weighted')
+LEX_POINT_STEPS = 20000
+
+def lexicographic_point_step(pts_by_id):
+    """Points per integer unit on the lexicographic_weights grid."""
+    top = max((float(p) for p in pts_by_id.values() if float(p) > 0), default=1.0)
+    return top / LEX_POINT_STEPS
+
+
+def lexicographic_weights(pts_by_id, price_by_id, n_start, n_bench):
+    """Returns (pt_units, cost_units, w_start, w_bench) for the objective
+    w_start*XI_units + w_bench*bench_units - cost_units."""
+    step = lexicographic_point_step(pts_by_id)
+    pt_units = {u: int(min(max(round(float(p) / step), -LEX_POINT_STEPS), LEX_POINT_STEPS))
+                for u, p in pts_by_id.items()}
+    cost_units = {u: int(round(float(c) * 10)) for u, c in price_by_id.items()}
+
+    cost_span = sum(sorted(cost_units.values(), reverse=True)[:n_start + n_bench]) + 1
+    bench_span = 2 * sum(sorted((abs(v) for v in pt_units.values()), reverse=True)[:n_bench]) + 1
+    w_bench = cost_span
+    w_start = w_bench * bench_span + cost_span
+    return pt_units, cost_units, w_start, w_bench
+
+
+# ---------------- Index groups for constraint building ---------------- #
+# Position / club rows used to be built by scanning every id once per position and
+# once per club. Group the ids once per pool and build each row from its group.
+
+def group_ids(ids, key_by_id):
+    """{key: [ids with that key]}; keys in first-seen order, ids in input order."""
+    groups: Dict[str, List] = {}
+    for i in ids:
+        groups.setdefault(key_by_id[i], []).append(i)
+    return groups
+
+def ids_in_groups(groups, keys):
+    """Set of ids across the given group keys (unknown keys are ignored)."""
+    out = set()
+    for k in keys or []:
+        out.update(groups.get(k, ()))
+    return out
+
+
 def _mk_uid(name, team, price):
     return f"{name}|{team}|{float(price):.1f}"
 
@@ -30,7 +95,44 @@ def _normalize_inputs_to_uids(df_uid, items):
                 uids.update(name_index[s])
     return uids
 
-def _solve_for_formation(
+def _uid_frame(df_merged):
+    """df_merged indexed by UID (Name|Team|Price) and its Name/Team/Position/Price/Points {UID: value} dicts."""
+    df = df_merged.copy()
+    df['UID'] = [_mk_uid(n, t, p) for n, t, p in zip(df['Name'], df['Team'], df['Price'])]
+    df = df.set_index('UID', drop=False)
+    return df, (df['Name'].to_dict(), df['Team'].to_dict(), df['Position'].to_dict(),
+                df['Price'].astype(float).to_dict(), df['Points'].astype(float).to_dict())
+
+
+def _squad_rules(df, uids, team, included_players, included_starting, excluded_players, included_teams, excluded_teams):
+    """(include UIDs, include-start UIDs, blocked UIDs, forced UIDs) for one pool's Name/Team rules."""
+    inc_players_u = _normalize_inputs_to_uids(df, included_players)
+    inc_start_u   = _normalize_inputs_to_uids(df, included_starting)
+    exc_players_u = _normalize_inputs_to_uids(df, excluded_players)
+
+    # Ruled-out players get no variables; a clash with an include stays as a row
+    blocked = exc_players_u | ids_in_groups(group_ids(uids, team), set(excluded_teams or []))
+    if included_teams:
+        blocked |= set(uids) - ids_in_groups(group_ids(uids, team), set(included_teams))
+    return inc_players_u, inc_start_u, blocked, inc_players_u | inc_start_u
+
+
+def _presolved(uids, pos, team, price, pts, formation, max_per_team, use_bench, blocked, forced):
+    """presolve_pool() for one formation's squad -> (uids, presolve stats, blocked ids still in the pool)."""
+    DEF, MID, FWD = formation
+    if use_bench:
+        slots, squad_size = SQUAD_CAPS, 15
+    else:
+        slots = {'Goalkeeper': 1, 'Defender': DEF, 'Midfielder': MID, 'Forward': FWD}
+        squad_size = 1 + DEF + MID + FWD
+    uids, stats = presolve_pool(
+        uids, pos, team, price, pts, slots, max_per_team, squad_size,
+        excluded=blocked - forced, protected=forced,
+    )
+    return uids, stats, blocked & forced
+
+
+def _build_formation_model(
     df_merged,
     BUDGET,
     formation,                 # (DEF, MID, FWD)
@@ -43,29 +145,79 @@ def _solve_for_formation(
     max_per_team=3,
     solver_msg=False,
     use_bench=True,
+    objective_mode='lexicographic',
+    solver='cbc',
+    presolve=True,
+    tmp_dir=None,
+    mip_gap=None,
+    scenarios=None,
 ):
-    df = df_merged.copy()
-    df['UID'] = [_mk_uid(r['Name'], r['Team'], r['Price']) for _, r in df.iterrows()]
-    df = df.set_index('UID', drop=False)
-
+    """
+    Live model for one formation; _solve_formation_model() solves it and can be
+    called again after cuts are added (iter_wildcard_squads).
+    solver='dp' (XI only) keeps the filtered pool instead and solves it with dp_solver.
+    scenarios: {"draws": (N, rows of df_merged) array, "alpha", "risk_weight"}
+    (scenarios.py). Points become the sample means; with a risk_weight the XI
+    objective is (1 - risk_weight) * mean + risk_weight * CVaR over the draws.
+    """
+    if objective_mode not in OBJECTIVE_MODES:
+        raise ValueError(f"objective_mode must be one of {OBJECTIVE_MODES}, got {objective_mode!r}")
+    if solver == DP_BACKEND:
+        if use_bench:
+            raise ValueError("solver='dp' only solves the XI-only squad (use_bench=False)")
+    else:
+        make_solver(solver)  # fail fast on an unknown/unavailable backend
+    t_build = perf_counter()
+    df, (name, team, pos, price, pts) = _uid_frame(df_merged)
     uids = list(df.index)
 
-    name  = df['Name'].to_dict()
-    team  = df['Team'].to_dict()
-    pos   = df['Position'].to_dict()
-    price = df['Price'].astype(float).to_dict()
-    pts   = df['Points'].astype(float).to_dict()
+    scen = None
+    if scenarios is not None:
+        draws = scenarios["draws"]
+        pts = dict(zip(df.index, draws.mean(axis=0).tolist()))
+        scen = dict(scenarios, col={u: j for j, u in enumerate(df.index)})
+        if scen.get("risk_weight"):
+            if solver == DP_BACKEND or objective_mode == 'weighted':
+                raise ValueError("a CVaR objective needs a MILP backend and objective_mode='lexicographic'")
+            presolve = False  # dominance on the means says nothing about the worst draws
 
-    inc_players_u = _normalize_inputs_to_uids(df, included_players)
-    inc_start_u   = _normalize_inputs_to_uids(df, included_starting)
-    exc_players_u = _normalize_inputs_to_uids(df, excluded_players)
-
-    included_teams = set(included_teams or [])
-    excluded_teams = set(excluded_teams or [])
+    inc_players_u, inc_start_u, blocked, forced = _squad_rules(
+        df, uids, team, included_players, included_starting, excluded_players, included_teams, excluded_teams)
 
     DEF, MID, FWD = formation
     TOTAL_STARTERS = 1 + DEF + MID + FWD
 
+    presolve_stats = None
+    if presolve:
+        uids, presolve_stats, blocked = _presolved(
+            uids, pos, team, price, pts, formation, max_per_team, use_bench, blocked, forced)
+
+    common = {
+        "uids": uids, "df": df, "pts": pts, "price": price,
+        "formation": formation, "BUDGET": BUDGET, "bench_budget": bench_budget,
+        "max_per_team": max_per_team, "use_bench": use_bench, "objective_mode": objective_mode,
+        "solver": solver, "solver_msg": solver_msg, "tmp_dir": tmp_dir, "presolve": presolve_stats, "mip_gap": mip_gap,
+        "pos": pos, "team": team, "blocked": blocked, "forced": forced, "inc_start": inc_start_u,
+        "inc_players": inc_players_u, "scen": scen,
+    }
+    if solver == DP_BACKEND:
+        # Both objective modes mean XI points, then cost: the DP's own order
+        counts = {'Goalkeeper': 1, 'Defender': DEF, 'Midfielder': MID, 'Forward': FWD}
+        return dict(common, dp=True, counts=counts, build_s=perf_counter() - t_build)
+    return _formation_lp(common, t_build)
+
+
+def _formation_lp(common, t_build):
+    """The MILP over a _build_formation_model() / _quick_pools() pool -> live model payload."""
+    uids, pts, price, pos, team = common["uids"], common["pts"], common["price"], common["pos"], common["team"]
+    BUDGET, bench_budget, use_bench = common["BUDGET"], common["bench_budget"], common["use_bench"]
+    max_per_team, blocked, scen = common["max_per_team"], common["blocked"], common["scen"]
+    DEF, MID, FWD = common["formation"]
+    TOTAL_STARTERS = 1 + DEF + MID + FWD
+
+    by_pos  = group_ids(uids, pos)
+    by_club = group_ids(uids, team)
+
     m = LpProblem("FPL_XI_with_Bench" if use_bench else "FPL_XI_only", LpMaximize)
     y = LpVariable.dicts("start", uids, 0, 1, cat="Binary")
     b = LpVariable.dicts("bench", uids, 0, 1, cat="Binary")
@@ -88,69 +240,167 @@ def _solve_for_formation(
     if use_bench:
         m += bench_cost_expr <= bench_budget
 
-    m += lpSum(y[u] for u in uids if pos[u] == 'Goalkeeper') == 1
-    m += lpSum(y[u] for u in uids if pos[u] == 'Defender')   == DEF
-    m += lpSum(y[u] for u in uids if pos[u] == 'Midfielder') == MID
-    m += lpSum(y[u] for u in uids if pos[u] == 'Forward')    == FWD
+    m += lpSum(y[u] for u in by_pos.get('Goalkeeper', [])) == 1
+    m += lpSum(y[u] for u in by_pos.get('Defender', []))   == DEF
+    m += lpSum(y[u] for u in by_pos.get('Midfielder', [])) == MID
+    m += lpSum(y[u] for u in by_pos.get('Forward', []))    == FWD
 
     if use_bench:
         for P, cap in SQUAD_CAPS.items():
-            m += lpSum((y[u] + b[u]) for u in uids if pos[u] == P) == cap
+            m += lpSum((y[u] + b[u]) for u in by_pos.get(P, [])) == cap
 
     if use_bench:
-        for c in df['Team'].unique():
-            m += lpSum((y[u] + b[u]) for u in uids if team[u] == c) <= max_per_team
+        for c, members in by_club.items():
+            m += lpSum((y[u] + b[u]) for u in members) <= max_per_team
     else:
-        for c in df['Team'].unique():
-            m += lpSum(y[u] for u in uids if team[u] == c) <= max_per_team
+        for c, members in by_club.items():
+            m += lpSum(y[u] for u in members) <= max_per_team
 
     for u in uids:
-        if u in exc_players_u or team[u] in excluded_teams:
+        if u in blocked:
             m += y[u] == 0
             m += b[u] == 0
 
-    if included_teams:
-        for u in uids:
-            if team[u] not in included_teams:
-                m += y[u] == 0
-                m += b[u] == 0
-
-    for u in inc_players_u:
+    for u in common["inc_players"]:
         if use_bench:
             m += y[u] + b[u] == 1
         else:
             m += y[u] == 1
 
-    for u in inc_start_u:
+    for u in common["inc_start"]:
         m += y[u] == 1
 
-    m.objective = start_expr
-    status = m.solve(PULP_CBC_CMD(msg=solver_msg))
-    if LpStatus[status] != "Optimal":
-        return False, None
+    if common["objective_mode"] == 'weighted':
+        # One solve: XI > bench > cost encoded in a single integer-weighted objective
+        pt_u, cost_u, w_start, w_bench = lexicographic_weights(pts, price, TOTAL_STARTERS, 4 if use_bench else 0)
+        m.objective = (
+            w_start * lpSum(pt_u[u] * y[u] for u in uids)
+            + w_bench * lpSum(pt_u[u] * b[u] for u in uids)
+            - lpSum(cost_u[u] * (y[u] + b[u]) for u in uids)
+        )
 
-    start_best = sum(pts[u] * value(y[u]) for u in uids)
-    EPS = 1e-6
-    m += start_expr >= start_best - EPS
-    m += start_expr <= start_best + EPS
+    if scen is not None and scen.get("risk_weight"):
+        # short_s >= eta - XI_s per draw; eta - mean(short) / alpha is the XI's CVaR at the optimum
+        lam, alpha = scen["risk_weight"], scen["alpha"]
+        live = [u for u in uids if u not in blocked]
+        ys = [y[u] for u in live]
+        eta = LpVariable("cvar_eta")
+        draws = scen["draws"]
+        short = LpVariable.dicts("cvar_short", range(len(draws)), 0)
+        for s, row in enumerate(draws[:, [scen["col"][u] for u in live]].tolist()):
+            m += (LpAffineExpression(zip(ys, row)) + short[s] - eta >= 0, f"cvar_{s}")
+        cvar_expr = eta - lpSum(short.values()) * (1.0 / (alpha * len(draws)))
+        start_expr = (1 - lam) * start_expr + lam * cvar_expr
+
+    return dict(
+        common, m=m, y=y, b=b,
+        start_expr=start_expr, bench_expr=bench_expr, total_cost_expr=total_cost_expr,
+        build_s=perf_counter() - t_build,
+    )
 
-    if use_bench:
-        m.objective = bench_expr
-        status = m.solve(PULP_CBC_CMD(msg=solver_msg))
-        if LpStatus[status] != "Optimal":
+
+def _solve_formation_model(p, budget=None):
+    """
+    Solve (or re-solve) a _build_formation_model() model -> (ok, payload).
+    budget: solvers.Deadline shared by the stages; a tie-break stage without time
+    keeps the last stage's squad. p["proved"] says whether every stage was optimal.
+    """
+    if p.get("dp"):
+        p["proved"] = True
+        return _solve_formation_dp(p)
+    m, y, b, uids = p["m"], p["y"], p["b"], p["uids"]
+    pts, price, use_bench = p["pts"], p["price"], p["use_bench"]
+    start_expr, bench_expr, total_cost_expr = p["start_expr"], p["bench_expr"], p["total_cost_expr"]
+    n_stages = 1 if p["objective_mode"] == 'weighted' else (3 if use_bench else 2)
+    p["proved"] = not p["mip_gap"]
+    stage = [0]
+
+    def _solve():
+        limit = None
+        if budget is not None:
+            if budget.expired():
+                p["proved"] = False
+                return False
+            limit = time_limit(budget.share(n_stages - stage[0]))
+        stage[0] += 1
+        status = m.solve(make_solver(p["solver"], msg=p["solver_msg"], tmp_dir=p["tmp_dir"],
+                                     time_limit=limit, gap_rel=p["mip_gap"]))
+        if not settled(m, status):
+            p["proved"] = False
+        return LpStatus[status] == "Optimal"
+
+    def _chosen():
+        starters = [u for u in uids if value(y[u]) > 0.5]
+        benchers = [] if not use_bench else [u for u in uids if value(b[u]) > 0.5]
+        return starters, benchers
+
+    t_solve = perf_counter()
+
+    if p["objective_mode"] == 'weighted':
+        if not _solve():
+            return False, None
+        chosen = _chosen()
+    else:
+        # Pins from an earlier solve of this model no longer hold once cuts are added
+        for nm in ("PIN_START_LO", "PIN_START_HI", "PIN_BENCH_LO", "PIN_BENCH_HI"):
+            m.constraints.pop(nm, None)
+
+        m.objective = start_expr
+        if not _solve():
             return False, None
-        bench_best = sum(pts[u] * value(b[u]) for u in uids)
-        m += bench_expr >= bench_best - EPS
-        m += bench_expr <= bench_best + EPS
+        chosen = _chosen()
+
+        start_best = sum(pts[u] * value(y[u]) for u in uids)
+        if p["scen"] is not None and p["scen"].get("risk_weight"):
+            start_best = value(start_expr)  # the CVaR objective, not just the XI points
+        EPS = 1e-6
+        m += (start_expr >= start_best - EPS, "PIN_START_LO")
+        m += (start_expr <= start_best + EPS, "PIN_START_HI")
+
+        stopped = False
+        if use_bench:
+            m.objective = bench_expr
+            if not _solve():
+                if budget is None:
+                    return False, None
+                stopped = True
+            else:
+                chosen = _chosen()
+                bench_best = sum(pts[u] * value(b[u]) for u in uids)
+                m += (bench_expr >= bench_best - EPS, "PIN_BENCH_LO")
+                m += (bench_expr <= bench_best + EPS, "PIN_BENCH_HI")
+
+        if not stopped:
+            m.objective = -total_cost_expr
+            if _solve():
+                chosen = _chosen()
+            elif budget is None:
+                return False, None
+
+    solve_s = perf_counter() - t_solve
+
+    starters, benchers = chosen
+    return True, _formation_payload(p, starters, benchers, solve_s)
 
-    m.objective = -total_cost_expr
-    status = m.solve(PULP_CBC_CMD(msg=solver_msg))
-    if LpStatus[status] != "Optimal":
+
+def _solve_formation_dp(p):
+    """XI-only formation solved exactly by dp_solver (no LP model)."""
+    t_solve = perf_counter()
+    if p["blocked"] & p["forced"]:
+        return False, None
+    found = dp_best_squad(
+        [u for u in p["uids"] if u not in p["blocked"]], p["pos"], p["team"], p["price"], p["pts"],
+        p["counts"], p["BUDGET"], p["max_per_team"], forced=p["forced"],
+    )
+    if found is None:
         return False, None
+    chosen = set(found["ids"])
+    starters = [u for u in p["uids"] if u in chosen]
+    return True, _formation_payload(p, starters, [], perf_counter() - t_solve)
 
-    starters = [u for u in uids if value(y[u]) > 0.5]
-    benchers = [] if not use_bench else [u for u in uids if value(b[u]) > 0.5]
 
+def _formation_payload(p, starters, benchers, solve_s):
+    pts, price = p["pts"], p["price"]
     start_pts  = sum(pts[u] for u in starters)
     bench_pts  = sum(pts[u] for u in benchers)
     total_cost = sum(price[u] for u in starters + benchers)
@@ -158,7 +408,7 @@ def _solve_for_formation(
     start_cost  = sum(price[u] for u in starters)
 
     payload = {
-        "formation": formation,
+        "formation": p["formation"],
         "starting_uids": starters,
         "bench_uids": benchers,
         "starting_points": start_pts,
@@ -166,13 +416,187 @@ def _solve_for_formation(
         "total_budget_used": total_cost,
         "bench_budget_used": bench_cost,
         "starting_budget_used": start_cost,
-        "_df_uid": df,  # for printing
-        "_use_bench": use_bench,
-        "_bench_budget_cap": bench_budget,
-        "_budget_cap": BUDGET,
-        "_max_per_team": max_per_team,
+        "_df_uid": p["df"],  # for printing
+        "_use_bench": p["use_bench"],
+        "_bench_budget_cap": p["bench_budget"],
+        "_budget_cap": p["BUDGET"],
+        "_max_per_team": p["max_per_team"],
+        "_build_s": p["build_s"],
+        "_solve_s": solve_s,
+        "_presolve": p["presolve"],
     }
-    return True, payload
+    if p["scen"] is not None:
+        payload["scenario"] = _scenario_stats(p["scen"], starters)
+    return payload
+
+
+def _scenario_stats(scen, starters):
+    """XI points over the draws: mean, CVaR and the objective they make up."""
+    totals = scen["draws"][:, [scen["col"][u] for u in starters]].sum(axis=1)
+    lam, alpha = scen.get("risk_weight") or 0.0, scen["alpha"]
+    mean, tail = float(totals.mean()), cvar(totals, alpha)
+    return {"n": len(totals), "alpha": alpha, "risk_weight": lam, "mean": mean, "cvar": tail,
+            "objective": (1 - lam) * mean + lam * tail}
+
+
+def _rank_points(payload):
+    """What the formations are ranked by: XI points, or the scenario objective."""
+    return payload["scenario"]["objective"] if "scenario" in payload else payload["starting_points"]
+
+
+def _solve_for_formation(df_merged, BUDGET, formation, bench_budget=20.0, **kwargs):
+    return _solve_formation_model(_build_formation_model(df_merged, BUDGET, formation, bench_budget, **kwargs))
+
+
+def _solve_formations_pruned(df_merged, BUDGET, formations, bench_budget, kw):
+    """
+    Formations in LP-bound order, skipping those that can't reach the best XI
+    points so far (bounds.py). Returns ([(ok, payload)] for the solved formations
+    in formation order, stats).
+    """
+    models = [_build_formation_model(df_merged, BUDGET, f, bench_budget, **kw) for f in formations]
+
+    def bound_pass(j):
+        p = models[j]
+        return lp_bound(p["m"], p["start_expr"], p["solver"], tmp_dir=p["tmp_dir"])
+
+    def solve_pass(j):
+        ok, payload = _solve_formation_model(models[j])
+        return (_rank_points(payload), payload) if ok else None
+
+    payloads, stats = bound_and_prune(len(models), bound_pass, solve_pass)
+    return [(True, p) for p in payloads if p is not None], stats
+
+
+def _solve_formations_timed(df_merged, BUDGET, formations, bench_budget, kw, budget, prune):
+    """
+    Formations under a deadline: the swap search's squad is the floor, then the
+    MILPs run in LP-bound order (most promising first), each with an equal share
+    of the time left. Every payload is labelled "status"/"gap" (to its own LP
+    bound). Returns ([(ok, payload)] in formation order, stats, overall status
+    and gap of the best).
+    """
+    models = [_build_formation_model(df_merged, BUDGET, f, bench_budget, **kw) for f in formations]
+    quick, _ = _quick_search(models, BUDGET, bench_budget, kw["max_per_team"], kw["use_bench"], quick_time(budget))
+    bounds, started, unproved = {}, [], []
+
+    def bound_pass(j):
+        p = models[j]
+        bounds[j] = lp_bound(p["m"], p["start_expr"], p["solver"], tmp_dir=p["tmp_dir"])
+        return bounds[j]
+
+    def solve_pass(j):
+        share = budget.share(len(models) - len(started))
+        started.append(j)
+        if budget.expired():
+            unproved.append(j)
+            return None
+        ok, payload = _solve_formation_model(models[j], share)
+        if not models[j]["proved"]:
+            unproved.append(j)
+        return (payload["starting_points"], payload) if ok else None
+
+    payloads, stats = bound_and_prune(len(models), bound_pass, solve_pass, prune=prune)
+    for j, payload in enumerate(payloads):
+        if payload is not None:
+            payload.update(status="best-found" if j in unproved else "optimal",
+                           gap=gap(payload["starting_points"], bounds[j]) if j in unproved else 0.0)
+
+    # The swap-search squad stands in for its formation where the MILP did worse or ran out of time
+    if quick is not None and unproved:
+        j = [p["formation"] for p in models].index(quick["formation"])
+        mine = payloads[j]
+        if mine is None or ((quick["starting_points"], -quick["total_budget_used"], quick["bench_points"])
+                            > (mine["starting_points"], -mine["total_budget_used"], mine["bench_points"])):
+            quick.update(status="best-found", gap=gap(quick["starting_points"], bounds.get(j)))
+            payloads[j] = quick
+
+    solved = [p for p in payloads if p is not None]
+    best_pts = max((p["starting_points"] for p in solved), default=None)
+    ubs = [bounds[j] for j in unproved if bounds.get(j) is not None]
+    if not unproved:
+        status, best_gap = "optimal", 0.0
+    else:
+        status = "best-found"
+        best_gap = None if best_pts is None else gap(best_pts, max([best_pts] + ubs))
+    return [(True, p) for p in solved], stats, status, best_gap
+
+
+def _write_wildcard_block(f, payload):
+    """One squad block of the wildcard report (formation, XI, bench, totals)."""
+    DEF, MID, FWD = payload["formation"]
+    df_uid = payload["_df_uid"]
+    use_b = payload["_use_bench"]
+
+    def _print_row(fh, u):
+        r = df_uid.loc[u]
+        fh.write(f"{r['Name']:<25}{r['Team']:<15}{r['Position']:<15}{float(r['Price']):<10.1f}{float(r['Points']):<10.2f}\n")
+
+    f.write("Optimized Team:\n")
+    f.write(f"{DEF} - {MID} - {FWD}\n")
+    f.write(f"{'Name':<25}{'Team':<15}{'Position':<15}{'Price':<10}{'Points':<10}\n")
+    f.write('-' * 75 + '\n')
+
+    f.write("STARTING XI\n")
+    pos_order = ['Goalkeeper', 'Defender', 'Midfielder', 'Forward']
+    for P in pos_order:
+        for u in payload["starting_uids"]:
+            if df_uid.loc[u, 'Position'] == P:
+                _print_row(f, u)
+
+    if use_b:
+        f.write('-' * 75 + '\n')
+        f.write("BENCH\n")
+        for u in payload["bench_uids"]:
+            _print_row(f, u)
+
+    f.write('-' * 75 + '\n')
+    f.write(f"Starting XI points: {payload['starting_points']:.2f}\n")
+    if "status" in payload:
+        f.write(f"Solve: {solve_label(payload['status'], payload['gap'])}\n")
+    if "scenario" in payload:
+        f.write(scenario_summary(payload["scenario"]) + "\n")
+    if use_b:
+        f.write(f"Bench points:      {payload['bench_points']:.2f}\n")
+        f.write(f"15-Man Team Points: {payload['starting_points'] + payload['bench_points']:.2f}\n")
+        f.write(f"Starting budget used: {payload['starting_budget_used']:.2f}\n")
+        f.write(f"Bench budget used:    {payload['bench_budget_used']:.2f} / {payload['_bench_budget_cap']:.2f}\n")
+        f.write(f"Total budget used:    {payload['total_budget_used']:.2f} / {payload['_budget_cap']:.2f}\n")
+        f.write('=' * 75 + '\n\n')
+    else:
+        f.write(f"Total budget used (XI): {payload['_budget_cap']:.2f}\n")
+        f.write('=' * 75 + '\n\n')
+
+
+def _public_payload(p, use_bench):
+    base = {} if "status" not in p else {"status": p["status"], "gap": p["gap"]}
+    if "scenario" in p:
+        base["scenario"] = p["scenario"]
+    base.update({
+        "formation": p["formation"],
+        "starting_points": p["starting_points"],
+        "starting_budget_used": p["starting_budget_used"],
+        "total_budget_used": p["total_budget_used"],
+        "starting_uids": p["starting_uids"],
+        "bench_uids": p["bench_uids"] if use_bench else [],
+    })
+    if use_bench:
+        base.update({
+            "bench_points": p["bench_points"],
+            "bench_budget_used": p["bench_budget_used"],
+        })
+    else:
+        base.update({
+            "bench_points": 0.0,
+            "bench_budget_used": 0.0,
+        })
+    return base
+
+
+def _solve_for_formation_isolated(df_merged, BUDGET, formation, bench_budget, kwargs):
+    """Process-pool task: one formation with its own solver temp directory."""
+    with solver_tmp_dir() as tmp:
+        return _solve_for_formation(df_merged, BUDGET, formation, bench_budget, tmp_dir=tmp, **kwargs)
 
 
 def wildcard_team_11(
@@ -189,16 +613,58 @@ def wildcard_team_11(
     outfile='optimized_team_with_bench.txt',
     solver_msg=False,
     use_bench=True,
+    objective_mode='lexicographic',
+    solver='cbc',
+    presolve=True,
+    cache=True,
+    jobs=1,
+    prune=False,
+    deadline=None,
+    mip_gap=None,
+    scenarios=None,
 ):
+    """
+    Best squad per formation, written to outfile; returns the best and all of them.
+    prune: skip formations whose LP bound can't reach the best XI points so far
+    (bounds.py). The best is unchanged, but all_results (and the report) then only
+    hold the formations that were solved. Serial MILP backends only.
+    deadline: solvers.Deadline for the whole call (--time-budget). The formations
+    run serially in LP-bound order, each with a share of the time left, and every
+    payload and the result carry "status" ("optimal"/"best-found") and "gap".
+    Only complete (optimal) runs are cached. The dp backend ignores it.
+    mip_gap: relative gap each MIP solve may stop at.
+    scenarios: {"n", "spread", "scale", "seed", "alpha", "risk_weight"} (scenarios.py).
+    The squads are picked on n point draws per player: on the sample-average XI
+    points, and with risk_weight > 0 also on their CVaR (mean of the worst alpha
+    share of the draws). Payloads then carry "scenario" stats and the best is the
+    one with the highest objective. A CVaR run ignores the deadline.
+    """
     formations = formations or VALID_FORMATIONS
-
-    results = []
-    best_key = None
-    best = None
-
-    for f in formations:
-        ok, payload = _solve_for_formation(
-            df_merged, BUDGET, f, bench_budget,
+    if solver == DP_BACKEND or (scenarios and scenarios.get("risk_weight")):
+        deadline = None
+    prune = prune and (jobs <= 1 or deadline is not None) and solver != DP_BACKEND and len(formations) > 1
+
+    # Same pool + settings as an earlier run -> reuse its per-formation payloads
+    t_lookup = perf_counter()
+    ck = cache_key(
+        'wildcard', df_merged, budget=BUDGET, bench_budget=bench_budget, formations=formations,
+        included_players=included_players, included_starting=included_starting,
+        included_teams=included_teams, excluded_players=excluded_players, excluded_teams=excluded_teams,
+        max_per_team=max_per_team, use_bench=use_bench, objective_mode=objective_mode,
+        **({'prune': True} if prune else {}), **({'mip_gap': mip_gap} if mip_gap else {}),
+        **({'scenarios': scenarios} if scenarios else {}),
+    ) if cache else None
+    cached = cache_get(ck) if ck else None
+    prune_stats = None
+    status, best_gap = None, None
+
+    if cached is not None:
+        results = cached['results']
+        timing = {"build_s": 0.0, "solve_s": perf_counter() - t_lookup, "cached": True}
+        if deadline is not None:
+            status, best_gap = "optimal", 0.0
+    else:
+        kw = dict(
             included_players=included_players,
             included_starting=included_starting,
             included_teams=included_teams,
@@ -207,17 +673,50 @@ def wildcard_team_11(
             max_per_team=max_per_team,
             solver_msg=solver_msg,
             use_bench=use_bench,
+            objective_mode=objective_mode,
+            solver=solver,
+            presolve=presolve,
+            mip_gap=mip_gap,
         )
-        if ok:
-            results.append(payload)
-            key = (
-                payload["starting_points"],
-                -payload["total_budget_used"],
-                payload["bench_points"] if use_bench else 0.0
-            )
-            if best_key is None or key > best_key:
-                best_key = key
-                best = payload
+        if scenarios:
+            # One set of draws for every formation, so their objectives compare
+            kw["scenarios"] = dict(scenarios, draws=scenario_draws(df_merged, scenarios))
+        # Formations are independent; with jobs > 1 they run in a process pool and
+        # come back in formation order, so the best pick below is unchanged.
+        if deadline is not None:
+            solved, prune_stats, status, best_gap = _solve_formations_timed(
+                df_merged, BUDGET, formations, bench_budget, kw, deadline, prune)
+            print(f"Time budget: {solve_label(status, best_gap)} ({deadline.left():.1f}s left)")
+            if not prune:
+                prune_stats = None
+        elif prune:
+            solved, prune_stats = _solve_formations_pruned(df_merged, BUDGET, formations, bench_budget, kw)
+            print(prune_summary(prune_stats, "formations"))
+        elif jobs > 1:
+            solved = map_jobs(_solve_for_formation_isolated,
+                              [(df_merged, BUDGET, f, bench_budget, kw) for f in formations], jobs)
+        else:
+            solved = [_solve_for_formation(df_merged, BUDGET, f, bench_budget, **kw) for f in formations]
+        results = [payload for ok, payload in solved if ok]
+        timing = {
+            "build_s": sum(p["_build_s"] for p in results),
+            "solve_s": sum(p["_solve_s"] for p in results),
+            "cached": False,
+        }
+        if ck and results and status in (None, "optimal"):
+            cache_put(ck, {'results': results})
+
+    best_key = None
+    best = None
+    for payload in results:
+        key = (
+            _rank_points(payload),
+            -payload["total_budget_used"],
+            payload["bench_points"] if use_bench else 0.0
+        )
+        if best_key is None or key > best_key:
+            best_key = key
+            best = payload
 
     if not results:
         raise ValueError("No feasible squad found. Adjust budgets/constraints or formations.")
@@ -232,74 +731,252 @@ def wildcard_team_11(
         f.write('=' * 75 + '\n\n')
 
         for payload in results:
-            DEF, MID, FWD = payload["formation"]
-            df_uid = payload["_df_uid"]
-            use_b = payload["_use_bench"]
+            _write_wildcard_block(f, payload)
+            if payload is best:
+                f.write("[BEST BY SCENARIO OBJECTIVE]\n" if scenarios else "[BEST BY XI POINTS]\n")
+                f.write('=' * 75 + '\n\n')
+            f.write('\n')
 
-            def _print_row(fh, u):
-                r = df_uid.loc[u]
-                fh.write(f"{r['Name']:<25}{r['Team']:<15}{r['Position']:<15}{float(r['Price']):<10.1f}{float(r['Points']):<10.2f}\n")
+    return {
+        "best": _public_payload(best, use_bench),
+        "all_results": [_public_payload(p, use_bench) for p in results],
+        "timing": timing,
+        "presolve": {p["formation"]: p["_presolve"] for p in results},
+        "prune": prune_stats,
+        "status": status,
+        "gap": best_gap,
+    }
 
-            f.write("Optimized Team:\n")
-            f.write(f"{DEF} - {MID} - {FWD}\n")
-            f.write(f"{'Name':<25}{'Team':<15}{'Position':<15}{'Price':<10}{'Points':<10}\n")
-            f.write('-' * 75 + '\n')
+# -------------- Anytime wildcard (swap search + LP gap) -------------- #
 
-            f.write("STARTING XI\n")
-            pos_order = ['Goalkeeper', 'Defender', 'Midfielder', 'Forward']
-            for P in pos_order:
-                for u in payload["starting_uids"]:
-                    if df_uid.loc[u, 'Position'] == P:
-                        _print_row(f, u)
+START_BONUS = 1000.0  # added to included_starting players' points in the search, so every XI ranks them in
 
-            if use_b:
-                f.write('-' * 75 + '\n')
-                f.write("BENCH\n")
-                for u in payload["bench_uids"]:
-                    _print_row(f, u)
-
-            f.write('-' * 75 + '\n')
-            f.write(f"Starting XI points: {payload['starting_points']:.2f}\n")
-            if use_b:
-                f.write(f"Bench points:      {payload['bench_points']:.2f}\n")
-                f.write(f"15-Man Team Points: {payload['starting_points'] + payload['bench_points']:.2f}\n")
-                f.write(f"Starting budget used: {payload['starting_budget_used']:.2f}\n")
-                f.write(f"Bench budget used:    {payload['bench_budget_used']:.2f} / {payload['_bench_budget_cap']:.2f}\n")
-                f.write(f"Total budget used:    {payload['total_budget_used']:.2f} / {payload['_budget_cap']:.2f}\n")
-                f.write('=' * 75 + '\n\n')
-            else:
-                f.write(f"Total budget used (XI): {payload['_budget_cap']:.2f}\n")
-                f.write('=' * 75 + '\n\n')
-            if payload is best:
-                f.write("[BEST BY XI POINTS]\n")
-                f.write('=' * 75 + '\n\n')
-            f.write('\n')
 
-    def _shape_public_payload(p):
-        base = {
-            "formation": p["formation"],
-            "starting_points": p["starting_points"],
-            "starting_budget_used": p["starting_budget_used"],
-            "total_budget_used": p["total_budget_used"],
-            "starting_uids": p["starting_uids"],
-            "bench_uids": p["bench_uids"] if use_bench else [],
-        }
-        if use_bench:
-            base.update({
-                "bench_points": p["bench_points"],
-                "bench_budget_used": p["bench_budget_used"],
-            })
-        else:
-            base.update({
-                "bench_points": 0.0,
-                "bench_budget_used": 0.0,
-            })
-        return base
+def _quick_pools(df_merged, BUDGET, formations, bench_budget=20.0, included_players=None, included_starting=None,
+                 included_teams=None, excluded_players=None, excluded_teams=None, max_per_team=3, use_bench=True):
+    """
+    _quick_search() input straight from the frame: the pool, rules and presolve
+    _build_formation_model() would give each formation, without the LP models
+    (_formation_lp() adds one). The frame is indexed once; with a bench one
+    presolve serves every formation.
+    """
+    t_build = perf_counter()
+    df, (_, team, pos, price, pts) = _uid_frame(df_merged)
+    inc_players_u, inc_start_u, blocked, forced = _squad_rules(
+        df, list(df.index), team, included_players, included_starting, excluded_players, included_teams, excluded_teams)
+    common = {
+        "df": df, "pts": pts, "price": price, "pos": pos, "team": team, "forced": forced, "inc_start": inc_start_u,
+        "inc_players": inc_players_u, "BUDGET": BUDGET, "bench_budget": bench_budget, "max_per_team": max_per_team,
+        "use_bench": use_bench, "objective_mode": 'lexicographic', "solver": 'cbc', "solver_msg": False,
+        "tmp_dir": None, "mip_gap": None, "scen": None,
+    }
+    pools = []
+    for f in formations[:1] if use_bench else formations:
+        uids, stats, left = _presolved(list(df.index), pos, team, price, pts, f, max_per_team, use_bench, blocked, forced)
+        pools.append(dict(common, uids=uids, presolve=stats, blocked=left, formation=f))
+    build_s = perf_counter() - t_build
+    for p in pools:
+        p["build_s"] = build_s
+    if use_bench:
+        pools = [dict(pools[0], formation=f) for f in formations]
+    return pools
 
-    return {
-        "best": _shape_public_payload(best),
-        "all_results": [_shape_public_payload(p) for p in results],
+
+def _quick_search(models, BUDGET, bench_budget, max_per_team, use_bench, time_limit, seed=0):
+    """Swap search over the formations' models (or _quick_pools) -> (best payload or None, search stats per run)."""
+    t0 = perf_counter()
+    if use_bench:
+        # Presolve keeps the same pool for every formation when there is a bench
+        groups = [(models[0], [p["formation"] for p in models], SQUAD_CAPS, bench_budget)]
+    else:
+        groups = [(p, [p["formation"]], {'Goalkeeper': 1, 'Defender': p["formation"][0],
+                                         'Midfielder': p["formation"][1], 'Forward': p["formation"][2]},
+                   None) for p in models]
+
+    best, best_key, stats = None, None, []
+    for n, (p, forms, caps, cap) in enumerate(groups):
+        # Each search gets an even share of what is left, so setup time doesn't add up
+        limit = max(time_limit - (perf_counter() - t0), 0.0) / (len(groups) - n)
+        if p["blocked"] & p["forced"]:
+            continue
+        pts = {u: p["pts"][u] + (START_BONUS if u in p["inc_start"] else 0.0) for u in p["uids"]}
+        search = SwapSearch(
+            [u for u in p["uids"] if u not in p["blocked"]], p["pos"], p["team"], p["price"], pts,
+            caps, forms, BUDGET, max_per_team, cap, forced=p["forced"], bench_rule="xi",
+        )
+        found = search.run((), limit, seed=seed)
+        if found is None:
+            continue
+        stats.append(found["stats"])
+        payload = _formation_payload(dict(p, formation=found["formation"]), found["xi"], found["bench"],
+                                     perf_counter() - t0)
+        key = (round(payload["starting_points"], 6), -payload["total_budget_used"], payload["bench_points"])
+        if best_key is None or key > best_key:
+            best, best_key = payload, key
+    return best, stats
+
+
+def wildcard_quick(
+    BUDGET,
+    df_merged,
+    bench_budget=20.0,
+    formations=None,
+    included_players=None,
+    included_starting=None,
+    included_teams=None,
+    excluded_players=None,
+    excluded_teams=None,
+    max_per_team=3,
+    outfile=None,
+    use_bench=True,
+    time_limit=0.2,
+    bound=True,
+    seed=0,
+):
+    """
+    Good wildcard squad within about time_limit seconds: a swap search
+    (local_search.py) from a greedy fill instead of the per-formation MILPs.
+    Returns {"best": public payload, "quick": search stats}; "quick" holds
+    "lp_bound" (the best formation's LP relaxation, None with bound=False)
+    and "gap". The search reads the frame directly; only bound=True builds the
+    formation models, and their build and LP solves come out of time_limit.
+    XI-only squads get one search per formation, time_limit split between them.
+    outfile: also write the squad as a wildcard_team_11 block.
+    """
+    t0 = perf_counter()
+    formations = formations or VALID_FORMATIONS
+    kw = dict(
+        included_players=included_players,
+        included_starting=included_starting,
+        included_teams=included_teams,
+        excluded_players=excluded_players,
+        excluded_teams=excluded_teams,
+        max_per_team=max_per_team,
+        use_bench=use_bench,
+    )
+    pools = _quick_pools(df_merged, BUDGET, formations, bench_budget, **kw)
+
+    ub = None
+    if bound:
+        models = [_formation_lp(p, perf_counter()) for p in pools]
+        ubs = [lp_bound(p["m"], p["start_expr"], p["solver"]) for p in models]
+        ub = max((b for b in ubs if b is not None), default=None)
+    left = max(time_limit - (perf_counter() - t0), 0.0)
+    best, stats = _quick_search(pools, BUDGET, bench_budget, max_per_team, use_bench, left, seed)
+    if best is None:
+        raise ValueError("No feasible squad found. Adjust budgets/constraints or formations.")
+    quick = {
+        "iterations": sum(st["iterations"] for st in stats),
+        "restarts": sum(st["restarts"] for st in stats),
+        "first_s": min(st["first_s"] for st in stats),
+        "elapsed_s": perf_counter() - t0,
+        "xi_points": best["starting_points"],
+        "lp_bound": ub,
+        "gap": gap(best["starting_points"], ub),
     }
+    if outfile:
+        with open(outfile, 'w', encoding='utf-8') as f:
+            f.write("Quick Team (swap search, not proven optimal):\n")
+            f.write(quick_summary(quick) + "\n")
+            f.write('=' * 75 + '\n\n')
+            _write_wildcard_block(f, best)
+    return {"best": _public_payload(best, use_bench), "quick": quick}
+
+
+# -------------- Top-N distinct squads (no-good cuts) -------------- #
+
+def iter_wildcard_squads(
+    BUDGET,
+    df_merged,
+    bench_budget=20.0,
+    formations=None,
+    included_players=None,
+    included_starting=None,
+    included_teams=None,
+    excluded_players=None,
+    excluded_teams=None,
+    max_per_team=3,
+    solver_msg=False,
+    use_bench=True,
+    objective_mode='lexicographic',
+    solver='cbc',
+    min_diff=1,
+    limit=None,
+):
+    """
+    Internal payloads (as in wildcard_team_11's results) of the best squads across
+    all formations, best first, any two differing in at least min_diff players.
+    Squads are produced one at a time, so callers can report them as they arrive.
+    """
+    if solver == DP_BACKEND:
+        raise ValueError("solver='dp' can't take the no-good cuts; use a MILP backend for top-N squads")
+    formations = formations or VALID_FORMATIONS
+    kw = dict(
+        included_players=included_players,
+        included_starting=included_starting,
+        included_teams=included_teams,
+        excluded_players=excluded_players,
+        excluded_teams=excluded_teams,
+        max_per_team=max_per_team,
+        solver_msg=solver_msg,
+        use_bench=use_bench,
+        objective_mode=objective_mode,
+        solver=solver,
+        presolve=False,  # see solution_pool.py
+    )
+    with solver_tmp_dir() as tmp:
+        models = [_build_formation_model(df_merged, BUDGET, f, bench_budget, tmp_dir=tmp, **kw) for f in formations]
+        n_cuts = [0] * len(models)
+
+        def solve_pass(j):
+            ok, payload = _solve_formation_model(models[j])
+            if not ok:
+                return None
+            # The models' own order (XI > bench > cost), rounded so float noise
+            # in equal sums can't reorder ties
+            key = (
+                round(payload["starting_points"], 6),
+                round(payload["bench_points"], 6) if use_bench else 0.0,
+                -round(payload["total_budget_used"], 6),
+            )
+            return key, payload["starting_uids"] + payload["bench_uids"], payload
+
+        def add_cut(j, squad, rhs):
+            p = models[j]
+            m, y, b = p["m"], p["y"], p["b"]
+            m += (lpSum(y[u] + b[u] for u in squad if u in y) <= rhs, f"nogood_{n_cuts[j]}")
+            n_cuts[j] += 1
+
+        yield from iter_distinct(len(models), solve_pass, add_cut, min_diff, limit)
+
+
+def wildcard_top_n(
+    BUDGET,
+    df_merged,
+    n=5,
+    min_diff=1,
+    outfile='top_squads.txt',
+    **kwargs,
+):
+    """
+    Writes the n best distinct squads to outfile in the wildcard_team_11 block
+    format, flushing each one as soon as it is solved. Returns their payloads.
+    kwargs: as for iter_wildcard_squads (bench_budget, formations, includes, ...).
+    """
+    found = []
+    with open(outfile, 'w', encoding='utf-8') as f:
+        f.write(f"Top {n} Distinct Squads (>= {min_diff} player(s) apart):\n")
+        f.write('=' * 75 + '\n\n')
+        for payload in iter_wildcard_squads(BUDGET, df_merged, min_diff=min_diff, limit=n, **kwargs):
+            found.append(payload)
+            f.write(f"#{len(found)}\n")
+            _write_wildcard_block(f, payload)
+            f.write('\n')
+            f.flush()
+    if not found:
+        raise ValueError("No feasible squad found. Adjust budgets/constraints or formations.")
+    return found
+
 
 # -------------- New helpers for dual-CSV reporting -------------- #
 
@@ -383,6 +1060,13 @@ def wildcard_team_11_dual(
     use_bench: bool = True,
     outfile: str = 'optimized_dual_wildcard.txt',
     solver_msg: bool = False,
+    objective_mode: str = 'lexicographic',
+    solver: str = 'cbc',
+    cache: bool = True,
+    jobs: int = 1,
+    deadline=None,
+    mip_gap: Optional[float] = None,
+    scenarios: Optional[Dict] = None,
 ):
     """Selects by df_select['Points'] using the *core* wildcard_team_11, then
     writes a dual-CSV report that also shows df_sort['Points'] (if provided)
@@ -407,6 +1091,13 @@ def wildcard_team_11_dual(
         outfile=outfile,
         solver_msg=solver_msg,
         use_bench=use_bench,
+        objective_mode=objective_mode,
+        solver=solver,
+        cache=cache,
+        jobs=jobs,
+        deadline=deadline,
+        mip_gap=mip_gap,
+        scenarios=scenarios,
     )
 
     best = core['best']
@@ -455,6 +1146,59 @@ def wildcard_team_11_dual(
 # )
 
 # -------------- XI re-arrangement helpers (fixed squad) -------------- #
+# Once the 15 are fixed, positions don't interact: the best XI for a formation is
+# simply the top-N by points in each position. No solver needed, and it is exact.
+
+XI_POSITIONS = ['Goalkeeper', 'Defender', 'Midfielder', 'Forward']
+
+def _rank_by_position(squad, pos_by_id, pts_by_id):
+    """Squad ids grouped by position, each group sorted by points (desc, stable)."""
+    ranked = {P: [] for P in XI_POSITIONS}
+    for u in squad:
+        ranked.setdefault(pos_by_id[u], []).append(u)
+    for P in ranked:
+        ranked[P].sort(key=lambda u: float(pts_by_id.get(u, 0.0)), reverse=True)
+    return ranked
+
+
+def _xi_from_ranked(squad, ranked, pts_by_id, formation):
+    DEF, MID, FWD = formation
+    chosen = set()
+    for P, n in zip(XI_POSITIONS, (1, DEF, MID, FWD)):
+        if len(ranked.get(P, [])) < n:
+            return None
+        chosen.update(ranked[P][:n])
+    # Keep squad order for both lists (matches what the old solver-based version returned)
+    xi = [u for u in squad if u in chosen]
+    bench = [u for u in squad if u not in chosen]
+    return xi, bench, sum(float(pts_by_id.get(u, 0.0)) for u in xi)
+
+
+def arrange_xi(squad, pos_by_id, pts_by_id, formation):
+    """Best XI of a fixed squad for one (DEF, MID, FWD) formation.
+    Works with any hashable ids (UIDs here, PIDs in the transfer optimizers).
+    Returns (xi_ids, bench_ids, xi_points), or None if the squad can't field it.
+    """
+    squad = list(squad)
+    return _xi_from_ranked(squad, _rank_by_position(squad, pos_by_id, pts_by_id), pts_by_id, formation)
+
+
+def arrange_xi_over_formations(squad, pos_by_id, pts_by_id, formations):
+    """Best XI of a fixed squad over several formations (first one wins ties).
+    Returns dict with keys: formation, xi, bench, xi_points; None if none fit.
+    """
+    squad = list(squad)
+    ranked = _rank_by_position(squad, pos_by_id, pts_by_id)
+    best = None
+    for f in formations:
+        arranged = _xi_from_ranked(squad, ranked, pts_by_id, f)
+        if arranged is None:
+            continue
+        xi, bench, points = arranged
+        if best is None or points > best["xi_points"]:
+            best = {"formation": f, "xi": xi, "bench": bench, "xi_points": points}
+    return best
+
 
 def _arrange_best_xi_for_fixed_squad_uids(
     selected_uids: List[str],
@@ -465,27 +1209,10 @@ def _arrange_best_xi_for_fixed_squad_uids(
     """Given a fixed squad (UIDs), choose the best XI for a *specific* formation.
     Returns (xi_uids, bench_uids, xi_points).
     """
-    DEF, MID, FWD = formation
-    m = LpProblem("Arrange_Best_XI_UID", LpMaximize)
-    y = LpVariable.dicts("start", selected_uids, 0, 1, cat="Binary")
-
-    # XI size
-    m += lpSum(y[u] for u in selected_uids) == 11
-
-    # Formation constraints
-    m += lpSum(y[u] for u in selected_uids if pos_by_uid[u] == 'Goalkeeper') == 1
-    m += lpSum(y[u] for u in selected_uids if pos_by_uid[u] == 'Defender')   == DEF
-    m += lpSum(y[u] for u in selected_uids if pos_by_uid[u] == 'Midfielder') == MID
-    m += lpSum(y[u] for u in selected_uids if pos_by_uid[u] == 'Forward')    == FWD
-
-    # Objective: maximize points (under provided pts_by_uid basis)
-    m.objective = lpSum(float(pts_by_uid.get(u, 0.0)) * y[u] for u in selected_uids)
-    m.solve(PULP_CBC_CMD(msg=False))
-
-    xi = [u for u in selected_uids if value(y[u]) > 0.5]
-    bench = [u for u in selected_uids if u not in xi]
-    xi_points = sum(float(pts_by_uid.get(u, 0.0)) for u in xi)
-    return xi, bench, xi_points
+    arranged = arrange_xi(selected_uids, pos_by_uid, pts_by_uid, formation)
+    if arranged is None:
+        return [], list(selected_uids), float('-inf')
+    return arranged
 
 
 def _best_xi_over_formations(
@@ -497,15 +1224,10 @@ def _best_xi_over_formations(
     """Try all formations and return the best-arranged XI/bench under pts_by_uid.
     Returns dict with keys: formation, xi_uids, bench_uids, xi_points.
     """
-    best = None
-    best_key = None
-    for f in formations:
-        xi, bench, points = _arrange_best_xi_for_fixed_squad_uids(selected_uids, pos_by_uid, pts_by_uid, f)
-        key = (points,)
-        if best_key is None or key > best_key:
-            best_key = key
-            best = {"formation": f, "xi_uids": xi, "bench_uids": bench, "xi_points": points}
-    return best
+    best = arrange_xi_over_formations(selected_uids, pos_by_uid, pts_by_uid, formations)
+    if best is None:
+        return None
+    return {"formation": best["formation"], "xi_uids": best["xi"], "bench_uids": best["bench"], "xi_points": best["xi_points"]}
 
 
 # -------------- Mode 1: Wildcard (3GW select) + 1GW re-arrangement -------------- #
@@ -525,6 +1247,13 @@ def wildcard_compare_3gw_1gw(
     use_bench: bool = True,
     outfile: str = 'optimized_wildcard_vs_1gw.txt',
     solver_msg: bool = False,
+    objective_mode: str = 'lexicographic',
+    solver: str = 'cbc',
+    cache: bool = True,
+    jobs: int = 1,
+    deadline=None,
+    mip_gap: Optional[float] = None,
+    scenarios: Optional[Dict] = None,
 ):
     """
     For each *3GW selection* (wildcard) produced by the core solver across the
@@ -552,6 +1281,13 @@ def wildcard_compare_3gw_1gw(
         outfile=outfile,  # we'll write a custom report below
         solver_msg=solver_msg,
         use_bench=use_bench,
+        objective_mode=objective_mode,
+        solver=solver,
+        cache=cache,
+        jobs=jobs,
+        deadline=deadline,
+        mip_gap=mip_gap,
+        scenarios=scenarios,
     )
 
     # Lookups (UID keyed)
@@ -578,7 +1314,7 @@ def wildcard_compare_3gw_1gw(
         best_1gw_tmp = _best_xi_over_formations(squad_uids, pos_by_uid, pts1_by_uid, formations)
         xi_1gw = sum(float(pts1_by_uid.get(u, 0.0)) for u in best_1gw_tmp['xi_uids'])
         bench_1gw = sum(float(pts1_by_uid.get(u, 0.0)) for u in best_1gw_tmp['bench_uids']) if use_bench else 0.0
-        pre.append({'xi_1gw': xi_1gw, 'all15_1gw': xi_1gw + bench_1gw})
+        pre.append({'xi_1gw': xi_1gw, 'all15_1gw': xi_1gw + bench_1gw, 'best_1gw': best_1gw_tmp})
 
     best_xi_idx = max(range(len(pre)), key=lambda i: pre[i]['xi_1gw']) if pre else -1
     best_all15_idx = max(range(len(pre)), key=lambda i: pre[i]['all15_1gw']) if pre else -1
@@ -601,7 +1337,8 @@ def wildcard_compare_3gw_1gw(
                 squad_uids = sel['starting_uids']
 
             # 2) Re-arrange this fixed squad for the coming GW (1GW) allowing ANY valid formation
-            best_1gw = _best_xi_over_formations(squad_uids, pos_by_uid, pts1_by_uid, formations)
+            #    (already done above for the annotations)
+            best_1gw = pre[idx]['best_1gw']
 
             # Optional: also compute the best XI formation under the 3GW basis for comparison
             best_3gw = _best_xi_over_formations(squad_uids, pos_by_uid, pts3_by_uid, formations)
@@ -645,7 +1382,8 @@ def wildcard_compare_3gw_1gw(
                 f.write(f"Total budget used:    {xi_cost + b_cost:.2f} / {BUDGET:.2f}\n")
             else:
                 f.write(f"Total budget used (XI): {xi_cost:.2f} / {BUDGET:.2f}\n")
-                
+            if "status" in sel:
+                f.write(f"3GW selection solve: {solve_label(sel['status'], sel['gap'])}\n")
 
             # --- Best 1GW annotations across selections ---
             if idx == best_xi_idx:
@@ -680,6 +1418,13 @@ def free_hit_1gw(
     use_bench: bool = True,
     outfile: str = 'optimized_free_hit_1gw.txt',
     solver_msg: bool = False,
+    objective_mode: str = 'lexicographic',
+    solver: str = 'cbc',
+    cache: bool = True,
+    jobs: int = 1,
+    deadline=None,
+    mip_gap: Optional[float] = None,
+    scenarios: Optional[Dict] = None,
 ):
     """Best possible team for *this* gameweek only (uses 1GW CSV for both select & arrangement)."""
     formations = formations or VALID_FORMATIONS
@@ -697,6 +1442,13 @@ def free_hit_1gw(
         outfile=outfile,
         solver_msg=solver_msg,
         use_bench=use_bench,
+        objective_mode=objective_mode,
+        solver=solver,
+        cache=cache,
+        jobs=jobs,
+        deadline=deadline,
+        mip_gap=mip_gap,
+        scenarios=scenarios,
     )
 
 
@@ -716,6 +1468,13 @@ def wildcard_3gw_only(
     use_bench: bool = True,
     outfile: str = 'optimized_wildcard_3gw.txt',
     solver_msg: bool = False,
+    objective_mode: str = 'lexicographic',
+    solver: str = 'cbc',
+    cache: bool = True,
+    jobs: int = 1,
+    deadline=None,
+    mip_gap: Optional[float] = None,
+    scenarios: Optional[Dict] = None,
 ):
     """Classic wildcard: select & arrange by 3GW only (identical to calling core)."""
     formations = formations or VALID_FORMATIONS
@@ -733,6 +1492,13 @@ def wildcard_3gw_only(
         outfile=outfile,
         solver_msg=solver_msg,
         use_bench=use_bench,
+        objective_mode=objective_mode,
+        solver=solver,
+        cache=cache,
+        jobs=jobs,
+        deadline=deadline,
+        mip_gap=mip_gap,
+        scenarios=scenarios,
     )
 
 def sort_dataframe(df):
@@ -1,5 +1,6 @@
 import os
 import sys
+import argparse
 import importlib
 import pandas as pd
 
@@ -14,7 +15,9 @@ for d in CANDIDATE_DIRS:
     if d not in sys.path and os.path.isdir(d):
         sys.path.append(d)
 
-from utils_2025 import wildcard_team_11, wildcard_compare_3gw_1gw, free_hit_1gw, sort_dataframe
+from scenarios import SPREAD_MODES
+from solvers import DP_BACKEND, XI_SOLVER_BACKENDS, Deadline
+from utils_2025 import wildcard_team_11, wildcard_compare_3gw_1gw, free_hit_1gw, wildcard_top_n, sort_dataframe
 
 
 # ----------------------------
@@ -86,7 +89,16 @@ def run_for_method(method_key: str,
                    max_per_team: int = 3,
                    excluded_players=['Isak', 'N.Gonzalez'],
                    use_bench: bool = True,
-                   formations=None):
+                   formations=None,
+                   cache: bool = True,
+                   jobs: int = 1,
+                   top: int = 0,
+                   min_diff: int = 1,
+                   solver: str = 'cbc',
+                   prune: bool = False,
+                   deadline: Deadline = None,
+                   mip_gap: float = None,
+                   scenarios: dict = None):
     if formations is None:
         formations = [(3,4,3), (3,5,2), (4,4,2), (4,5,1), (5,3,2), (5,4,1), (4,3,3)]
 
@@ -142,6 +154,10 @@ def run_for_method(method_key: str,
     df1.to_csv(adj1_out, index=False)
     df3.to_csv(adj3_out, index=False)
 
+    # Under a deadline each of the three runs gets an equal share of what is left
+    def _share(n_left):
+        return None if deadline is None else deadline.share(n_left)
+
     # 1) Wildcard mimic (3GW select) + best arrangement for 1GW
     wildcard_compare_3gw_1gw(
         BUDGET=budget,
@@ -153,6 +169,12 @@ def run_for_method(method_key: str,
         excluded_players=excluded_players,
         use_bench=use_bench,
         outfile=os.path.join(output_dir, f"wildcard_vs_1gw__{method_key}.txt"),
+        cache=cache,
+        jobs=jobs,
+        solver=solver,
+        deadline=_share(3),
+        mip_gap=mip_gap,
+        scenarios=scenarios,
     )
 
     # 2) Free Hit (1GW only)
@@ -165,6 +187,12 @@ def run_for_method(method_key: str,
         excluded_players=excluded_players,
         use_bench=use_bench,
         outfile=os.path.join(output_dir, f"free_hit_1gw__{method_key}.txt"),
+        cache=cache,
+        jobs=jobs,
+        solver=solver,
+        deadline=_share(2),
+        mip_gap=mip_gap,
+        scenarios=scenarios,
     )
 
     # 3) Wildcard by 3GW only
@@ -177,17 +205,86 @@ def run_for_method(method_key: str,
         excluded_players=excluded_players,
         use_bench=use_bench,
         outfile=os.path.join(output_dir, f"wildcard_3gw__{method_key}.txt"),
+        cache=cache,
+        jobs=jobs,
+        solver=solver,
+        prune=prune,
+        deadline=_share(1),
+        mip_gap=mip_gap,
+        scenarios=scenarios,
     )
 
+    # 4) Optional: the `top` best distinct 3GW squads, written as they are found
+    #    (no-good cuts need a MILP, so dp falls back to cbc here)
+    if top > 0:
+        wildcard_top_n(
+            BUDGET=budget,
+            df_merged=df3,
+            n=top,
+            min_diff=min_diff,
+            outfile=os.path.join(output_dir, f"wildcard_top{top}_3gw__{method_key}.txt"),
+            bench_budget=bench_budget,
+            formations=formations,
+            max_per_team=max_per_team,
+            excluded_players=excluded_players,
+            use_bench=use_bench,
+            solver='cbc' if solver == DP_BACKEND else solver,
+        )
+
 
 # ----------------------------
 # Main entry point
 # ----------------------------
 def main():
+    p = argparse.ArgumentParser(description="Wildcard / Free Hit teams for each weighting method.")
+    p.add_argument("--no-cache", action="store_true",
+                   help="Always re-solve (ignore and don't update the on-disk solution cache)")
+    p.add_argument("--jobs", type=int, default=1,
+                   help="Solve the formations of each run in N worker processes")
+    p.add_argument("--top", type=int, default=0,
+                   help="Also write the N best distinct 3GW wildcard squads per method")
+    p.add_argument("--min_diff", type=int, default=1,
+                   help="With --top: every listed squad differs from the others in at least this many players")
+    p.add_argument("--solver", choices=XI_SOLVER_BACKENDS, default="cbc",
+                   help="Backend for the squad solves (dp: exact integer-price DP, needs --no_bench)")
+    p.add_argument("--no_bench", action="store_true",
+                   help="Pick the starting XI only (no bench budget)")
+    p.add_argument("--prune", action="store_true",
+                   help="3GW wildcard: skip formations whose LP bound can't beat the best (report lists only those solved)")
+    p.add_argument("--time-budget", type=float, default=None, metavar="SECONDS",
+                   help="Wall-clock budget for all methods' squad solves (not --top); answers that ran out "
+                        "of time are reported as best found with their gap")
+    p.add_argument("--mip_gap", type=float, default=None,
+                   help="Relative gap at which each MIP solve may stop (e.g. 0.01)")
+    p.add_argument("--scenarios", type=int, default=0, metavar="N",
+                   help="Pick squads on N sampled point scenarios per player instead of the point estimates")
+    p.add_argument("--spread", choices=SPREAD_MODES, default="position",
+                   help="With --scenarios: take each player's spread from his position or price bracket")
+    p.add_argument("--spread_scale", type=float, default=1.0,
+                   help="With --scenarios: multiply every spread by this")
+    p.add_argument("--risk_weight", type=float, default=0.0,
+                   help="With --scenarios: weight of the XI's CVaR against its sample-average points (0..1)")
+    p.add_argument("--cvar_alpha", type=float, default=0.2,
+                   help="With --risk_weight: CVaR is the mean XI points over this worst share of the scenarios")
+    p.add_argument("--seed", type=int, default=0, help="With --scenarios: random seed of the draws")
+    args = p.parse_args()
+    if args.solver == DP_BACKEND and not args.no_bench:
+        p.error("--solver dp needs --no_bench")
+    if args.risk_weight and (args.solver == DP_BACKEND or not args.scenarios):
+        p.error("--risk_weight needs --scenarios and a MILP --solver")
+    scenarios = None
+    if args.scenarios > 0:
+        scenarios = {"n": args.scenarios, "spread": args.spread, "scale": args.spread_scale, "seed": args.seed,
+                     "alpha": args.cvar_alpha, "risk_weight": args.risk_weight}
+
+    deadline = Deadline(args.time_budget) if args.time_budget else None
     methods = ["blended", "fixture_form", "normalized"]
-    for m in methods:
+    for n, m in enumerate(methods):
         print(f"\n=== Running method: {m} ===")
-        run_for_method(m)
+        run_for_method(m, cache=not args.no_cache, jobs=args.jobs, top=args.top, min_diff=args.min_diff,
+                       use_bench=not args.no_bench, solver=args.solver, prune=args.prune,
+                       deadline=deadline.share(len(methods) - n) if deadline else None, mip_gap=args.mip_gap,
+                       scenarios=scenarios)
 
 
 if __name__ == "__main__":